@@ -26,6 +26,8 @@ class SyncProgressBar(MDBoxLayout):
 
 class UpdateBanner(MDBoxLayout):
     update_text = StringProperty("")
+    can_install = BooleanProperty(False)
+    progress_text = StringProperty("")
 
 
 class VersionBanner(MDBoxLayout):
@@ -33,7 +35,7 @@ class VersionBanner(MDBoxLayout):
 
 
 class OfflineMessage(MDBoxLayout):
-    pass
+    text = StringProperty("Node is not running")
 
 
 class SectionHeader(MDBoxLayout):
@@ -55,8 +57,11 @@ class NodeStatsCard(MDCard):
     
     # State
     is_offline = BooleanProperty(True)
+    offline_text = StringProperty("Node is not running")
     update_available = BooleanProperty(False)
     update_text = StringProperty("")
+    can_install_update = BooleanProperty(False)
+    update_progress_text = StringProperty("")
     version_text = StringProperty("")
     network_text = StringProperty("MAINNET")
     
@@ -73,11 +78,17 @@ class NodeStatsCard(MDCard):
     
     # Resource stats
     bandwidth_text = StringProperty("-- / --")
+    throughput_down_text = StringProperty("--")
+    throughput_up_text = StringProperty("--")
     db_size_text = StringProperty("--")
+    cpu_text = StringProperty("--")
+    memory_text = StringProperty("--")
+    disk_text = StringProperty("-- / --")
     
     def update_stats(self, stats):
         if stats is None or stats.status == "offline":
             self.is_offline = True
+            self.offline_text = (stats and stats.startup_phase_display) or "Node is not running"
             return
         
         self.is_offline = False
@@ -103,7 +114,13 @@ class NodeStatsCard(MDCard):
         
         # Resource stats
         self.bandwidth_text = f"{stats.bytes_in_mib:.1f} / {stats.bytes_out_mib:.1f} MB"
+        self.throughput_down_text = stats.throughput_down_display
+        self.throughput_up_text = stats.throughput_up_display
         self.db_size_text = f"{stats.database_size_gib:.1f} GB"
+        if stats.resources:
+            self.cpu_text = stats.resources.cpu_display
+            self.memory_text = f"{stats.resources.rss_mib:.0f} MB"
+            self.disk_text = stats.resources.disk_display
         
         # Network and sync
         self.network_text = stats.nettype.upper()
@@ -113,6 +130,9 @@ class NodeStatsCard(MDCard):
             self.sync_status_text = "Fully synchronized"
         elif stats.busy_syncing:
             self.sync_status_text = f"Syncing... {stats.blocks_remaining:,} blocks remaining"
+            eta = stats.sync_eta_seconds
+            if eta is not None:
+                self.sync_status_text += f" ({stats.sync_rate:.0f} blk/s, ~{self._format_eta(eta)})"
         else:
             self.sync_status_text = "Waiting for sync..."
         
@@ -123,6 +143,14 @@ class NodeStatsCard(MDCard):
         if not self.update_available:
             self.update_available = stats.update_available
 
+    @staticmethod
+    def _format_eta(seconds: float) -> str:
+        if seconds >= 86400:
+            return f"{seconds / 86400:.1f} d"
+        if seconds >= 3600:
+            return f"{seconds / 3600:.1f} h"
+        return f"{max(1, seconds // 60):.0f} min"
+
     def update_version_info(self, version_info):
         if version_info is None:
             return
@@ -139,6 +167,7 @@ class NodeStatsCard(MDCard):
     
     def set_offline(self):
         self.is_offline = True
+        self.offline_text = "Node is not running"
         self.connections_text = "--"
         self.height_text = "--"
         self.storage_text = "--"
@@ -149,9 +178,14 @@ class NodeStatsCard(MDCard):
         self.hashrate_text = "--"
         self.tx_pool_text = "--"
         self.bandwidth_text = "-- / --"
+        self.throughput_down_text = "--"
+        self.throughput_up_text = "--"
         self.block_reward_text = "--"
         self.fee_text = "--"
         self.peers_text = "--"
         self.tx_count_text = "--"
         self.db_size_text = "--"
+        self.cpu_text = "--"
+        self.memory_text = "--"
+        self.disk_text = "-- / --"
         self.network_text = "MAINNET"
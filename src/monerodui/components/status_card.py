@@ -26,6 +26,8 @@ class StatusCard(MDCard):
     arch_ok = BooleanProperty(False)
     binary_value = StringProperty("Checking...")
     binary_ok = BooleanProperty(False)
+    binary_version = StringProperty("")
+    can_rollback = BooleanProperty(False)
     storage_value = StringProperty("Scanning...")
     storage_ok = BooleanProperty(False)
     state_value = StringProperty("Stopped")
@@ -38,6 +40,7 @@ class StatusCard(MDCard):
     
     def __init__(self, *args, **kwargs):
         self.register_event_type("on_storage_tapped")
+        self.register_event_type("on_rollback_tapped")
         super().__init__(*args, **kwargs)
         self._network_info = NetworkInfo()
         self._detect_ip()
@@ -64,6 +67,9 @@ class StatusCard(MDCard):
     def on_storage_tapped(self):
         pass
     
+    def on_rollback_tapped(self):
+        pass
+    
     def toggle_expanded(self):
         self.is_expanded = not self.is_expanded
     
@@ -86,9 +92,17 @@ class StatusCard(MDCard):
         self._update_summary()
     
     def update_binary(self, path, ready):
-        self.binary_value = "Ready" if ready else "Not Ready"
+        if ready:
+            self.binary_value = f"Ready • {self.binary_version}" if self.binary_version else "Ready"
+        else:
+            self.binary_value = "Not Ready"
         self.binary_ok = ready
         self._update_summary()
+    
+    def update_binary_version(self, version_text):
+        self.binary_version = version_text
+        if self.binary_ok:
+            self.binary_value = f"Ready • {version_text}"
 
     def update_storage(self, path, free_gib, valid, message):
         if valid and path:
@@ -1,14 +1,38 @@
 """Core library modules."""
 
-from .arch_detector import ArchDetector
+from .arch_detector import ArchDetector, PlatformProfile
 from .process_manager import ProcessManager, ProcessState
 from .node_stats import NodeStatsPoller, NodeStats, VersionInfo
 from .version_checker import VersionChecker, BinaryVersion
 from .update_checker import UpdateChecker, UpdateStatus
 from .network_info import NetworkInfo
+from .init_pipeline import InitPipeline
+from .binary_stager import BinaryStager
+from .binary_store import BinaryStore
+from .binary_updater import BinaryUpdater, UpdateProgress
+from .delta_patch import DeltaPatcher, PatchError
+from .output_buffer import OutputRingBuffer
+from .log_tail import LogTail
+from .log_index import LogIndex
+from .log_search import LogSearch, LogHit
+from .log_archiver import LogArchiver, ArchivedLog, ArchiveReport
+from .stats_history import StatsHistory
+from .sync_telemetry import SyncTelemetryParser, SyncTelemetry
+from .async_log_writer import AsyncLogWriter
+from .proc_sampler import ProcSampler, ResourceStats
+from .supervisor import Supervisor, RestartPolicy, ExitRecord
+from .daemon_rpc import DaemonRPC
+from .process_adoption import AdoptedProcess, PidFile
+from .process_event_loop import ProcessEventLoop
+from .android_notifier import AndroidNotifier, NotificationState
+from .stats_channel import StatsChannel
+from .launch_config import LaunchConfig, LaunchSpec
+from .live_config import LiveConfig, LiveResult
+from .bandwidth_schedule import BandwidthSchedule, BandwidthScheduler, AppliedLimits
 
 __all__ = [
     "ArchDetector",
+    "PlatformProfile",
     "ProcessManager",
     "ProcessState",
     "NodeStatsPoller",
@@ -19,4 +43,42 @@ __all__ = [
     "UpdateChecker",
     "UpdateStatus",
     "NetworkInfo",
+    "InitPipeline",
+    "BinaryStager",
+    "BinaryStore",
+    "BinaryUpdater",
+    "UpdateProgress",
+    "DeltaPatcher",
+    "PatchError",
+    "OutputRingBuffer",
+    "LogTail",
+    "LogIndex",
+    "LogSearch",
+    "LogHit",
+    "LogArchiver",
+    "ArchivedLog",
+    "ArchiveReport",
+    "StatsHistory",
+    "SyncTelemetryParser",
+    "SyncTelemetry",
+    "AsyncLogWriter",
+    "ProcSampler",
+    "ResourceStats",
+    "Supervisor",
+    "RestartPolicy",
+    "ExitRecord",
+    "DaemonRPC",
+    "AdoptedProcess",
+    "PidFile",
+    "ProcessEventLoop",
+    "AndroidNotifier",
+    "NotificationState",
+    "StatsChannel",
+    "LaunchConfig",
+    "LaunchSpec",
+    "LiveConfig",
+    "LiveResult",
+    "BandwidthSchedule",
+    "BandwidthScheduler",
+    "AppliedLimits",
 ]
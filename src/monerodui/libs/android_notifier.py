@@ -0,0 +1,152 @@
+"""Android notifications that are only posted when they change."""
+
+import time
+import logging
+import threading
+from dataclasses import dataclass
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+FLAG_IMMUTABLE = 67108864
+
+
+@dataclass(frozen=True)
+class NotificationState:
+    """Everything visible in a notification.
+
+    progress is a percentage, -1 for an indeterminate bar, None for no bar.
+    phase names the state the notification is in ("syncing", "offline"...);
+    when it is set, changes that keep the phase are progress-only and get
+    rate limited. Without a phase every change is posted.
+    """
+    title: str
+    text: str
+    big_text: str = ""
+    progress: Optional[int] = None
+    ongoing: bool = False
+    auto_cancel: bool = False
+    phase: Optional[str] = None
+
+
+class AndroidNotifier:
+    """Posts NotificationStates to one channel through cached jnius handles.
+
+    The channel is created once, the Java classes are looked up once per
+    process and each notification id keeps its Builder and BigTextStyle.
+    post() compares with the last state posted for that id: identical
+    states are skipped, progress-only changes go out at most every
+    PROGRESS_INTERVAL seconds. Every post crosses JNI and wakes system UI.
+    """
+
+    PROGRESS_INTERVAL = 30.0
+
+    _classes: dict = {}
+    _classes_lock = threading.Lock()
+
+    def __init__(self, context, channel_id: str, channel_name: str,
+                 low_importance: bool = False, description: str = ""):
+        self._context = context
+        self._channel_id = channel_id
+        self._lock = threading.Lock()
+        self._posted: dict[int, tuple[NotificationState, float]] = {}
+        self._builders: dict[int, tuple[object, object]] = {}
+        self.skipped = 0
+
+        cls = self._load_classes()
+        self._manager = context.getSystemService(cls["Context"].NOTIFICATION_SERVICE)
+        importance = (cls["NotificationManager"].IMPORTANCE_LOW if low_importance
+                      else cls["NotificationManager"].IMPORTANCE_DEFAULT)
+        channel = cls["NotificationChannel"](channel_id, channel_name, importance)
+        if description:
+            channel.setDescription(description)
+        self._manager.createNotificationChannel(channel)
+
+        app_context = context.getApplicationContext()
+        self._icon = app_context.getApplicationInfo().icon
+        intent = context.getPackageManager().getLaunchIntentForPackage(app_context.getPackageName())
+        intent.setFlags(cls["Intent"].FLAG_ACTIVITY_NEW_TASK | cls["Intent"].FLAG_ACTIVITY_CLEAR_TOP)
+        self._content_intent = cls["PendingIntent"].getActivity(context, 0, intent, FLAG_IMMUTABLE)
+
+    @classmethod
+    def _load_classes(cls) -> dict:
+        with cls._classes_lock:
+            if not cls._classes:
+                from jnius import autoclass
+                cls._classes = {
+                    "Context": autoclass("android.content.Context"),
+                    "Intent": autoclass("android.content.Intent"),
+                    "PendingIntent": autoclass("android.app.PendingIntent"),
+                    "NotificationManager": autoclass("android.app.NotificationManager"),
+                    "NotificationChannel": autoclass("android.app.NotificationChannel"),
+                    "Builder": autoclass("android.app.Notification$Builder"),
+                    "BigTextStyle": autoclass("android.app.Notification$BigTextStyle"),
+                }
+            return cls._classes
+
+    def should_post(self, notification_id: int, state: NotificationState) -> bool:
+        """False if posting state would not change anything visible, or only progress, too soon."""
+        last = self._posted.get(notification_id)
+        if last is None:
+            return True
+        last_state, posted_at = last
+        recent = time.monotonic() - posted_at < self.PROGRESS_INTERVAL
+        if state == last_state:
+            # A dismissable notification may have been swiped away since
+            return not state.ongoing and not recent
+        if state.phase is not None and state.phase == last_state.phase:
+            return not recent
+        return True
+
+    def post(self, notification_id: int, state: NotificationState, force: bool = False) -> bool:
+        """Show state under notification_id; returns False if it was skipped."""
+        with self._lock:
+            if not force and not self.should_post(notification_id, state):
+                self.skipped += 1
+                return False
+            try:
+                self._manager.notify(notification_id, self._build(notification_id, state))
+            except Exception as e:
+                logger.error(f"Failed to post notification: {e}")
+                return False
+            self._posted[notification_id] = (state, time.monotonic())
+            return True
+
+    def start_foreground(self, service, notification_id: int, state: NotificationState):
+        """Post state as service's foreground notification."""
+        with self._lock:
+            service.startForeground(notification_id, self._build(notification_id, state))
+            self._posted[notification_id] = (state, time.monotonic())
+
+    def cancel(self, notification_id: int):
+        with self._lock:
+            self._posted.pop(notification_id, None)
+            self._manager.cancel(notification_id)
+
+    def _build(self, notification_id: int, state: NotificationState):
+        cached = self._builders.get(notification_id)
+        if cached is None:
+            cls = self._load_classes()
+            builder = cls["Builder"](self._context, self._channel_id)
+            builder.setSmallIcon(self._icon)
+            builder.setContentIntent(self._content_intent)
+            cached = self._builders[notification_id] = (builder, cls["BigTextStyle"]())
+        builder, style = cached
+
+        builder.setContentTitle(state.title)
+        builder.setContentText(state.text)
+        builder.setOngoing(state.ongoing)
+        builder.setAutoCancel(state.auto_cancel)
+        if state.big_text:
+            style.setBigContentTitle(state.title)
+            style.bigText(state.big_text)
+            builder.setStyle(style)
+        else:
+            builder.setStyle(None)
+        if state.progress is None:
+            builder.setProgress(0, 0, False)
+        elif state.progress < 0:
+            builder.setProgress(100, 0, True)
+        else:
+            builder.setProgress(100, state.progress, False)
+        return builder.build()
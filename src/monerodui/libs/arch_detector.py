@@ -2,14 +2,53 @@
 
 import platform
 import os
+import re
 import sys
 import logging
 from pathlib import Path
+from dataclasses import dataclass, field, asdict
 from typing import Optional
 
+from .json_cache import JsonCache
+from .binary_store import BinaryStore
+
 logger = logging.getLogger(__name__)
 
 
+@dataclass
+class PlatformProfile:
+    """Capabilities of the device, probed once and cached on disk."""
+    raw_arch: str = "unknown"
+    arch: Optional[str] = None
+    abis: list[str] = field(default_factory=list)
+    cpu_count: int = 0
+    cpu_clusters: dict[str, int] = field(default_factory=dict)
+    total_ram: int = 0
+    cpu_features: list[str] = field(default_factory=list)
+    binary_path: Optional[str] = None
+    fingerprint: str = ""
+    
+    @property
+    def is_big_little(self) -> bool:
+        return len(self.cpu_clusters) > 1
+    
+    @property
+    def performance_cores(self) -> int:
+        """Cores in the fastest cluster (all cores on symmetric CPUs)."""
+        if not self.cpu_clusters:
+            return self.cpu_count
+        fastest = max(self.cpu_clusters, key=int)
+        return self.cpu_clusters[fastest]
+    
+    @property
+    def has_aes(self) -> bool:
+        return "aes" in self.cpu_features
+    
+    @property
+    def total_ram_gib(self) -> float:
+        return self.total_ram / (1024 ** 3)
+
+
 class ArchDetector:
     """Detects CPU architecture and resolves appropriate binary."""
     
@@ -23,11 +62,22 @@ class ArchDetector:
         "x86_64": "amd64", "AMD64": "amd64", "x64": "amd64",
     }
     
-    def __init__(self, bin_dir: Path | str = None):
+    CPU_FEATURES = {
+        # ARM
+        "aes", "pmull", "sha1", "sha2", "sha512", "sha3", "crc32", "asimd", "neon",
+        # x86
+        "sse4_2", "ssse3", "avx", "avx2", "avx512f", "bmi2",
+    }
+    
+    def __init__(self, bin_dir: Path | str = None, cache_path: Optional[Path] = None,
+                 store: Optional[BinaryStore] = None):
         self._bin_dir = Path(bin_dir) if bin_dir else None
+        self._store = store
         self._detected_arch: Optional[str] = None
         self._binary_path: Optional[Path] = None
         self._is_android = self._check_android()
+        self._cache = JsonCache(cache_path)
+        self._profile: Optional[PlatformProfile] = None
     
     def _check_android(self) -> bool:
         """Check if running on Android."""
@@ -44,6 +94,9 @@ class ArchDetector:
     @property
     def raw_arch(self) -> str:
         """Raw architecture string from platform."""
+        return self.profile.raw_arch
+    
+    def _probe_raw_arch(self) -> str:
         arch = platform.machine()
         
         if self._is_android and (not arch or arch == "unknown"):
@@ -55,22 +108,145 @@ class ArchDetector:
     def detected_arch(self) -> Optional[str]:
         """Normalized architecture identifier."""
         if self._detected_arch is None:
-            raw = self.raw_arch.lower()
-            
-            self._detected_arch = self.ARCH_MAP.get(raw)
-            
-            if self._detected_arch is None:
-                if "arm64" in raw or "aarch64" in raw:
-                    self._detected_arch = "arm64"
-                elif "arm" in raw:
-                    self._detected_arch = "arm32"
-                elif "x86_64" in raw or "amd64" in raw:
-                    self._detected_arch = "amd64"
-            
-            logger.info(f"Detected architecture: {raw} -> {self._detected_arch}")
-        
+            self._detected_arch = self.profile.arch
         return self._detected_arch
     
+    def _normalize_arch(self, raw_arch: str) -> Optional[str]:
+        raw = raw_arch.lower()
+        
+        arch = self.ARCH_MAP.get(raw)
+        
+        if arch is None:
+            if "arm64" in raw or "aarch64" in raw:
+                arch = "arm64"
+            elif "arm" in raw:
+                arch = "arm32"
+            elif "x86_64" in raw or "amd64" in raw:
+                arch = "amd64"
+        
+        logger.info(f"Detected architecture: {raw} -> {arch}")
+        return arch
+    
+    @property
+    def profile(self) -> PlatformProfile:
+        """Device capability profile, from the disk cache when still valid."""
+        if self._profile is None:
+            fingerprint = self._fingerprint()
+            cached = self._cache.load()
+            if cached.get("fingerprint") == fingerprint:
+                try:
+                    self._profile = PlatformProfile(**cached)
+                    logger.debug("Loaded platform profile from cache")
+                except TypeError as e:
+                    logger.warning(f"Ignoring malformed platform profile: {e}")
+            if self._profile is None:
+                self._profile = self._probe_profile(fingerprint)
+                self._save_profile()
+        return self._profile
+    
+    def _save_profile(self):
+        if self._profile is not None:
+            self._cache.save(asdict(self._profile))
+    
+    def _fingerprint(self) -> str:
+        """Identity of OS build and app install; a change invalidates the profile."""
+        uname = os.uname()
+        try:
+            st = Path(__file__).stat()
+            app_stamp = f"{st.st_size}:{st.st_mtime_ns}"
+        except OSError:
+            app_stamp = "unknown"
+        return "|".join([uname.sysname, uname.release, uname.version, uname.machine, app_stamp])
+    
+    def _probe_profile(self, fingerprint: str) -> PlatformProfile:
+        raw_arch = self._probe_raw_arch()
+        profile = PlatformProfile(
+            raw_arch=raw_arch,
+            arch=self._normalize_arch(raw_arch),
+            abis=self._probe_abis(raw_arch),
+            cpu_count=os.cpu_count() or 0,
+            cpu_clusters=self._probe_cpu_clusters(),
+            total_ram=self._probe_total_ram(),
+            cpu_features=self._probe_cpu_features(),
+            fingerprint=fingerprint,
+        )
+        logger.info(
+            f"Platform profile: {profile.arch}, {profile.cpu_count} cores "
+            f"{profile.cpu_clusters}, {profile.total_ram_gib:.1f} GiB RAM, "
+            f"features={profile.cpu_features}"
+        )
+        return profile
+    
+    def _probe_abis(self, raw_arch: str) -> list[str]:
+        if not self._is_android:
+            return [raw_arch]
+        try:
+            from jnius import autoclass
+            Build = autoclass('android.os.Build')
+            abis = [str(abi) for abi in Build.SUPPORTED_ABIS]
+            if abis:
+                return abis
+        except Exception as e:
+            logger.debug(f"Build.SUPPORTED_ABIS unavailable: {e}")
+        try:
+            import subprocess
+            result = subprocess.run(
+                ["getprop", "ro.product.cpu.abilist"],
+                capture_output=True, text=True, timeout=5
+            )
+            abis = [abi for abi in result.stdout.strip().split(",") if abi]
+            if abis:
+                return abis
+        except Exception as e:
+            logger.debug(f"getprop abilist failed: {e}")
+        return [raw_arch]
+    
+    def _probe_cpu_clusters(self) -> dict[str, int]:
+        """Group cores by max frequency (or capacity) to expose big.LITTLE layouts."""
+        clusters: dict[str, int] = {}
+        cpu_root = Path("/sys/devices/system/cpu")
+        try:
+            cpu_dirs = [p for p in cpu_root.iterdir() if re.fullmatch(r"cpu\d+", p.name)]
+        except OSError:
+            return clusters
+        
+        for cpu_dir in cpu_dirs:
+            speed = None
+            for rel in ("cpufreq/cpuinfo_max_freq", "cpu_capacity"):
+                try:
+                    speed = (cpu_dir / rel).read_text().strip()
+                    break
+                except OSError:
+                    continue
+            if speed and speed.isdigit():
+                clusters[speed] = clusters.get(speed, 0) + 1
+        return clusters
+    
+    def _probe_total_ram(self) -> int:
+        try:
+            with open("/proc/meminfo", "r") as f:
+                for line in f:
+                    if line.startswith("MemTotal:"):
+                        return int(line.split()[1]) * 1024
+        except (OSError, ValueError, IndexError):
+            pass
+        try:
+            return os.sysconf("SC_PAGE_SIZE") * os.sysconf("SC_PHYS_PAGES")
+        except (ValueError, OSError, AttributeError):
+            return 0
+    
+    def _probe_cpu_features(self) -> list[str]:
+        features: set[str] = set()
+        try:
+            with open("/proc/cpuinfo", "r") as f:
+                for line in f:
+                    key, _, value = line.partition(":")
+                    if key.strip() in ("Features", "flags"):
+                        features.update(value.split())
+        except OSError as e:
+            logger.debug(f"Could not read /proc/cpuinfo: {e}")
+        return sorted(features & self.CPU_FEATURES)
+    
     def _get_android_arch(self) -> str:
         """Get architecture on Android."""
         try:
@@ -87,11 +263,30 @@ class ArchDetector:
         import struct
         return "arm64" if struct.calcsize("P") * 8 == 64 else "arm32"
     
+    @property
+    def store(self) -> Optional[BinaryStore]:
+        return self._store
+    
     @property
     def binary_path(self) -> Optional[Path]:
-        """Full path to architecture-appropriate binary."""
+        """Full path to the binary: the store's active release, else the bundled one."""
+        if self._store is not None:
+            active = self._store.active_binary
+            if active is not None:
+                return active
+        return self.bundled_binary_path
+    
+    @property
+    def bundled_binary_path(self) -> Optional[Path]:
+        """Full path to the architecture-appropriate binary shipped with the app."""
         if self._binary_path is None:
-            self._binary_path = self._resolve_binary()
+            cached = self.profile.binary_path
+            if cached and Path(cached).exists():
+                self._binary_path = Path(cached)
+            else:
+                self._binary_path = self._resolve_binary()
+                self.profile.binary_path = str(self._binary_path) if self._binary_path else None
+                self._save_profile()
         return self._binary_path
     
     def _resolve_binary(self) -> Optional[Path]:
@@ -179,6 +374,8 @@ class ArchDetector:
         """Clear cache and re-detect."""
         self._detected_arch = None
         self._binary_path = None
+        self._profile = None
+        self._cache.clear()
     
     def get_status(self) -> dict:
         """Return status dict for UI consumption."""
@@ -189,4 +386,10 @@ class ArchDetector:
             "binary_path": str(self.binary_path) if self.binary_path else None,
             "ready": self.is_ready(),
             "is_android": self._is_android,
+            "active_version": self._store.active_version if self._store else None,
+            "can_rollback": self._store.can_rollback() if self._store else False,
+            "cpu_count": self.profile.cpu_count,
+            "performance_cores": self.profile.performance_cores,
+            "total_ram": self.profile.total_ram,
+            "cpu_features": self.profile.cpu_features,
         }
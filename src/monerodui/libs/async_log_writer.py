@@ -0,0 +1,212 @@
+"""Buffered, rotating app log written off the calling thread."""
+
+import os
+import time
+import queue
+import threading
+from pathlib import Path
+from typing import Optional, TextIO
+
+
+class AsyncLogWriter:
+    """A sys.stdout replacement that mirrors to the terminal and a log file.
+
+    The terminal (logcat on Android) is written inline; file writes are
+    queued and a writer thread appends them in batches, flushing every
+    FLUSH_INTERVAL seconds or FLUSH_BYTES of output, and rotating the file
+    at max_bytes. Callers never wait on storage. While the file cannot be
+    opened or written (mid-rotation, storage unavailable) the writer keeps
+    what it drained and retries; only a full queue drops writes, and the
+    count is written out later. flush_sync() drains the queue on the
+    calling thread, for the crash hook.
+
+    This module must not log through logging: it sits underneath it.
+    """
+
+    FLUSH_INTERVAL = 1.0
+    FLUSH_BYTES = 64 * 1024
+    QUEUE_SIZE = 10000
+    BATCH_SIZE = 1000
+
+    def __init__(self, path: Path, original_stream: Optional[TextIO] = None,
+                 max_bytes: int = 5 * 1024 * 1024, backups: int = 3):
+        self.terminal = original_stream
+        self._path = Path(path)
+        self._max_bytes = max_bytes
+        self._backups = backups
+        self._queue: queue.Queue = queue.Queue(maxsize=self.QUEUE_SIZE)
+        self._lock = threading.Lock()
+        self._file: Optional[TextIO] = None
+        self._size = 0
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+        self._dropped = 0
+        # Separate from _lock, which is held across file I/O
+        self._dropped_lock = threading.Lock()
+        self._held: list[str] = []
+        self._closed = False
+        self._open()
+        self._thread = threading.Thread(target=self._run, name="app-log-writer", daemon=True)
+        self._thread.start()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _open(self):
+        try:
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self._path, "a", encoding="utf-8")
+            self._size = self._file.tell()
+        except OSError:
+            self._file = None
+
+    # File-like interface used by print() and logging.StreamHandler
+
+    def write(self, message: str):
+        if self.terminal:
+            self.terminal.write(message)
+        if self._closed or not message:
+            return
+        try:
+            self._queue.put_nowait(message)
+        except queue.Full:
+            # Never block the caller; note the gap once the writer catches up
+            with self._dropped_lock:
+                self._dropped += 1
+
+    def flush(self):
+        # File flushing is the writer thread's job; only the terminal is flushed here
+        if self.terminal:
+            self.terminal.flush()
+
+    def isatty(self) -> bool:
+        return False
+
+    # Writer thread
+
+    def _run(self):
+        while not self._closed:
+            timeout = max(0.0, self.FLUSH_INTERVAL - (time.monotonic() - self._last_flush))
+            try:
+                first = self._queue.get(timeout=timeout)
+            except queue.Empty:
+                first = None
+            with self._lock:
+                written = self._write_batch(first)
+                if self._unflushed and (self._unflushed >= self.FLUSH_BYTES
+                                        or time.monotonic() - self._last_flush >= self.FLUSH_INTERVAL):
+                    self._flush_file()
+            if not written and self._held:
+                # File unavailable; retry later instead of spinning
+                time.sleep(self.FLUSH_INTERVAL)
+
+    def _drain(self, first: Optional[str]) -> list[str]:
+        batch, self._held = self._held, []
+        if first is not None:
+            batch.append(first)
+        while len(batch) < self.BATCH_SIZE:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        with self._dropped_lock:
+            dropped, self._dropped = self._dropped, 0
+        if dropped:
+            batch.append(f"[app log: {dropped} writes dropped, writer fell behind]\n")
+        return batch
+
+    def _hold(self, batch: list[str]):
+        """Keep a batch that could not be written for the next attempt, bounded by QUEUE_SIZE."""
+        excess = len(batch) - self.QUEUE_SIZE
+        if excess > 0:
+            del batch[:excess]
+            with self._dropped_lock:
+                self._dropped += excess
+        self._held = batch
+
+    def _write_batch(self, first: Optional[str]) -> bool:
+        """Append up to BATCH_SIZE queued writes. Caller holds _lock."""
+        batch = self._drain(first)
+        if not batch:
+            return False
+        if self._file is None:
+            self._open()
+            if self._file is None:
+                self._hold(batch)
+                return False
+        data = "".join(batch)
+        try:
+            self._file.write(data)
+        except (OSError, ValueError):
+            # Reopen on the next attempt; a partly written batch may repeat
+            self._hold(batch)
+            try:
+                self._file.close()
+            except (OSError, ValueError):
+                pass
+            self._file = None
+            return False
+        self._size += len(data)
+        self._unflushed += len(data)
+        if self._max_bytes and self._size >= self._max_bytes:
+            self._rotate()
+        return True
+
+    def _flush_file(self):
+        try:
+            self._file.flush()
+        except (OSError, ValueError, AttributeError):
+            pass
+        self._unflushed = 0
+        self._last_flush = time.monotonic()
+
+    def _rotate(self):
+        """Shift app.txt -> app.txt.1 -> app.txt.2 ..., keeping at most backups old files."""
+        try:
+            self._file.close()
+        except OSError:
+            pass
+        self._file = None
+        for i in range(self._backups - 1, 0, -1):
+            src = self._path.with_name(f"{self._path.name}.{i}")
+            if src.exists():
+                try:
+                    os.replace(src, self._path.with_name(f"{self._path.name}.{i + 1}"))
+                except OSError:
+                    pass
+        try:
+            if self._backups > 0:
+                os.replace(self._path, self._path.with_name(f"{self._path.name}.1"))
+            else:
+                self._path.unlink()
+        except OSError:
+            pass
+        self._open()
+        self._unflushed = 0
+
+    def flush_sync(self):
+        """Write out everything queued and fsync, on the calling thread."""
+        with self._lock:
+            while self._write_batch(None):
+                pass
+            self._flush_file()
+            if self._file is not None:
+                try:
+                    os.fsync(self._file.fileno())
+                except (OSError, ValueError):
+                    pass
+
+    def close(self):
+        if self._closed:
+            return
+        # Stop the writer thread first; flush_sync then drains what is left
+        self._closed = True
+        self.flush_sync()
+        with self._lock:
+            if self._file is not None:
+                try:
+                    self._file.close()
+                except OSError:
+                    pass
+                self._file = None
@@ -0,0 +1,295 @@
+"""Time-of-day bandwidth limits applied to a running monerod."""
+
+import logging
+import threading
+import configparser
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from pathlib import Path
+from typing import Callable, Optional
+
+from .daemon_rpc import DaemonRPC
+
+logger = logging.getLogger(__name__)
+
+# set_limit treats 0 as "keep the current limit", so "max" is a cap no link reaches (kB/s)
+MAX_RATE = 1024 * 1024
+DEFAULT_RATE = -1
+
+
+def _parse_time(text: str) -> int:
+    """"HH:MM" as minutes after midnight; "24:00" is midnight."""
+    hours, sep, minutes = text.strip().partition(":")
+    h, m = int(hours), int(minutes) if sep else 0
+    if not (0 <= h <= 24 and 0 <= m < 60) or (h == 24 and m):
+        raise ValueError(f"invalid time {text.strip()!r}")
+    return (h * 60 + m) % 1440
+
+
+def _parse_rate(text: str) -> int:
+    text = text.strip().lower()
+    if text == "max":
+        return MAX_RATE
+    rate = int(text)
+    if rate == 0 or rate < DEFAULT_RATE:
+        raise ValueError(f"invalid rate {text!r} (kB/s, -1 for the default or max)")
+    return rate
+
+
+def _format_rate(rate: int) -> str:
+    if rate >= MAX_RATE:
+        return "max"
+    return "default" if rate < 0 else str(rate)
+
+
+@dataclass(frozen=True)
+class BandwidthWindow:
+    """Limits (kB/s) in force from start to end, in minutes after local midnight.
+
+    A window whose end is not after its start runs past midnight.
+    """
+    start: int
+    end: int
+    up: int
+    down: int
+
+    def contains(self, minute: int) -> bool:
+        if self.start < self.end:
+            return self.start <= minute < self.end
+        return minute >= self.start or minute < self.end
+
+    @property
+    def label(self) -> str:
+        return (f"{self.start // 60:02d}:{self.start % 60:02d}-"
+                f"{self.end // 60:02d}:{self.end % 60:02d}")
+
+
+@dataclass(frozen=True)
+class AppliedLimits:
+    """Limits set in monerod, the window they came from (None for the base
+    limits) and what monerod reported back for them."""
+    up: int
+    down: int
+    window: Optional[BandwidthWindow]
+    confirmed_up: int
+    confirmed_down: int
+
+    @property
+    def display_string(self) -> str:
+        source = f"window {self.window.label}" if self.window else "base limits"
+        return f"Bandwidth {source}: ↑{_format_rate(self.up)} ↓{_format_rate(self.down)} kB/s"
+
+
+class BandwidthSchedule:
+    """Bandwidth windows over the day, with the base limits outside them.
+
+    Written as comma-separated HH:MM-HH:MM=UP/DOWN entries in kB/s, e.g.
+    "22:00-07:00=max/max, 09:00-18:00=256/1024"; -1 is monerod's default.
+    Where windows overlap, the first one listed wins.
+    """
+
+    def __init__(self, windows: tuple = (), base_up: int = DEFAULT_RATE, base_down: int = DEFAULT_RATE):
+        self.windows: tuple[BandwidthWindow, ...] = tuple(windows)
+        self.base_up = base_up
+        self.base_down = base_down
+
+    @property
+    def active(self) -> bool:
+        return bool(self.windows)
+
+    @classmethod
+    def parse(cls, text: str, base_up: int = DEFAULT_RATE, base_down: int = DEFAULT_RATE) -> "BandwidthSchedule":
+        """Raises ValueError naming the entry that could not be read."""
+        windows = []
+        for entry in (text or "").split(","):
+            if not entry.strip():
+                continue
+            span, _, rates = entry.partition("=")
+            if span.count("-") != 1 or rates.count("/") != 1:
+                raise ValueError(f"{entry.strip()!r}: expected HH:MM-HH:MM=UP/DOWN")
+            start, end = span.split("-")
+            up, down = rates.split("/")
+            try:
+                windows.append(BandwidthWindow(_parse_time(start), _parse_time(end),
+                                               _parse_rate(up), _parse_rate(down)))
+            except ValueError as e:
+                raise ValueError(f"{entry.strip()!r}: {e}") from None
+        return cls(windows, base_up, base_down)
+
+    @classmethod
+    def from_config(cls, config) -> "BandwidthSchedule":
+        """The schedule in config's [bandwidth] section; a broken one is logged and ignored."""
+        def get(key: str, fallback: str) -> str:
+            try:
+                return config.get("bandwidth", key, fallback=fallback) or fallback
+            except (configparser.Error, ValueError):
+                return fallback
+
+        def rate(key: str, fallback: str) -> int:
+            try:
+                return int(get(key, fallback))
+            except ValueError:
+                return DEFAULT_RATE
+
+        base_up, base_down = rate("limit_rate_up", "8192"), rate("limit_rate_down", "32768")
+        try:
+            return cls.parse(get("schedule", ""), base_up, base_down)
+        except ValueError as e:
+            logger.warning(f"Ignoring bandwidth schedule: {e}")
+            return cls((), base_up, base_down)
+
+    @classmethod
+    def load(cls, ini_path: Path) -> "BandwidthSchedule":
+        """from_config on the app's ini file, for processes without Kivy's config."""
+        config = configparser.ConfigParser(interpolation=None)
+        try:
+            config.read(ini_path)
+        except configparser.Error as e:
+            logger.warning(f"Cannot read {ini_path}: {e}")
+        return cls.from_config(config)
+
+    def limits_at(self, when: datetime) -> tuple[int, int, Optional[BandwidthWindow]]:
+        """(up, down, window) in force at when; window is None outside every window."""
+        minute = when.hour * 60 + when.minute
+        for window in self.windows:
+            if window.contains(minute):
+                return window.up, window.down, window
+        return self.base_up, self.base_down, None
+
+    def next_change(self, when: datetime) -> Optional[datetime]:
+        """The first window boundary after when, None without windows."""
+        if not self.windows:
+            return None
+        minute = when.hour * 60 + when.minute
+        boundaries = sorted({w.start for w in self.windows} | {w.end for w in self.windows})
+        later = [b for b in boundaries if b > minute]
+        target = later[0] if later else boundaries[0] + 1440
+        midnight = when.replace(hour=0, minute=0, second=0, microsecond=0)
+        return midnight + timedelta(minutes=target)
+
+
+class BandwidthScheduler:
+    """Keeps a running monerod's bandwidth limits on a BandwidthSchedule.
+
+    A daemon thread sleeps until the next window boundary and switches the
+    limits with set_limit; monerod is not restarted. While a schedule is
+    active the limits are read back with get_limit every VERIFY_INTERVAL
+    and reapplied when they differ, which is how a restarted monerod (back
+    on its command-line limits) gets reconciled; reconcile() does it right
+    away. A failed set_limit (RPC not up yet) is retried after
+    RETRY_INTERVAL. on_change(AppliedLimits) runs on the scheduler thread
+    whenever different limits were applied.
+    """
+
+    VERIFY_INTERVAL = 60.0
+    RETRY_INTERVAL = 15.0
+
+    def __init__(self, rpc: Callable[[], DaemonRPC],
+                 on_change: Optional[Callable[[AppliedLimits], None]] = None):
+        self._rpc = rpc
+        self._on_change = on_change
+        self._lock = threading.Lock()
+        self._schedule = BandwidthSchedule()
+        self._dirty = False
+        self._wake = threading.Event()
+        self._stop: Optional[threading.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self.applied: Optional[AppliedLimits] = None
+
+    @property
+    def schedule(self) -> BandwidthSchedule:
+        return self._schedule
+
+    @property
+    def active(self) -> bool:
+        return self._schedule.active
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def set_schedule(self, schedule: BandwidthSchedule):
+        """Switch schedules; the limits it calls for now are applied at once.
+
+        Dropping the last window puts the base limits back.
+        """
+        with self._lock:
+            self._dirty = self._dirty or schedule.active or self._schedule.active
+            self._schedule = schedule
+        self._wake.set()
+
+    def reconcile(self):
+        """Apply the current limits now, e.g. after monerod restarted."""
+        with self._lock:
+            self._dirty = True
+        self._wake.set()
+
+    def start(self):
+        if self.running:
+            self.reconcile()
+            return
+        with self._lock:
+            self._dirty = True
+        self.applied = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._loop, args=(self._stop,),
+                                        name="bandwidth-schedule", daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+        self._wake.set()
+
+    def _loop(self, stop: threading.Event):
+        while not stop.is_set():
+            self._wake.clear()
+            try:
+                wait = self.run_once()
+            except Exception as e:
+                logger.error(f"Bandwidth schedule failed: {e}")
+                wait = self.RETRY_INTERVAL
+            self._wake.wait(wait)
+
+    def run_once(self, now: Optional[datetime] = None) -> Optional[float]:
+        """Bring monerod in line with the schedule; seconds until the next check (None: none needed)."""
+        with self._lock:
+            schedule, dirty, self._dirty = self._schedule, self._dirty, False
+        now = now or datetime.now()
+        up, down, window = schedule.limits_at(now)
+        applied = self.applied
+        changed = applied is None or (applied.up, applied.down, applied.window) != (up, down, window)
+        if not schedule.active and not dirty and not changed:
+            # monerod's command line carries the base limits
+            return None
+
+        rpc = self._rpc()
+        if not dirty and not changed:
+            current = rpc.get_limit()
+            if current is None:
+                return self.RETRY_INTERVAL
+            if (current.get("limit_up"), current.get("limit_down")) == (applied.confirmed_up, applied.confirmed_down):
+                return self._next_check(schedule, now)
+            logger.info("monerod's bandwidth limits were reset, reapplying the schedule")
+
+        result = rpc.set_limit(up, down)
+        if result is None:
+            with self._lock:
+                self._dirty = True
+            return self.RETRY_INTERVAL
+        self.applied = AppliedLimits(up, down, window,
+                                     result.get("limit_up", up), result.get("limit_down", down))
+        if changed:
+            logger.info(self.applied.display_string)
+            if self._on_change:
+                try:
+                    self._on_change(self.applied)
+                except Exception as e:
+                    logger.error(f"Bandwidth change callback failed: {e}")
+        return self._next_check(schedule, now)
+
+    def _next_check(self, schedule: BandwidthSchedule, now: datetime) -> Optional[float]:
+        change = schedule.next_change(now)
+        if change is None:
+            return None
+        return max(1.0, min(self.VERIFY_INTERVAL, (change - now).total_seconds()))
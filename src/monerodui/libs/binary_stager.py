@@ -0,0 +1,164 @@
+"""Staging of the monerod binary into an executable location."""
+
+import os
+import hashlib
+import logging
+import shutil
+from pathlib import Path
+from typing import Optional
+
+from .json_cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+
+class BinaryStager:
+    """Keeps an executable copy of the binary in a private bin dir.
+
+    A manifest records the source identity, content digest and staged copy
+    identity so unchanged binaries are neither hashed nor copied, and a
+    same-size upgrade is still detected by its digest.
+    """
+
+    MANIFEST_NAME = ".stage-manifest.json"
+    HASH_CHUNK_SIZE = 1024 * 1024
+    COPY_CHUNK_SIZE = 8 * 1024 * 1024
+
+    def __init__(self, bin_dir: Path, name: str = "monerod", allow_in_place: bool = True):
+        self._bin_dir = Path(bin_dir)
+        self._target = self._bin_dir / name
+        self._allow_in_place = allow_in_place
+        self._manifest = JsonCache(self._bin_dir / self.MANIFEST_NAME)
+
+    @property
+    def target(self) -> Path:
+        return self._target
+
+    @property
+    def staged_source(self) -> Optional[Path]:
+        """Source path recorded by the last successful stage."""
+        source = self._manifest.load().get("source")
+        return Path(source) if source else None
+
+    @staticmethod
+    def _identity(path: Path) -> Optional[dict]:
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return {"size": st.st_size, "mtime_ns": st.st_mtime_ns, "inode": st.st_ino}
+
+    @classmethod
+    def _digest(cls, path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    @staticmethod
+    def can_exec_in_place(path: Path) -> bool:
+        """Whether the binary can run from where it is (e.g. nativeLibraryDir)."""
+        try:
+            if not os.access(path, os.R_OK | os.X_OK):
+                return False
+            flags = os.statvfs(path).f_flag
+            return not (flags & getattr(os, "ST_NOEXEC", 8))
+        except OSError:
+            return False
+
+    def stage(self, source: Path) -> Optional[Path]:
+        """Return an executable path for source, copying only when contents changed."""
+        source = Path(source)
+        source_id = self._identity(source)
+        if source_id is None:
+            logger.error(f"Binary not found: {source}")
+            return None
+
+        if self._allow_in_place and self.can_exec_in_place(source):
+            logger.info(f"Launching binary in place: {source}")
+            manifest = self._manifest.load()
+            manifest.update({"source": str(source), "in_place": True})
+            self._manifest.save(manifest)
+            return source
+
+        self._bin_dir.mkdir(parents=True, exist_ok=True)
+
+        try:
+            if source.resolve() == self._target.resolve():
+                return self._target if os.access(self._target, os.X_OK) else None
+        except OSError:
+            pass
+
+        manifest = self._manifest.load()
+        target_id = self._identity(self._target)
+        target_intact = target_id is not None and manifest.get("target_identity") == target_id
+
+        if (target_intact and manifest.get("source") == str(source)
+                and manifest.get("source_identity") == source_id):
+            logger.debug("Staged binary up to date (identity match)")
+            return self._target
+
+        digest = self._digest(source)
+        if target_intact and manifest.get("sha256") == digest:
+            logger.info("Staged binary up to date (digest match), skipping copy")
+            manifest.update({"source": str(source), "source_identity": source_id, "in_place": False})
+            self._manifest.save(manifest)
+            return self._target
+
+        logger.info(f"Staging binary: {source} -> {self._target}")
+        tmp_path = self._bin_dir / f".{self._target.name}.{os.getpid()}.tmp"
+        try:
+            self._copy(source, tmp_path)
+            tmp_path.chmod(0o755)
+            os.replace(tmp_path, self._target)
+        except OSError as e:
+            logger.error(f"Failed to stage binary: {e}")
+            try:
+                tmp_path.unlink()
+            except OSError:
+                pass
+            return None
+
+        self._manifest.save({
+            "source": str(source),
+            "source_identity": source_id,
+            "sha256": digest,
+            "target_identity": self._identity(self._target),
+            "in_place": False,
+        })
+        return self._target
+
+    def _copy(self, source: Path, dest: Path):
+        """Kernel-side copy (copy_file_range, then sendfile), fsynced before rename."""
+        with open(source, "rb") as src, open(dest, "wb") as dst:
+            size = os.fstat(src.fileno()).st_size
+            copied = self._copy_kernel(src.fileno(), dst.fileno(), size)
+            if copied < size:
+                src.seek(copied)
+                dst.seek(copied)
+                shutil.copyfileobj(src, dst, self.COPY_CHUNK_SIZE)
+            dst.flush()
+            os.fsync(dst.fileno())
+
+    def _copy_kernel(self, src_fd: int, dst_fd: int, size: int) -> int:
+        copied = 0
+        for func in ("copy_file_range", "sendfile"):
+            copy = getattr(os, func, None)
+            if copy is None:
+                continue
+            try:
+                while copied < size:
+                    count = min(self.COPY_CHUNK_SIZE, size - copied)
+                    if func == "copy_file_range":
+                        n = copy(src_fd, dst_fd, count, copied, copied)
+                    else:
+                        os.lseek(dst_fd, copied, os.SEEK_SET)
+                        n = copy(dst_fd, src_fd, copied, count)
+                    if n == 0:
+                        break
+                    copied += n
+                return copied
+            except OSError as e:
+                logger.debug(f"{func} unavailable, falling back: {e}")
+        return copied
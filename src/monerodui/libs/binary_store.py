@@ -0,0 +1,206 @@
+"""Versioned store of installed monerod binaries."""
+
+import os
+import time
+import shutil
+import logging
+from pathlib import Path
+from typing import Optional
+
+from .json_cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+
+class BinaryStore:
+    """Keeps each installed release in its own directory.
+
+    Layout::
+
+        root/versions/<version>/monerod     the binary
+        root/versions/<version>/meta.json   hash and cached version metadata
+        root/current  -> versions/<version>
+        root/previous -> versions/<version>
+
+    ``current`` and ``previous`` are symlinks replaced with os.replace, so
+    switching versions is a single atomic rename. When ``current`` is
+    absent the bundled binary is used, and rolling back past the first
+    stored release returns to it.
+    """
+
+    VERSIONS_DIR = "versions"
+    CURRENT = "current"
+    PREVIOUS = "previous"
+    META_NAME = "meta.json"
+
+    def __init__(self, root: Path, name: str = "monerod"):
+        self._root = Path(root)
+        self._versions = self._root / self.VERSIONS_DIR
+        self._name = name
+
+    @property
+    def root(self) -> Path:
+        return self._root
+
+    def can_install(self) -> bool:
+        try:
+            self._versions.mkdir(parents=True, exist_ok=True)
+        except OSError:
+            return False
+        return os.access(self._versions, os.W_OK)
+
+    def _version_dir(self, version: str) -> Path:
+        if not version or "/" in version or version.startswith("."):
+            raise ValueError(f"Invalid version name: {version!r}")
+        return self._versions / version
+
+    def binary_path(self, version: str) -> Path:
+        return self._version_dir(version) / self._name
+
+    def _meta(self, version: str) -> JsonCache:
+        return JsonCache(self._version_dir(version) / self.META_NAME)
+
+    def _link_target(self, link: str) -> Optional[str]:
+        try:
+            return Path(os.readlink(self._root / link)).name
+        except OSError:
+            return None
+
+    @property
+    def active_version(self) -> Optional[str]:
+        version = self._link_target(self.CURRENT)
+        if version and self.binary_path(version).exists():
+            return version
+        return None
+
+    @property
+    def previous_version(self) -> Optional[str]:
+        """Version a rollback returns to; None means the bundled binary."""
+        version = self._link_target(self.PREVIOUS)
+        if version and self.binary_path(version).exists():
+            return version
+        return None
+
+    @property
+    def active_binary(self) -> Optional[Path]:
+        version = self.active_version
+        return self.binary_path(version) if version else None
+
+    def can_rollback(self) -> bool:
+        return self.active_version is not None
+
+    def versions(self) -> list[dict]:
+        """Stored releases with their metadata, newest install first."""
+        if not self._versions.is_dir():
+            return []
+        entries = []
+        for path in self._versions.iterdir():
+            if path.name.startswith(".") or not (path / self._name).exists():
+                continue
+            meta = self._meta(path.name).load()
+            meta["version"] = path.name
+            entries.append(meta)
+        return sorted(entries, key=lambda m: m.get("installed_at", 0), reverse=True)
+
+    def metadata(self, version: str) -> dict:
+        return self._meta(version).load()
+
+    def set_metadata(self, version: str, **fields) -> bool:
+        """Merge fields (e.g. VersionChecker output) into a version's meta.json."""
+        if not self.binary_path(version).exists():
+            return False
+        meta = self._meta(version)
+        data = meta.load()
+        data.update(fields)
+        return meta.save(data)
+
+    def staging_path(self) -> Path:
+        """Scratch file on the store's filesystem, so add() can rename it in."""
+        self._versions.mkdir(parents=True, exist_ok=True)
+        return self._root / f".{self._name}.new"
+
+    def add(self, version: str, source: Path, activate: bool = True, **meta) -> Path:
+        """Move a verified binary into the store and optionally make it active.
+
+        meta (e.g. archive_sha256) is recorded in the version's meta.json.
+        """
+        version_dir = self._version_dir(version)
+        tmp_dir = self._versions / f".{version}.{os.getpid()}.tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+        tmp_dir.mkdir(parents=True)
+        try:
+            binary = tmp_dir / self._name
+            os.replace(source, binary)
+            binary.chmod(0o755)
+            JsonCache(tmp_dir / self.META_NAME).save({**meta, "installed_at": time.time()})
+            if version_dir.exists():
+                # Reinstall of a stored version: keep the old dir until the swap
+                stale = self._versions / f".{version}.{os.getpid()}.old"
+                os.replace(version_dir, stale)
+                os.replace(tmp_dir, version_dir)
+                shutil.rmtree(stale, ignore_errors=True)
+            else:
+                os.replace(tmp_dir, version_dir)
+        except OSError:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        logger.info(f"Stored monerod v{version} at {version_dir}")
+        if activate:
+            self.activate(version)
+        return version_dir / self._name
+
+    def _set_link(self, link: str, version: Optional[str]):
+        path = self._root / link
+        if version is None:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            return
+        tmp = self._root / f".{link}.{os.getpid()}.tmp"
+        try:
+            tmp.unlink()
+        except FileNotFoundError:
+            pass
+        os.symlink(Path(self.VERSIONS_DIR) / version, tmp)
+        os.replace(tmp, path)
+
+    def activate(self, version: str) -> bool:
+        """Point current at version; the outgoing version becomes previous."""
+        if not self.binary_path(version).exists():
+            logger.error(f"Cannot activate v{version}: not in store")
+            return False
+        outgoing = self.active_version
+        if outgoing == version:
+            return True
+        self._set_link(self.PREVIOUS, outgoing)
+        self._set_link(self.CURRENT, version)
+        logger.info(f"Active monerod: v{version} (was {outgoing or 'bundled'})")
+        return True
+
+    def rollback(self) -> Optional[str]:
+        """Swap current and previous. Returns the now-active version, None for bundled."""
+        outgoing = self.active_version
+        if outgoing is None:
+            logger.warning("Nothing to roll back: bundled binary is active")
+            return None
+        target = self.previous_version
+        self._set_link(self.PREVIOUS, outgoing)
+        self._set_link(self.CURRENT, target)
+        logger.info(f"Rolled back monerod: v{outgoing} -> {('v' + target) if target else 'bundled'}")
+        return target
+
+    def prune(self, keep: int = 3) -> list[str]:
+        """Delete old releases, never touching the active or previous one."""
+        pinned = {self.active_version, self.previous_version}
+        removed = []
+        for entry in self.versions()[keep:]:
+            version = entry["version"]
+            if version in pinned:
+                continue
+            shutil.rmtree(self._version_dir(version), ignore_errors=True)
+            removed.append(version)
+        if removed:
+            logger.info(f"Pruned stored monerod versions: {', '.join(removed)}")
+        return removed
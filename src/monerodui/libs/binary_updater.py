@@ -0,0 +1,453 @@
+"""In-app monerod updates: download, verify and install in one pass."""
+
+import io
+import os
+import json
+import hashlib
+import logging
+import time
+import tarfile
+import threading
+import urllib.request
+import urllib.error
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Optional, Callable
+
+from .binary_store import BinaryStore
+from .json_cache import JsonCache
+from .delta_patch import DeltaPatcher, PatchError
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class UpdateProgress:
+    """Progress report for a running update."""
+    stage: str = "idle"
+    downloaded: int = 0
+    total: int = 0
+    message: str = ""
+
+    @property
+    def fraction(self) -> float:
+        if self.total <= 0:
+            return 0.0
+        return min(1.0, self.downloaded / self.total)
+
+    @property
+    def display_string(self) -> str:
+        if self.stage == "download" and self.total:
+            return f"Downloading {self.downloaded / (1024 ** 2):.1f} / {self.total / (1024 ** 2):.1f} MB"
+        return self.message or self.stage.capitalize()
+
+
+class _HashingReader(io.RawIOBase):
+    """Replays an already-downloaded prefix, then streams the network body.
+
+    Every byte handed to the consumer is hashed exactly once, and network
+    bytes are appended to the partial file so an interrupted download can
+    resume with an HTTP Range request.
+    """
+
+    def __init__(self, prefix_path: Path, prefix_size: int, response, body_length: int,
+                 part_file, on_bytes: Callable[[int], None]):
+        self._prefix = open(prefix_path, "rb") if prefix_size else None
+        self._prefix_left = prefix_size
+        self._response = response
+        self._body_left = body_length
+        self._part_file = part_file
+        self._on_bytes = on_bytes
+        self.sha256 = hashlib.sha256()
+
+    def readable(self) -> bool:
+        return True
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer)
+        if self._prefix_left > 0:
+            n = self._prefix.readinto(view[:min(len(view), self._prefix_left)])
+            if not n:
+                raise IOError("Partial download shrank while resuming")
+            self._prefix_left -= n
+            if self._prefix_left == 0:
+                self._prefix.close()
+        else:
+            n = self._response.readinto(view)
+            if not n:
+                if self._body_left > 0:
+                    raise ConnectionError(f"Connection closed with {self._body_left} bytes missing")
+                return 0
+            self._body_left -= n
+            self._part_file.write(view[:n])
+        self.sha256.update(view[:n])
+        self._on_bytes(n)
+        return n
+
+    def close(self):
+        if self._prefix and not self._prefix.closed:
+            self._prefix.close()
+        super().close()
+
+
+class BinaryUpdater:
+    """Installs a new monerod release into a BinaryStore, or over the current binary.
+
+    When a delta_url is configured, a bsdiff patch from the installed version
+    is tried first, but only for a release whose binary hash is already
+    known from a verified full archive (trusted_binary_sha256): the patched
+    binary must match that hash before it replaces anything. The manifest
+    is public-hash checked too, yet it cannot vouch for its own patch.
+    Otherwise the full archive is downloaded and verified against the
+    MoneroPulse hash.
+    """
+
+    DOWNLOAD_URL = "https://downloads.getmonero.org/cli/monero-{platform}-v{version}.tar.bz2"
+    DELTA_MANIFEST = "{base}/{platform}/v{version}.json"
+    MANIFEST_MAX_SIZE = 64 * 1024
+    CHUNK_SIZE = 256 * 1024
+    TIMEOUT = 30
+    # Download progress goes to the UI thread at most this often (or per whole percent)
+    REPORT_INTERVAL = 0.25
+    # Binary hashes of releases installed from a hash-verified full archive
+    VERIFIED_NAME = "verified_binaries.json"
+
+    def __init__(self, work_dir: Path, install_path: Path, platform: str,
+                 binary_name: str = "monerod", delta_url: str = "",
+                 store: Optional[BinaryStore] = None):
+        self._work_dir = Path(work_dir)
+        # Current binary: replaced in place without a store, patch base either way
+        self._install_path = Path(install_path)
+        self._store = store
+        self._platform = platform
+        self._binary_name = binary_name
+        self._delta_url = delta_url.strip().rstrip("/")
+        self._cancel = threading.Event()
+        self._verified = JsonCache(self._work_dir / self.VERIFIED_NAME)
+
+    @property
+    def install_path(self) -> Path:
+        return self._install_path
+
+    def can_install(self) -> bool:
+        """Whether the install location is writable (nativeLibraryDir is not)."""
+        if self._store is not None:
+            return self._store.can_install()
+        return os.access(self._install_path.parent, os.W_OK)
+
+    def cancel(self):
+        self._cancel.set()
+
+    def archive_url(self, version: str) -> str:
+        return self.DOWNLOAD_URL.format(platform=self._platform, version=version)
+
+    def delta_manifest_url(self, version: str) -> str:
+        return self.DELTA_MANIFEST.format(base=self._delta_url, platform=self._platform, version=version)
+
+    def trusted_binary_sha256(self, version: str) -> Optional[str]:
+        """SHA-256 of version's binary as extracted from a verified archive, if it was ever installed that way.
+
+        The delta manifest's own binary hash comes from the same server as
+        the patch, so only this one can vouch for a patched binary.
+        """
+        digest = self._verified.load().get(f"{self._platform}/{version}")
+        if not digest and self._store is not None:
+            digest = self._store.metadata(version).get("binary_sha256")
+        return digest.lower() if isinstance(digest, str) and digest else None
+
+    def _record_verified(self, version: str, binary_sha256: str):
+        data = self._verified.load()
+        data[f"{self._platform}/{version}"] = binary_sha256
+        self._verified.save(data)
+
+    def update(self, version: str, expected_sha256: str,
+               on_progress: Optional[Callable[[UpdateProgress], None]] = None,
+               from_version: Optional[str] = None) -> bool:
+        """Download, verify and atomically install version. Returns success.
+
+        from_version is the installed release; it selects a delta patch when
+        one is published.
+        """
+        self._cancel.clear()
+        progress = UpdateProgress(stage="download")
+
+        def report(stage: Optional[str] = None, message: str = ""):
+            if stage:
+                progress.stage = stage
+            progress.message = message
+            if on_progress:
+                on_progress(progress)
+
+        url = self.archive_url(version)
+        self._work_dir.mkdir(parents=True, exist_ok=True)
+        part_path = self._work_dir / (url.rsplit("/", 1)[-1] + ".part")
+        if self._store is not None:
+            staging_path = self._store.staging_path()
+        else:
+            staging_path = self._install_path.with_name(f".{self._install_path.name}.new")
+
+        trusted_sha256 = self.trusted_binary_sha256(version)
+        if self._delta_url and from_version and from_version != version and not trusted_sha256:
+            logger.info(f"No verified binary hash for v{version}, not using a delta patch")
+        elif self._delta_url and from_version and from_version != version:
+            if self._apply_delta(from_version, version, expected_sha256, trusted_sha256,
+                                 staging_path, progress, report):
+                return self._install(staging_path, version, expected_sha256, trusted_sha256, report)
+            if self._cancel.is_set():
+                report("error", "Cancelled")
+                return False
+            logger.info("Delta update unavailable, falling back to full download")
+            progress.stage = "download"
+
+        try:
+            digest = self._download_and_extract(url, part_path, staging_path, progress, report)
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            # Keep the partial archive so the next attempt resumes
+            logger.error(f"Update download interrupted: {e}")
+            self._discard(staging_path)
+            report("error", f"Download failed: {e}")
+            return False
+        except Exception as e:
+            logger.error(f"Update archive unusable: {e}")
+            self._discard(staging_path, part_path)
+            report("error", f"Download failed: {e}")
+            return False
+
+        if digest is None:
+            self._discard(staging_path)
+            report("error", "Cancelled" if self._cancel.is_set() else f"{self._binary_name} not found in archive")
+            return False
+
+        report("verify", "Verifying")
+        if digest.lower() != expected_sha256.strip().lower():
+            logger.error(f"Archive hash mismatch: expected {expected_sha256}, got {digest}")
+            self._discard(staging_path, part_path)
+            report("error", "Hash mismatch, update discarded")
+            return False
+
+        binary_sha256 = self._digest(staging_path)
+        if not self._install(staging_path, version, expected_sha256, binary_sha256, report):
+            return False
+        # Vouches for delta patches that rebuild this release later
+        self._record_verified(version, binary_sha256)
+        self._discard(part_path)
+        return True
+
+    def _install(self, staging_path: Path, version: str, archive_sha256: str,
+                 binary_sha256: str, report) -> bool:
+        report("install", "Installing")
+        try:
+            if self._store is not None:
+                self._install_path = self._store.add(
+                    version, staging_path, archive_sha256=archive_sha256.strip().lower(),
+                    binary_sha256=binary_sha256,
+                )
+            else:
+                staging_path.chmod(0o755)
+                os.replace(staging_path, self._install_path)
+        except (OSError, ValueError) as e:
+            logger.error(f"Failed to install update: {e}")
+            self._discard(staging_path)
+            report("error", f"Install failed: {e}")
+            return False
+
+        logger.info(f"Installed monerod v{version} at {self._install_path}")
+        report("done", f"Installed v{version}")
+        return True
+
+    def _apply_delta(self, from_version: str, version: str, expected_sha256: str, trusted_sha256: str,
+                     staging_path: Path, progress: UpdateProgress, report) -> bool:
+        """Build staging_path from the installed binary and a patch. Never raises.
+
+        The result must hash to trusted_sha256 (trusted_binary_sha256()), not
+        just to what the delta manifest claims.
+        """
+        patch_path = None
+        try:
+            entry = self._fetch_delta_entry(from_version, version, expected_sha256)
+            if entry is None:
+                return False
+            patch, binary_sha256 = entry
+            if binary_sha256 != trusted_sha256:
+                logger.warning("Delta manifest binary hash differs from the verified one, ignoring it")
+                return False
+
+            from_sha256 = patch.get("from_sha256", "").lower()
+            if from_sha256 and self._digest(self._install_path) != from_sha256:
+                logger.info("Installed binary does not match the patch base, skipping delta")
+                return False
+
+            patch_path = self._work_dir / f"monerod-{self._platform}-v{from_version}-v{version}.bsdiff.part"
+            report("download", "Downloading patch")
+            patch_digest = self._download(patch["url"], patch_path, progress, report)
+            if patch_digest is None:
+                return False
+            if patch.get("sha256") and patch_digest != patch["sha256"].lower():
+                logger.error("Delta patch hash mismatch")
+                self._discard(patch_path)
+                return False
+
+            report("patch", "Applying patch")
+            with open(staging_path, "wb") as out:
+                digest = DeltaPatcher().apply(self._install_path, patch_path, out)
+                out.flush()
+                os.fsync(out.fileno())
+
+            report("verify", "Verifying")
+            if digest != trusted_sha256:
+                logger.error(f"Patched binary hash mismatch: expected {trusted_sha256}, got {digest}")
+                self._discard(staging_path, patch_path)
+                return False
+
+            self._discard(patch_path)
+            logger.info(f"Built monerod v{version} from v{from_version} with a delta patch")
+            return True
+        except (urllib.error.URLError, TimeoutError, ConnectionError) as e:
+            # Keep the partial patch so the next attempt resumes
+            logger.warning(f"Delta download interrupted: {e}")
+            self._discard(staging_path)
+        except (PatchError, OSError, AttributeError, KeyError, TypeError, ValueError) as e:
+            logger.warning(f"Delta update failed: {e}")
+            self._discard(staging_path, *([patch_path] if patch_path else []))
+        return False
+
+    def _fetch_delta_entry(self, from_version: str, version: str,
+                           expected_sha256: str) -> Optional[tuple[dict, str]]:
+        """Return (patch entry, target binary sha256) if a usable patch is published."""
+        url = self.delta_manifest_url(version)
+        try:
+            with self._open(url, 0) as response:
+                manifest = json.loads(response.read(self.MANIFEST_MAX_SIZE + 1)[:self.MANIFEST_MAX_SIZE])
+        except urllib.error.HTTPError as e:
+            logger.info(f"No delta manifest for v{version} ({e.code})")
+            return None
+
+        if manifest.get("archive_sha256", "").lower() != expected_sha256.strip().lower():
+            logger.warning("Delta manifest does not match the published release hash, ignoring it")
+            return None
+
+        binary_sha256 = manifest.get("binary_sha256", "").lower()
+        patch = manifest.get("patches", {}).get(from_version)
+        if not binary_sha256 or not patch or not patch.get("url"):
+            logger.info(f"No delta patch from v{from_version} to v{version}")
+            return None
+        return patch, binary_sha256
+
+    @classmethod
+    def _digest(cls, path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.hexdigest()
+
+    def _open(self, url: str, offset: int):
+        headers = {"User-Agent": "monerodui"}
+        if offset:
+            headers["Range"] = f"bytes={offset}-"
+        return urllib.request.urlopen(urllib.request.Request(url, headers=headers), timeout=self.TIMEOUT)
+
+    def _open_resumable(self, url: str, part_path: Path, progress: UpdateProgress):
+        """Open url, resuming after part_path if possible. Returns (response, offset, length)."""
+        offset = part_path.stat().st_size if part_path.exists() else 0
+        try:
+            response = self._open(url, offset)
+        except urllib.error.HTTPError as e:
+            if e.code != 416 or not offset:
+                raise
+            # Range not satisfiable: stale partial file, start over
+            part_path.unlink()
+            offset = 0
+            response = self._open(url, 0)
+
+        if offset and response.status != 206:
+            logger.info("Server ignored Range request, restarting download")
+            offset = 0
+        length = int(response.headers.get("Content-Length") or 0)
+        progress.total = offset + length if length else 0
+        progress.downloaded = 0
+        logger.info(f"Downloading {url} (resume at {offset} bytes)")
+        return response, offset, length
+
+    def _progress_hook(self, progress: UpdateProgress, report) -> Callable[[int], None]:
+        """Per-read callback: checks for cancel every read, reports only on visible change."""
+        last_percent = -1
+        last_report = 0.0
+
+        def on_bytes(n: int):
+            nonlocal last_percent, last_report
+            if self._cancel.is_set():
+                raise InterruptedError("Update cancelled")
+            progress.downloaded += n
+            percent = int(progress.fraction * 100) if progress.total else -1
+            now = time.monotonic()
+            if percent != last_percent or now - last_report >= self.REPORT_INTERVAL:
+                last_percent = percent
+                last_report = now
+                report()
+        return on_bytes
+
+    def _download(self, url: str, part_path: Path, progress: UpdateProgress, report) -> Optional[str]:
+        """Download url into part_path (resuming) and return its SHA-256, None if cancelled."""
+        response, offset, length = self._open_resumable(url, part_path, progress)
+        with response, open(part_path, "ab" if offset else "wb") as part_file:
+            reader = _HashingReader(part_path, offset, response, length, part_file,
+                                    self._progress_hook(progress, report))
+            buffer = bytearray(self.CHUNK_SIZE)
+            try:
+                while reader.readinto(buffer):
+                    pass
+            except InterruptedError:
+                return None
+            finally:
+                part_file.flush()
+                reader.close()
+        return reader.sha256.hexdigest()
+
+    def _download_and_extract(self, url, part_path: Path, staging_path: Path,
+                              progress: UpdateProgress, report) -> Optional[str]:
+        response, offset, length = self._open_resumable(url, part_path, progress)
+        with response:
+            on_bytes = self._progress_hook(progress, report)
+
+            with open(part_path, "ab" if offset else "wb") as part_file:
+                reader = _HashingReader(part_path, offset, response, length, part_file, on_bytes)
+                stream = io.BufferedReader(reader, self.CHUNK_SIZE)
+                found = False
+                try:
+                    with tarfile.open(fileobj=stream, mode="r|bz2") as archive:
+                        for member in archive:
+                            if found or not member.isfile():
+                                continue
+                            if Path(member.name).name != self._binary_name:
+                                continue
+                            source = archive.extractfile(member)
+                            with open(staging_path, "wb") as out:
+                                while True:
+                                    chunk = source.read(self.CHUNK_SIZE)
+                                    if not chunk:
+                                        break
+                                    out.write(chunk)
+                                out.flush()
+                                os.fsync(out.fileno())
+                            found = True
+                    # Hash whatever the archive reader left unread (tar padding)
+                    while stream.read(self.CHUNK_SIZE):
+                        pass
+                except InterruptedError:
+                    return None
+                finally:
+                    part_file.flush()
+                    reader.close()
+
+        return reader.sha256.hexdigest() if found else None
+
+    @staticmethod
+    def _discard(*paths: Path):
+        for path in paths:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Could not remove {path}: {e}")
@@ -0,0 +1,96 @@
+"""Minimal client for monerod's RPC interface."""
+
+import json
+import logging
+import urllib.request
+import urllib.error
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class DaemonRPC:
+    """JSON-RPC (/json_rpc) and plain JSON endpoints (/stop_daemon, /set_limit...).
+
+    Calls return the decoded result, or None when monerod is unreachable or
+    answers with garbage; callers treat None as "not available". login is
+    monerod's --rpc-login "user:password" (HTTP digest auth).
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 18081, login: str = "", timeout: float = 10):
+        self.host = host
+        self.port = port
+        self.timeout = timeout
+        self._opener = urllib.request.build_opener()
+        if login and ":" in login:
+            user, password = login.split(":", 1)
+            passwords = urllib.request.HTTPPasswordMgrWithDefaultRealm()
+            passwords.add_password(None, self.base_url, user, password)
+            self._opener = urllib.request.build_opener(urllib.request.HTTPDigestAuthHandler(passwords))
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _request(self, endpoint: str, payload: Optional[dict] = None, timeout: Optional[float] = None):
+        url = f"{self.base_url}/{endpoint}"
+        data = json.dumps(payload).encode("utf-8") if payload is not None else None
+        req = urllib.request.Request(url, data=data, headers={"Content-Type": "application/json"})
+        try:
+            with self._opener.open(req, timeout=timeout or self.timeout) as resp:
+                return json.loads(resp.read().decode("utf-8"))
+        except urllib.error.URLError as e:
+            logger.debug(f"RPC connection error for {endpoint}: {e}")
+            return None
+        except (TimeoutError, ConnectionError) as e:
+            logger.debug(f"RPC error for {endpoint}: {e}")
+            return None
+        except json.JSONDecodeError as e:
+            logger.warning(f"Invalid JSON response from {endpoint}: {e}")
+            return None
+
+    def json_rpc(self, method: str, params: Optional[dict] = None) -> Optional[dict]:
+        payload = {"jsonrpc": "2.0", "id": "0", "method": method}
+        if params:
+            payload["params"] = params
+        result = self._request("json_rpc", payload)
+        return result.get("result") if isinstance(result, dict) else None
+
+    def call(self, endpoint: str, payload: Optional[dict] = None, timeout: Optional[float] = None) -> Optional[dict]:
+        """A plain JSON endpoint; POSTs payload when given, else GETs."""
+        result = self._request(endpoint, payload, timeout)
+        return result if isinstance(result, dict) else None
+
+    @staticmethod
+    def ok(result: Optional[dict]) -> bool:
+        return bool(result) and result.get("status") == "OK"
+
+    def stop_daemon(self) -> bool:
+        """Ask monerod to shut down cleanly. False if RPC is unreachable or refused (restricted)."""
+        return self.ok(self.call("stop_daemon", {}, timeout=5))
+
+    def set_limit(self, limit_up: int = 0, limit_down: int = 0) -> Optional[dict]:
+        """Bandwidth limits in kB/s (0 keeps, -1 resets to default). Returns the limits now in force."""
+        result = self.call("set_limit", {"limit_up": limit_up, "limit_down": limit_down})
+        return result if self.ok(result) else None
+
+    def get_limit(self) -> Optional[dict]:
+        result = self.call("get_limit")
+        return result if self.ok(result) else None
+
+    def out_peers(self, count: int) -> Optional[int]:
+        """Set the outgoing peer limit; returns the limit monerod reports."""
+        result = self.call("out_peers", {"set": True, "out_peers": count})
+        return result.get("out_peers", count) if self.ok(result) else None
+
+    def in_peers(self, count: int) -> Optional[int]:
+        """Set the incoming peer limit; returns the limit monerod reports."""
+        result = self.call("in_peers", {"set": True, "in_peers": count})
+        return result.get("in_peers", count) if self.ok(result) else None
+
+    def set_log_level(self, level: int) -> bool:
+        return self.ok(self.call("set_log_level", {"level": level}))
+
+    def set_log_categories(self, categories: str) -> Optional[str]:
+        result = self.call("set_log_categories", {"categories": categories})
+        return result.get("categories", categories) if self.ok(result) else None
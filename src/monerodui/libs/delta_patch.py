@@ -0,0 +1,154 @@
+"""Streaming application of bsdiff (BSDIFF40) binary patches."""
+
+import bz2
+import re
+import hashlib
+import logging
+import struct
+from pathlib import Path
+from typing import BinaryIO
+
+logger = logging.getLogger(__name__)
+
+
+class PatchError(Exception):
+    """Raised when a patch is malformed or does not fit the old file."""
+
+
+class _Bz2Section:
+    """Decompresses one bzip2 section of the patch file, bounded by its length."""
+
+    READ_SIZE = 64 * 1024
+
+    def __init__(self, path: Path, offset: int, length: int):
+        self._file = open(path, "rb")
+        self._file.seek(offset)
+        self._left = length
+        self._decompressor = bz2.BZ2Decompressor()
+        self._pending = b""
+
+    def read(self, size: int) -> bytes:
+        out = bytearray()
+        while len(out) < size:
+            if self._pending:
+                take = self._pending[:size - len(out)]
+                self._pending = self._pending[len(take):]
+                out += take
+                continue
+            if self._decompressor.eof:
+                break
+            if self._decompressor.needs_input:
+                if self._left <= 0:
+                    break
+                data = self._file.read(min(self.READ_SIZE, self._left))
+                if not data:
+                    break
+                self._left -= len(data)
+            else:
+                data = b""
+            self._pending = self._decompressor.decompress(data, max_length=size - len(out))
+        return bytes(out)
+
+    def read_exact(self, size: int) -> bytes:
+        data = self.read(size)
+        if len(data) != size:
+            raise PatchError("Patch section truncated")
+        return data
+
+    def close(self):
+        self._file.close()
+
+
+class DeltaPatcher:
+    """Applies BSDIFF40 patches without loading either binary into memory.
+
+    The old file is read through seeks driven by the control stream and the
+    new file is written sequentially, so memory use is bounded by CHUNK_SIZE.
+    """
+
+    MAGIC = b"BSDIFF40"
+    HEADER = struct.Struct("<8s8s8s8s")
+    CHUNK_SIZE = 1024 * 1024
+    _NONZERO = re.compile(rb"[^\x00]+")
+
+    @staticmethod
+    def _offtin(buf: bytes) -> int:
+        """bsdiff's sign-magnitude little-endian 64-bit integer."""
+        value = int.from_bytes(buf, "little")
+        if value & (1 << 63):
+            return -(value & ~(1 << 63))
+        return value
+
+    def apply(self, old_path: Path, patch_path: Path, out: BinaryIO) -> str:
+        """Write the patched file to out and return its SHA-256."""
+        with open(patch_path, "rb") as f:
+            header = f.read(self.HEADER.size)
+        if len(header) != self.HEADER.size:
+            raise PatchError("Patch header truncated")
+        magic, ctrl_raw, diff_raw, new_raw = self.HEADER.unpack(header)
+        if magic != self.MAGIC:
+            raise PatchError("Not a BSDIFF40 patch")
+        ctrl_len, diff_len, new_size = (self._offtin(v) for v in (ctrl_raw, diff_raw, new_raw))
+        if ctrl_len < 0 or diff_len < 0 or new_size < 0:
+            raise PatchError("Corrupt patch header")
+
+        base = self.HEADER.size
+        patch_size = Path(patch_path).stat().st_size
+        ctrl = _Bz2Section(patch_path, base, ctrl_len)
+        diff = _Bz2Section(patch_path, base + ctrl_len, diff_len)
+        extra = _Bz2Section(patch_path, base + ctrl_len + diff_len,
+                            patch_size - base - ctrl_len - diff_len)
+        digest = hashlib.sha256()
+
+        try:
+            with open(old_path, "rb") as old:
+                old_size = old.seek(0, 2)
+                old_pos = new_pos = 0
+                while new_pos < new_size:
+                    add_len, copy_len, seek_by = (
+                        self._offtin(ctrl.read_exact(8)) for _ in range(3)
+                    )
+                    if add_len < 0 or copy_len < 0 or new_pos + add_len + copy_len > new_size:
+                        raise PatchError("Corrupt control block")
+
+                    remaining = add_len
+                    while remaining:
+                        n = min(self.CHUNK_SIZE, remaining)
+                        chunk = self._add_old(old, old_size, old_pos, diff.read_exact(n))
+                        out.write(chunk)
+                        digest.update(chunk)
+                        old_pos += n
+                        remaining -= n
+                    new_pos += add_len
+
+                    remaining = copy_len
+                    while remaining:
+                        n = min(self.CHUNK_SIZE, remaining)
+                        chunk = extra.read_exact(n)
+                        out.write(chunk)
+                        digest.update(chunk)
+                        remaining -= n
+                    new_pos += copy_len
+                    old_pos += seek_by
+        finally:
+            for section in (ctrl, diff, extra):
+                section.close()
+
+        return digest.hexdigest()
+
+    def _add_old(self, old: BinaryIO, old_size: int, old_pos: int, diff_chunk: bytes) -> bytes:
+        """new[i] = diff[i] + old[old_pos + i] (mod 256), old bytes outside the file count as 0."""
+        n = len(diff_chunk)
+        start = max(0, old_pos)
+        end = min(old_size, old_pos + n)
+        if end <= start:
+            return diff_chunk
+
+        old.seek(start)
+        result = bytearray(start - old_pos) + bytearray(old.read(end - start))
+        result += bytes(n - len(result))
+        # bsdiff diff blocks are mostly zero; only touch the non-zero runs
+        for match in self._NONZERO.finditer(diff_chunk):
+            i, j = match.span()
+            result[i:j] = bytes((a + b) & 0xFF for a, b in zip(result[i:j], diff_chunk[i:j]))
+        return bytes(result)
@@ -0,0 +1,138 @@
+"""Parallel startup probes with declared dependencies."""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class InitStep:
+    """A single startup probe."""
+    name: str
+    func: Callable[[dict], Any]
+    depends: tuple[str, ...] = ()
+    result: Any = None
+    error: Optional[BaseException] = None
+    done: bool = False
+
+
+class InitPipeline:
+    """Runs startup steps on background workers as their dependencies finish.
+
+    Each step function receives a dict with the results of the steps it
+    depends on. Steps whose dependencies failed are skipped and reported
+    with an error. Callbacks are invoked from worker threads.
+    """
+
+    def __init__(self, max_workers: int = 4):
+        self._steps: dict[str, InitStep] = {}
+        self._max_workers = max_workers
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._remaining = 0
+        self._on_step_done: Optional[Callable[[str, Any, Optional[BaseException]], None]] = None
+        self._on_complete: Optional[Callable[[dict], None]] = None
+
+    def add_step(self, name: str, func: Callable[[dict], Any], depends: tuple[str, ...] = ()):
+        if name in self._steps:
+            raise ValueError(f"Duplicate init step: {name}")
+        self._steps[name] = InitStep(name=name, func=func, depends=tuple(depends))
+
+    def _validate(self):
+        for step in self._steps.values():
+            for dep in step.depends:
+                if dep not in self._steps:
+                    raise ValueError(f"Step '{step.name}' depends on unknown step '{dep}'")
+
+        visiting, visited = set(), set()
+
+        def visit(name):
+            if name in visited:
+                return
+            if name in visiting:
+                raise ValueError(f"Dependency cycle at step '{name}'")
+            visiting.add(name)
+            for dep in self._steps[name].depends:
+                visit(dep)
+            visiting.discard(name)
+            visited.add(name)
+
+        for name in self._steps:
+            visit(name)
+
+    def run(
+        self,
+        on_step_done: Optional[Callable[[str, Any, Optional[BaseException]], None]] = None,
+        on_complete: Optional[Callable[[dict], None]] = None,
+    ):
+        """Start all steps; returns immediately."""
+        self._validate()
+        self._on_step_done = on_step_done
+        self._on_complete = on_complete
+        self._remaining = len(self._steps)
+
+        if not self._steps:
+            if on_complete:
+                on_complete({})
+            return
+
+        self._executor = ThreadPoolExecutor(
+            max_workers=self._max_workers, thread_name_prefix="init"
+        )
+
+        with self._lock:
+            ready = [s for s in self._steps.values() if not s.depends]
+        for step in ready:
+            self._executor.submit(self._run_step, step)
+
+    def _run_step(self, step: InitStep):
+        deps = {name: self._steps[name].result for name in step.depends}
+        failed = [name for name in step.depends if self._steps[name].error is not None]
+
+        if failed:
+            step.error = RuntimeError(f"Skipped, dependency failed: {', '.join(failed)}")
+        else:
+            try:
+                step.result = step.func(deps)
+            except Exception as e:
+                logger.error(f"Init step '{step.name}' failed: {e}", exc_info=True)
+                step.error = e
+
+        self._finish(step)
+
+    def _finish(self, step: InitStep):
+        if self._on_step_done:
+            try:
+                self._on_step_done(step.name, step.result, step.error)
+            except Exception as e:
+                logger.error(f"Init step callback failed for '{step.name}': {e}")
+
+        with self._lock:
+            step.done = True
+            self._remaining -= 1
+            finished = self._remaining == 0
+            ready = [
+                s for s in self._steps.values()
+                if not s.done and s.depends and step.name in s.depends
+                and all(self._steps[d].done for d in s.depends)
+            ]
+
+        for dependent in ready:
+            self._executor.submit(self._run_step, dependent)
+
+        if finished:
+            self._executor.shutdown(wait=False)
+            if self._on_complete:
+                self._on_complete(self.results)
+
+    @property
+    def results(self) -> dict:
+        return {name: step.result for name, step in self._steps.items()}
+
+    @property
+    def errors(self) -> dict:
+        return {name: step.error for name, step in self._steps.items() if step.error}
@@ -0,0 +1,73 @@
+"""Small on-disk JSON caches with atomic writes."""
+
+import json
+import os
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class JsonCache:
+    """A JSON document persisted next to the app data, replaced atomically."""
+
+    def __init__(self, path: Optional[Path]):
+        self.path = Path(path) if path else None
+        self._lock = threading.RLock()
+
+    @property
+    def enabled(self) -> bool:
+        return self.path is not None
+
+    def load(self) -> dict:
+        """Return the cached document, or an empty dict if missing or corrupt."""
+        if self.path is None:
+            return {}
+        with self._lock:
+            try:
+                with open(self.path, "r", encoding="utf-8") as f:
+                    data = json.load(f)
+                return data if isinstance(data, dict) else {}
+            except FileNotFoundError:
+                return {}
+            except (OSError, ValueError) as e:
+                logger.warning(f"Discarding unreadable cache {self.path}: {e}")
+                return {}
+
+    def save(self, data: dict) -> bool:
+        if self.path is None:
+            return False
+        with self._lock:
+            tmp_path = self.path.with_name(f".{self.path.name}.{os.getpid()}.tmp")
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                with open(tmp_path, "w", encoding="utf-8") as f:
+                    json.dump(data, f, separators=(",", ":"))
+                os.replace(tmp_path, self.path)
+                return True
+            except (OSError, TypeError, ValueError) as e:
+                logger.warning(f"Failed to write cache {self.path}: {e}")
+                try:
+                    tmp_path.unlink()
+                except OSError:
+                    pass
+                return False
+
+    def update(self, key: str, value) -> bool:
+        with self._lock:
+            data = self.load()
+            data[key] = value
+            return self.save(data)
+
+    def clear(self):
+        if self.path is None:
+            return
+        with self._lock:
+            try:
+                self.path.unlink()
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                logger.warning(f"Failed to remove cache {self.path}: {e}")
@@ -0,0 +1,559 @@
+"""monerod launch configuration compiled from the app's ini file."""
+
+import os
+import hashlib
+import logging
+import configparser
+from dataclasses import dataclass, asdict, replace
+from pathlib import Path
+from typing import Callable, Optional
+
+from .json_cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+# Defaults the command line depends on, for an ini written before a key existed
+# (mirrors build_config)
+FALLBACKS = {
+    ("network", "network_type"): "mainnet",
+    ("network", "sync_pruned_blocks"): "1",
+    ("rpc", "bind_ip"): "127.0.0.1",
+    ("rpc", "bind_port"): "18081",
+    ("zmq", "bind_ip"): "127.0.0.1",
+    ("zmq", "bind_port"): "18082",
+    ("blockchain", "prune"): "1",
+    ("blockchain", "fast_block_sync"): "1",
+    ("blockchain", "db_sync_mode"): "fast:async:250000000bytes",
+    ("dns", "check_updates"): "notify",
+    ("nat", "igd"): "delayed",
+    ("logging", "level"): "0",
+    ("logging", "forward_output"): "1",
+    ("runtime", "restart_policy"): "on-failure",
+}
+
+# Settings monerod can take while running (through RPC); everything else the
+# spec reads needs a restart
+HOT_KEYS = frozenset({
+    ("bandwidth", "limit_rate_up"),
+    ("bandwidth", "limit_rate_down"),
+    ("p2p", "out_peers"),
+    ("p2p", "in_peers"),
+    ("logging", "level"),
+})
+
+
+@dataclass(frozen=True)
+class LaunchSpec:
+    """Everything needed to start monerod, compiled once from the settings.
+
+    settings holds every (section, key, value) the compilation read, which
+    is what changes_from() compares.
+    """
+    binary: str
+    args: tuple[str, ...]
+    data_dir: str
+    rpc_host: str
+    rpc_port: int
+    rpc_login: str
+    forward_output: bool
+    discard_stdout: bool
+    restart_policy: str
+    settings: tuple[tuple[str, str, str], ...]
+
+    @property
+    def binary_path(self) -> Optional[Path]:
+        return Path(self.binary) if self.binary else None
+
+    def with_binary(self, binary) -> "LaunchSpec":
+        return replace(self, binary=str(binary or ""))
+
+    def with_values(self, other: "LaunchSpec", keys) -> "LaunchSpec":
+        """This spec with other's values for keys, e.g. after applying them live."""
+        theirs = {(s, k): v for s, k, v in other.settings}
+        merged = {(s, k): v for s, k, v in self.settings}
+        merged.update({key: theirs[key] for key in keys if key in theirs})
+        return replace(self, settings=tuple(sorted((s, k, v) for (s, k), v in merged.items())))
+
+    def changes_from(self, old: Optional["LaunchSpec"]) -> tuple[set, set]:
+        """(keys needing a restart, keys that can be applied live) that differ from old.
+
+        Keys are (section, key) pairs; a changed binary counts as ("binary", "").
+        """
+        if old is None:
+            return set(), set()
+        before = {(s, k): v for s, k, v in old.settings}
+        after = {(s, k): v for s, k, v in self.settings}
+        changed = {key for key in before.keys() | after.keys() if before.get(key) != after.get(key)}
+        if old.binary != self.binary:
+            changed.add(("binary", ""))
+        return changed - HOT_KEYS, changed & HOT_KEYS
+
+    @classmethod
+    def compile(cls, config, binary: Optional[Path] = None,
+                default_data_dir: Optional[Path] = None) -> "LaunchSpec":
+        """Compile config (a ConfigParser, Kivy's included) into a LaunchSpec."""
+        reader = _Reader(config, FALLBACKS)
+
+        def get(section: str, key: str) -> str:
+            value = reader.get(section, key)
+            if (section, key) == ("advanced", "data_dir") and not value and default_data_dir:
+                value = reader.read[(section, key)] = str(default_data_dir)
+            return value
+
+        args = build_args(get)
+        rpc_host = get("rpc", "bind_ip") or "127.0.0.1"
+        if rpc_host in ("0.0.0.0", "::"):
+            rpc_host = "127.0.0.1"
+        try:
+            rpc_port = int(get("rpc", "bind_port") or 18081)
+        except ValueError:
+            rpc_port = 18081
+
+        return cls(
+            binary=str(binary or ""),
+            args=tuple(args),
+            data_dir=get("advanced", "data_dir"),
+            rpc_host=rpc_host,
+            rpc_port=rpc_port,
+            rpc_login=get("rpc", "login"),
+            forward_output=get("logging", "forward_output") == "1",
+            discard_stdout=get("logging", "discard_stdout") == "1",
+            restart_policy=get("runtime", "restart_policy"),
+            settings=tuple(sorted((s, k, v) for (s, k), v in reader.read.items())),
+        )
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "LaunchSpec":
+        data = dict(data)
+        data["args"] = tuple(data["args"])
+        data["settings"] = tuple(tuple(s) for s in data["settings"])
+        return cls(**data)
+
+
+class _Reader:
+    """config.get that records what was read."""
+
+    def __init__(self, config, fallbacks: dict):
+        self._config = config
+        self._fallbacks = fallbacks
+        self.read: dict[tuple[str, str], str] = {}
+
+    def get(self, section: str, key: str) -> str:
+        fallback = self._fallbacks.get((section, key), "")
+        try:
+            value = self._config.get(section, key, fallback=fallback)
+        except (configparser.Error, ValueError):
+            value = fallback
+        value = fallback if value is None else str(value)
+        self.read[(section, key)] = value
+        return value
+
+
+def build_args(get: Callable[[str, str], str]) -> list[str]:
+    """Translate settings into monerod command-line arguments."""
+    args = []
+    
+    
+    args.append("--non-interactive")
+    
+    net_type = get("network", "network_type")
+    if net_type == "testnet":
+        args.append("--testnet")
+    elif net_type == "stagenet":
+        args.append("--stagenet")
+        
+    if get("network", "offline") == "1":
+        args.append("--offline")
+    if get("network", "no_sync") == "1":
+        args.append("--no-sync")
+    if get("network", "public_node") == "1":
+        args.append("--public-node")
+    if get("network", "sync_pruned_blocks") == "1":
+        args.append("--sync-pruned-blocks")
+    if get("network", "pad_transactions") == "1":
+        args.append("--pad-transactions")
+
+    bind_ip = get("p2p", "bind_ip")
+    if bind_ip and bind_ip != "0.0.0.0":
+        args.extend(["--p2p-bind-ip", bind_ip])
+        
+    bind_port = get("p2p", "bind_port")
+    if bind_port and bind_port != "18080":
+        args.extend(["--p2p-bind-port", bind_port])
+        
+    if get("p2p", "use_ipv6") == "1":
+        args.append("--p2p-use-ipv6")
+        
+    ext_port = get("p2p", "external_port")
+    if ext_port and ext_port != "0":
+        args.extend(["--p2p-external-port", ext_port])
+        
+    out_peers = get("p2p", "out_peers")
+    if out_peers and out_peers != "-1":
+        args.extend(["--out-peers", out_peers])
+        
+    in_peers = get("p2p", "in_peers")
+    if in_peers and in_peers != "-1":
+        args.extend(["--in-peers", in_peers])
+        
+    max_conns = get("p2p", "max_connections_per_ip")
+    if max_conns and max_conns != "1":
+        args.extend(["--max-connections-per-ip", max_conns])
+        
+    if get("p2p", "hide_my_port") == "1":
+        args.append("--hide-my-port")
+    if get("p2p", "allow_local_ip") == "1":
+        args.append("--allow-local-ip")
+        
+    priority_nodes = get("p2p", "priority_nodes")
+    if priority_nodes:
+        for node in priority_nodes.split(","):
+            if node.strip():
+                args.extend(["--add-priority-node", node.strip()])
+                
+    exclusive_nodes = get("p2p", "exclusive_nodes")
+    if exclusive_nodes:
+        for node in exclusive_nodes.split(","):
+            if node.strip():
+                args.extend(["--add-exclusive-node", node.strip()])
+                
+    seed_nodes = get("p2p", "seed_nodes")
+    if seed_nodes:
+        args.extend(["--seed-node", seed_nodes])
+        
+    ban_list = get("p2p", "ban_list")
+    if ban_list:
+        args.extend(["--ban-list", ban_list])
+
+    limit_up = get("bandwidth", "limit_rate_up")
+    if limit_up and limit_up != "8192":
+        args.extend(["--limit-rate-up", limit_up])
+        
+    limit_down = get("bandwidth", "limit_rate_down")
+    if limit_down and limit_down != "32768":
+        args.extend(["--limit-rate-down", limit_down])
+
+    rpc_bind_ip = get("rpc", "bind_ip")
+    if rpc_bind_ip:
+        args.extend(["--rpc-bind-ip", rpc_bind_ip])
+        
+    rpc_bind_port = get("rpc", "bind_port")
+    if rpc_bind_port:
+        args.extend(["--rpc-bind-port", rpc_bind_port])
+        
+    res_bind_ip = get("rpc", "restricted_bind_ip")
+    if res_bind_ip and res_bind_ip != "127.0.0.1":
+        args.extend(["--rpc-restricted-bind-ip", res_bind_ip])
+        
+    res_bind_port = get("rpc", "restricted_bind_port")
+    if res_bind_port and res_bind_port != "0":
+        args.extend(["--rpc-restricted-bind-port", res_bind_port])
+        
+    if get("rpc", "restricted") == "1":
+        args.append("--restricted-rpc")
+    if get("rpc", "use_ipv6") == "1":
+        args.append("--rpc-use-ipv6")
+        
+    rpc_login = get("rpc", "login")
+    if rpc_login:
+        args.extend(["--rpc-login", rpc_login])
+        
+    if get("rpc", "confirm_external_bind") == "1":
+        args.append("--confirm-external-bind")
+        
+    cors = get("rpc", "access_control_origins")
+    if cors:
+        args.extend(["--rpc-access-control-origins", cors])
+        
+    if get("rpc", "disable_ban") == "1":
+        args.append("--disable-rpc-ban")
+
+    ssl_mode = get("rpcssl", "mode")
+    if ssl_mode == "enabled":
+        args.extend(["--rpc-ssl", "enabled"])
+    elif ssl_mode == "disabled":
+        args.extend(["--rpc-ssl", "disabled"])
+    
+    ssl_key = get("rpcssl", "private_key")
+    if ssl_key:
+        args.extend(["--rpc-ssl-private-key", ssl_key])
+        
+    ssl_cert = get("rpcssl", "certificate")
+    if ssl_cert:
+        args.extend(["--rpc-ssl-certificate", ssl_cert])
+        
+    ca_certs = get("rpcssl", "ca_certificates")
+    if ca_certs:
+        args.extend(["--rpc-ssl-ca-certificates", ca_certs])
+        
+    if get("rpcssl", "allow_any_cert") == "1":
+        args.append("--rpc-ssl-allow-any-cert")
+    if get("rpcssl", "allow_chained") == "1":
+        args.append("--rpc-ssl-allow-chained")
+
+    if get("zmq", "disabled") == "1":
+        args.append("--no-zmq")
+    else:
+        zmq_ip = get("zmq", "bind_ip")
+        zmq_port = get("zmq", "bind_port")
+        if zmq_ip and zmq_port:
+            args.extend(["--zmq-rpc-bind-ip", zmq_ip, "--zmq-rpc-bind-port", zmq_port])
+        
+        zmq_pub = get("zmq", "pub")
+        if zmq_pub:
+            args.extend(["--zmq-pub", zmq_pub])
+
+    proxy = get("proxy", "address")
+    if proxy:
+        args.extend(["--proxy", proxy])
+        
+    if get("proxy", "allow_dns_leaks") == "1":
+        args.append("--allow-dns-leaks")
+        
+    tx_proxy = get("proxy", "tx_proxy")
+    if tx_proxy:
+        args.extend(["--tx-proxy", tx_proxy])
+        
+    anon_inbound = get("proxy", "anonymous_inbound")
+    if anon_inbound:
+        args.extend(["--anonymous-inbound", anon_inbound])
+
+    boot_addr = get("bootstrap", "address")
+    if boot_addr:
+        args.extend(["--bootstrap-daemon-address", boot_addr])
+        
+    boot_login = get("bootstrap", "login")
+    if boot_login:
+        args.extend(["--bootstrap-daemon-login", boot_login])
+        
+    boot_proxy = get("bootstrap", "proxy")
+    if boot_proxy:
+        args.extend(["--bootstrap-daemon-proxy", boot_proxy])
+
+    if get("blockchain", "prune") == "1":
+        args.append("--prune-blockchain")
+        
+    db_sync = get("blockchain", "db_sync_mode")
+    if db_sync:
+        args.extend(["--db-sync-mode", db_sync])
+        
+    if get("blockchain", "db_salvage") == "1":
+        args.append("--db-salvage")
+        
+    if get("blockchain", "fast_block_sync") == "1":
+        args.append("--fast-block-sync=1")
+    else:
+        args.append("--fast-block-sync=0")
+        
+    if get("blockchain", "keep_alt_blocks") == "1":
+        args.append("--keep-alt-blocks")
+        
+    max_txpool_weight = get("blockchain", "max_txpool_weight")
+    if max_txpool_weight and max_txpool_weight != "648000000":
+        args.extend(["--max-txpool-weight", max_txpool_weight])
+
+    if get("dns", "enforce_checkpoints") == "1":
+        args.append("--enforce-dns-checkpoints")
+    if get("dns", "disable_checkpoints") == "1":
+        args.append("--disable-dns-checkpoints")
+    if get("dns", "enable_blocklist") == "1":
+        args.append("--enable-dns-blocklist")
+    
+    check_updates = get("dns", "check_updates")
+    if check_updates:
+        args.extend(["--check-updates", check_updates])
+
+    igd = get("nat", "igd")
+    if igd:
+        args.extend(["--igd", igd])
+
+    mine_addr = get("mining", "address")
+    mine_threads = get("mining", "threads")
+    if mine_addr and mine_threads and mine_threads != "0":
+        args.extend(["--start-mining", mine_addr, "--mining-threads", mine_threads])
+        
+    if get("mining", "bg_enable") == "1":
+        args.append("--bg-mining-enable")
+    if get("mining", "bg_ignore_battery") == "1":
+        args.append("--bg-mining-ignore-battery")
+        
+    bg_threshold = get("mining", "bg_idle_threshold")
+    if bg_threshold and bg_threshold != "0":
+        args.extend(["--bg-mining-miner-target", bg_threshold])
+        
+    bg_target = get("mining", "bg_miner_target")
+    if bg_target and bg_target != "0":
+        args.extend(["--bg-mining-miner-target", bg_target])
+
+    log_level = get("logging", "level")
+    if log_level:
+        args.extend(["--log-level", log_level])
+        
+    max_log_size = get("logging", "max_file_size")
+    if max_log_size and max_log_size != "104850000":
+        args.extend(["--max-log-file-size", max_log_size])
+        
+    max_logs = get("logging", "max_files")
+    if max_logs and max_logs != "50":
+        args.extend(["--max-log-files", max_logs])
+        
+    prep_threads = get("performance", "prep_blocks_threads")
+    if prep_threads and prep_threads != "4":
+        args.extend(["--prep-blocks-threads", prep_threads])
+        
+    max_concurrency = get("performance", "max_concurrency")
+    if max_concurrency and max_concurrency != "0":
+        args.extend(["--max-concurrency", max_concurrency])
+
+    config_file = get("advanced", "config_file")
+    if config_file:
+        args.extend(["--config-file", config_file])
+        
+    data_dir = get("advanced", "data_dir")
+    if data_dir:
+        args.extend(["--data-dir", data_dir])
+        
+    extra_messages = get("advanced", "extra_messages_file")
+    if extra_messages:
+        args.extend(["--extra-messages-file", extra_messages])
+
+    extra_flags = get("runtime", "extra_flags")
+    if extra_flags:
+        args.extend(extra_flags.split())
+
+    return args
+
+
+def _compile_fingerprint(default_data_dir: Optional[Path]) -> str:
+    """Hash of everything besides the ini that goes into a spec.
+
+    A new app version that builds the args differently (or another default
+    data dir) must not reuse a spec compiled by the old one. The
+    translation and FALLBACKS live in this module, so its file stands in
+    for them (a .py, or the .pyc an APK ships).
+    """
+    digest = hashlib.sha256()
+    digest.update(f"{LaunchConfig.SPEC_FORMAT}:{default_data_dir or ''}".encode("utf-8"))
+    try:
+        digest.update(Path(__file__).read_bytes())
+    except OSError as e:
+        logger.debug(f"Cannot fingerprint {__file__}: {e}")
+    return digest.hexdigest()
+
+
+class LaunchConfig:
+    """A LaunchSpec for an ini file, recompiled only when the file changes.
+
+    The file's mtime and size are checked first; if they moved, its content
+    hash decides whether anything really changed. The compiled spec, the
+    stamp and the hash are kept in cache_path across processes, so a
+    boot-time start with an unchanged ini does not even read it. The cache
+    is keyed on the compile inputs too (SPEC_FORMAT, the translation code,
+    FALLBACKS, default_data_dir), so an app upgrade recompiles.
+    """
+
+    # Bump when LaunchSpec's fields change meaning
+    SPEC_FORMAT = 1
+
+    def __init__(self, ini_path: Path, cache_path: Optional[Path] = None,
+                 default_data_dir: Optional[Path] = None):
+        self._ini_path = Path(ini_path)
+        self._cache = JsonCache(cache_path)
+        self._default_data_dir = default_data_dir
+        self._fingerprint = _compile_fingerprint(default_data_dir)
+        self._spec: Optional[LaunchSpec] = None
+        self._stamp: Optional[tuple[int, int]] = None
+        self._hash: Optional[str] = None
+        self.changed_keys: tuple[set, set] = (set(), set())
+
+    @property
+    def spec(self) -> Optional[LaunchSpec]:
+        return self._spec
+
+    def load(self, binary: Optional[Path] = None) -> LaunchSpec:
+        """The current spec, compiling the ini only if it changed.
+
+        binary, when given, replaces the spec's binary (an updated release);
+        changed_keys holds what changed since the last load.
+        """
+        try:
+            st = os.stat(self._ini_path)
+            stamp = (st.st_mtime_ns, st.st_size)
+        except OSError:
+            stamp = None
+        
+        if self._spec is None and stamp is not None and self._load_stamped(stamp):
+            self.changed_keys = (set(), set())
+        elif self._spec is None or stamp != self._stamp:
+            previous = self._spec
+            self._stamp = stamp
+            self._spec = self._load_changed()
+            self.changed_keys = self._spec.changes_from(previous)
+        else:
+            self.changed_keys = (set(), set())
+        
+        if binary and str(binary) != self._spec.binary:
+            self._spec = self._spec.with_binary(binary)
+            self._save()
+        return self._spec
+
+    def _cached(self) -> dict:
+        cached = self._cache.load()
+        return cached if cached.get("fingerprint") == self._fingerprint else {}
+
+    def _load_stamped(self, stamp: tuple[int, int]) -> bool:
+        """Take the persisted spec without reading the ini if the ini's stamp is unchanged."""
+        cached = self._cached()
+        if cached.get("stamp") != list(stamp):
+            return False
+        try:
+            self._spec = LaunchSpec.from_dict(cached["spec"])
+        except (KeyError, TypeError) as e:
+            logger.debug(f"Discarding cached launch spec: {e}")
+            return False
+        self._hash = cached.get("hash")
+        self._stamp = stamp
+        return True
+
+    def _load_changed(self) -> LaunchSpec:
+        try:
+            content = self._ini_path.read_bytes()
+        except OSError:
+            logger.warning(f"Config file {self._ini_path} not readable, using defaults")
+            content = b""
+        digest = hashlib.sha256(content).hexdigest()
+        
+        if self._spec is not None and digest == self._hash:
+            self._save()  # Only the stamp moved
+            return self._spec
+        cached = self._cached()
+        if cached.get("hash") == digest:
+            try:
+                self._spec = LaunchSpec.from_dict(cached["spec"])
+                self._hash = digest
+                self._save()
+                return self._spec
+            except (KeyError, TypeError) as e:
+                logger.debug(f"Discarding cached launch spec: {e}")
+        
+        config = configparser.ConfigParser(interpolation=None)
+        try:
+            config.read_string(content.decode("utf-8", errors="replace"))
+        except configparser.Error as e:
+            logger.error(f"Cannot parse {self._ini_path}: {e}")
+        binary = self._spec.binary if self._spec else self._cache.load().get("spec", {}).get("binary", "")
+        spec = LaunchSpec.compile(config, Path(binary) if binary else None, self._default_data_dir)
+        self._hash = digest
+        self._spec = spec
+        self._save()
+        logger.info(f"Compiled launch spec from {self._ini_path}")
+        return spec
+
+    def _save(self):
+        if self._spec is not None:
+            self._cache.save({
+                "fingerprint": self._fingerprint,
+                "stamp": list(self._stamp) if self._stamp else None,
+                "hash": self._hash,
+                "spec": asdict(self._spec),
+            })
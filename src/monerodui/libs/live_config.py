@@ -0,0 +1,103 @@
+"""Applying settings to a running monerod through RPC instead of a restart."""
+
+import logging
+from dataclasses import dataclass, field
+
+from .daemon_rpc import DaemonRPC
+from .launch_config import LaunchSpec
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LiveResult:
+    """What apply() changed in the running daemon, as monerod confirmed it."""
+    keys: set = field(default_factory=set)
+    applied: list[str] = field(default_factory=list)
+    failed: list[str] = field(default_factory=list)
+
+    @property
+    def display_string(self) -> str:
+        parts = []
+        if self.applied:
+            parts.append("Applied: " + ", ".join(self.applied))
+        if self.failed:
+            parts.append("Not applied (restart needed): " + ", ".join(self.failed))
+        return " • ".join(parts)
+
+
+class LiveConfig:
+    """Pushes the live-applicable settings (launch_config.HOT_KEYS) of a spec to monerod.
+
+    Bandwidth goes through set_limit, peer limits through out_peers and
+    in_peers, the log level through set_log_level (set_log_categories for a
+    category string). "-1" means monerod's default, as on the command line.
+    """
+
+    DEFAULT_OUT_PEERS = 12
+    UNLIMITED_PEERS = 2 ** 32 - 1
+
+    def __init__(self, rpc: DaemonRPC):
+        self._rpc = rpc
+
+    def apply(self, spec: LaunchSpec, keys) -> LiveResult:
+        """Apply spec's values for keys ((section, key) pairs); others are ignored."""
+        values = {(s, k): v for s, k, v in spec.settings}
+        keys = set(keys)
+        result = LiveResult()
+
+        bandwidth = {("bandwidth", "limit_rate_up"), ("bandwidth", "limit_rate_down")}
+        if keys & bandwidth:
+            try:
+                up = self._int(values.get(("bandwidth", "limit_rate_up")), -1)
+                down = self._int(values.get(("bandwidth", "limit_rate_down")), -1)
+                limits = self._rpc.set_limit(up, down)
+            except ValueError:
+                limits = None
+            if limits:
+                result.keys |= keys & bandwidth
+                result.applied.append(f"limits ↑{limits.get('limit_up', up)} ↓{limits.get('limit_down', down)} kB/s")
+            else:
+                result.failed.append("bandwidth limits")
+
+        for key, label, default, setter in (
+            ("out_peers", "out peers", self.DEFAULT_OUT_PEERS, self._rpc.out_peers),
+            ("in_peers", "in peers", self.UNLIMITED_PEERS, self._rpc.in_peers),
+        ):
+            if ("p2p", key) not in keys:
+                continue
+            try:
+                count = self._int(values.get(("p2p", key)), default)
+                confirmed = setter(default if count < 0 else count)
+            except ValueError:
+                confirmed = None
+            if confirmed is not None:
+                result.keys.add(("p2p", key))
+                shown = "default" if confirmed >= self.UNLIMITED_PEERS else confirmed
+                result.applied.append(f"{label} {shown}")
+            else:
+                result.failed.append(label)
+
+        if ("logging", "level") in keys:
+            level = (values.get(("logging", "level")) or "0").strip()
+            if level.isdigit():
+                ok = self._rpc.set_log_level(int(level))
+            else:
+                ok = self._rpc.set_log_categories(level) is not None
+            if ok:
+                result.keys.add(("logging", "level"))
+                result.applied.append(f"log level {level}")
+            else:
+                result.failed.append("log level")
+
+        if result.keys:
+            logger.info(f"Applied live: {', '.join(result.applied)}")
+        if result.failed:
+            logger.warning(f"Could not apply live: {', '.join(result.failed)}")
+        return result
+
+    @staticmethod
+    def _int(value, default: int) -> int:
+        """int(value), default for an empty value; ValueError for garbage."""
+        value = (value or "").strip()
+        return int(value) if value else default
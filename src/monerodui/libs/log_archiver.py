@@ -0,0 +1,302 @@
+"""Compression and retention of rotated monerod logs."""
+
+import os
+import time
+import zlib
+import errno
+import fcntl
+import logging
+import threading
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Callable, Iterator, Optional
+
+from .json_cache import JsonCache
+from .log_index import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class ArchiveMember:
+    """One gzip member of an archived log: a run of complete lines."""
+    offset: int
+    length: int
+    line: int
+    timestamp: Optional[float]
+
+
+class ArchivedLog:
+    """Random access to a log compressed by LogArchiver.
+
+    The archive is a multi-member gzip file (plain gzip tools read it as
+    one stream). A hidden sidecar lists each member's compressed offset,
+    first line number and first timestamp, so readers decompress only the
+    members they need, in memory.
+    """
+
+    SUFFIX = ".gz"
+    READ_SIZE = 256 * 1024
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._members: Optional[list[ArchiveMember]] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @staticmethod
+    def sidecar_path(path: Path) -> Path:
+        path = Path(path)
+        return path.with_name(f".{path.name}.idx")
+
+    @property
+    def members(self) -> list[ArchiveMember]:
+        if self._members is None:
+            data = JsonCache(self.sidecar_path(self._path)).load()
+            try:
+                self._members = [ArchiveMember(*m) for m in data["members"]]
+            except (KeyError, TypeError):
+                logger.warning(f"Missing member index for {self._path}, rebuilding")
+                self._members = self._rebuild_members()
+        return self._members
+
+    def _rebuild_members(self) -> list[ArchiveMember]:
+        """Walk the members once, streaming (for archives whose sidecar was lost)."""
+        members = []
+        line = offset = 0
+        pending = b""
+        with open(self._path, "rb") as f:
+            while True:
+                if not pending:
+                    pending = f.read(self.READ_SIZE)
+                    if not pending:
+                        break
+                d = zlib.decompressobj(wbits=31)
+                start, head, lines = offset, b"", 0
+                while True:
+                    out = d.decompress(pending)
+                    head += out[:32 - len(head)]
+                    lines += out.count(b"\n")
+                    if d.eof:
+                        offset += len(pending) - len(d.unused_data)
+                        pending = d.unused_data
+                        break
+                    offset += len(pending)
+                    pending = f.read(self.READ_SIZE)
+                    if not pending:
+                        break
+                if not d.eof:
+                    logger.warning(f"Archive {self._path.name} is truncated")
+                    break
+                members.append(ArchiveMember(start, offset - start, line, parse_timestamp(head)))
+                line += lines
+        JsonCache(self.sidecar_path(self._path)).save(
+            {"members": [[m.offset, m.length, m.line, m.timestamp] for m in members]}
+        )
+        return members
+
+    def read_member(self, index: int) -> bytes:
+        member = self.members[index]
+        with open(self._path, "rb") as f:
+            f.seek(member.offset)
+            return zlib.decompress(f.read(member.length), wbits=31)
+
+    def member_range(self, start: Optional[float] = None, end: Optional[float] = None) -> range:
+        """Indexes of members that can hold lines stamped within [start, end]."""
+        members = self.members
+        first, last = 0, len(members)
+        for i, m in enumerate(members):
+            if start is not None and m.timestamp is not None and m.timestamp < start:
+                first = i
+            if end is not None and m.timestamp is not None and m.timestamp > end:
+                last = i
+                break
+        return range(first, max(first, last))
+
+    def iter_members(self, start: Optional[float] = None,
+                     end: Optional[float] = None) -> Iterator[tuple[ArchiveMember, bytes]]:
+        for i in self.member_range(start, end):
+            yield self.members[i], self.read_member(i)
+
+
+@dataclass
+class ArchiveReport:
+    """What one archiving pass did."""
+    compressed: list[str] = field(default_factory=list)
+    deleted: list[str] = field(default_factory=list)
+    bytes_before: int = 0
+    bytes_after: int = 0
+    bytes_deleted: int = 0
+
+    @property
+    def reclaimed(self) -> int:
+        return self.bytes_before - self.bytes_after + self.bytes_deleted
+
+    @property
+    def display_string(self) -> str:
+        return (f"Compressed {len(self.compressed)}, removed {len(self.deleted)} logs, "
+                f"freed {self.reclaimed / (1024 ** 2):.1f} MB")
+
+
+class LogArchiver:
+    """Low-priority worker that gzips rotated logs and enforces retention.
+
+    Rotated logs are monerod.log-* siblings of the live log. Each is
+    compressed into MEMBER_SIZE gzip members with an ArchivedLog sidecar,
+    then the oldest archives are deleted until the byte budget and age
+    limit hold. A lock file keeps two processes from archiving at once.
+    """
+
+    MEMBER_SIZE = 1024 * 1024
+    MIN_AGE = 60
+    LOCK_NAME = ".archive.lock"
+
+    def __init__(self, log_path: Path, max_bytes: int = 0, max_age_days: float = 0,
+                 on_report: Optional[Callable[[ArchiveReport], None]] = None,
+                 compresslevel: int = 6):
+        self._log_path = Path(log_path)
+        self._max_bytes = max_bytes
+        self._max_age = max_age_days * 86400
+        self._on_report = on_report
+        self._compresslevel = compresslevel
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, max_bytes: int, max_age_days: float):
+        self._max_bytes = max_bytes
+        self._max_age = max_age_days * 86400
+
+    def _rotated(self) -> list[Path]:
+        """Rotated logs (plain and archived), oldest first; never the live log."""
+        directory = self._log_path.parent
+        if not directory.is_dir():
+            return []
+        files = [
+            p for p in directory.glob(self._log_path.name + "-*")
+            if p.is_file() and not p.name.endswith(".tmp")
+        ]
+        return sorted(files, key=lambda p: p.stat().st_mtime)
+
+    def run_once(self) -> Optional[ArchiveReport]:
+        """One compress + retention pass. None if another process holds the lock."""
+        lock_path = self._log_path.parent / self.LOCK_NAME
+        try:
+            lock_fd = os.open(lock_path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError as e:
+            logger.warning(f"Cannot open archive lock: {e}")
+            return None
+        try:
+            try:
+                fcntl.flock(lock_fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError as e:
+                if e.errno in (errno.EAGAIN, errno.EWOULDBLOCK, errno.EACCES):
+                    return None
+                # Some shared-storage filesystems have no flock; go on without it
+                logger.debug(f"Archive lock unavailable: {e}")
+            report = ArchiveReport()
+            now = time.time()
+            for path in self._rotated():
+                if self._stop.is_set():
+                    break
+                if path.suffix == ArchivedLog.SUFFIX or now - path.stat().st_mtime < self.MIN_AGE:
+                    continue
+                self._compress(path, report)
+            self._enforce_retention(report, now)
+            return report
+        finally:
+            os.close(lock_fd)
+
+    def _compress(self, path: Path, report: ArchiveReport):
+        target = path.with_name(path.name + ArchivedLog.SUFFIX)
+        tmp = target.with_name(target.name + ".tmp")
+        members = []
+        try:
+            st = path.stat()
+            with open(path, "rb") as src, open(tmp, "wb") as dst:
+                line = 0
+                carry = b""
+                while not self._stop.is_set():
+                    chunk = src.read(self.MEMBER_SIZE)
+                    data = carry + chunk
+                    if not data:
+                        break
+                    cut = data.rfind(b"\n") + 1 if chunk else len(data)
+                    if cut == 0:
+                        cut = len(data)
+                    block, carry = data[:cut], data[cut:]
+                    compressor = zlib.compressobj(self._compresslevel, zlib.DEFLATED, 31)
+                    payload = compressor.compress(block) + compressor.flush()
+                    members.append([dst.tell(), len(payload), line, parse_timestamp(block[:32])])
+                    dst.write(payload)
+                    line += block.count(b"\n")
+                    # Let monerod and the UI have the disk between members
+                    time.sleep(0.005)
+                if self._stop.is_set():
+                    raise InterruptedError("Archiver stopped")
+                dst.flush()
+                os.fsync(dst.fileno())
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))
+            JsonCache(ArchivedLog.sidecar_path(target)).save({"members": members})
+            os.replace(tmp, target)
+            path.unlink()
+        except (OSError, InterruptedError) as e:
+            logger.warning(f"Could not compress {path.name}: {e}")
+            try:
+                tmp.unlink()
+            except OSError:
+                pass
+            return
+        report.compressed.append(path.name)
+        report.bytes_before += st.st_size
+        report.bytes_after += target.stat().st_size
+        logger.info(f"Compressed {path.name}: {st.st_size} -> {target.stat().st_size} bytes")
+
+    def _enforce_retention(self, report: ArchiveReport, now: float):
+        files = self._rotated()
+        total = sum(p.stat().st_size for p in files)
+        for path in files:
+            size = path.stat().st_size
+            too_old = self._max_age and now - path.stat().st_mtime > self._max_age
+            over_budget = self._max_bytes and total > self._max_bytes
+            if not (too_old or over_budget):
+                continue
+            try:
+                path.unlink()
+            except OSError as e:
+                logger.warning(f"Could not remove {path.name}: {e}")
+                continue
+            sidecar = ArchivedLog.sidecar_path(path)
+            if sidecar.exists():
+                sidecar.unlink()
+            total -= size
+            report.deleted.append(path.name)
+            report.bytes_deleted += size
+
+    def start(self, interval: float = 3600):
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, args=(interval,), daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+
+    def _loop(self, interval: float):
+        try:
+            # Lowest CPU priority for this thread only (Linux nice is per thread)
+            os.setpriority(os.PRIO_PROCESS, threading.get_native_id(), 19)
+        except (OSError, AttributeError) as e:
+            logger.debug(f"Could not lower archiver priority: {e}")
+        while not self._stop.is_set():
+            try:
+                report = self.run_once()
+                if report and (report.compressed or report.deleted):
+                    logger.info(f"Log archive pass: {report.display_string}")
+                    if self._on_report:
+                        self._on_report(report)
+            except Exception as e:
+                logger.error(f"Log archiving failed: {e}")
+            self._stop.wait(interval)
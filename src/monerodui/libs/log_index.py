@@ -0,0 +1,180 @@
+"""Sparse offset/timestamp index over monerod log files."""
+
+import os
+import re
+import mmap
+import bisect
+import calendar
+import logging
+import threading
+from pathlib import Path
+from typing import Optional
+
+from .json_cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+# monerod lines start with "2026-10-19 10:00:00.123"
+_TIMESTAMP = re.compile(rb"(\d{4})-(\d\d)-(\d\d) (\d\d):(\d\d):(\d\d)")
+
+
+def parse_timestamp(line: bytes) -> Optional[float]:
+    """Epoch seconds of a log line's leading timestamp (read as UTC), or None."""
+    m = _TIMESTAMP.match(line)
+    if not m:
+        return None
+    try:
+        return float(calendar.timegm(tuple(int(g) for g in m.groups())))
+    except (ValueError, OverflowError):
+        return None
+
+
+class LogIndex:
+    """Checkpoints every STRIDE bytes: (line start offset, line number, timestamp).
+
+    Lookups bisect the checkpoints to turn a time range into a byte range,
+    and a byte offset into a line number with a short newline count. The
+    index is persisted and extended incrementally as the file grows; a new
+    inode or a shrunken file triggers a rebuild.
+    """
+
+    STRIDE = 256 * 1024
+
+    def __init__(self, path: Path, cache_path: Optional[Path] = None):
+        self._path = Path(path)
+        self._cache = JsonCache(cache_path)
+        self._lock = threading.Lock()
+        self._inode: Optional[int] = None
+        self._size = 0
+        self._lines = 0
+        self._offsets: list[int] = []
+        self._line_numbers: list[int] = []
+        self._timestamps: list[Optional[float]] = []
+        self._load()
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def indexed_size(self) -> int:
+        return self._size
+
+    @property
+    def line_count(self) -> int:
+        return self._lines
+
+    def _load(self):
+        data = self._cache.load()
+        if not data:
+            return
+        try:
+            self._inode = data["inode"]
+            self._size = data["size"]
+            self._lines = data["lines"]
+            entries = data["entries"]
+            self._offsets = [e[0] for e in entries]
+            self._line_numbers = [e[1] for e in entries]
+            self._timestamps = [e[2] for e in entries]
+        except (KeyError, TypeError, IndexError):
+            self._reset(None)
+
+    def _save(self):
+        if self._cache.enabled:
+            self._cache.save({
+                "inode": self._inode,
+                "size": self._size,
+                "lines": self._lines,
+                "entries": list(zip(self._offsets, self._line_numbers, self._timestamps)),
+            })
+
+    def _reset(self, inode: Optional[int]):
+        self._inode = inode
+        self._size = 0
+        self._lines = 0
+        self._offsets = []
+        self._line_numbers = []
+        self._timestamps = []
+
+    def update(self) -> bool:
+        """Index bytes appended since the last call. Returns False if the file is gone."""
+        with self._lock:
+            try:
+                fd = os.open(self._path, os.O_RDONLY)
+            except OSError:
+                return False
+            try:
+                st = os.fstat(fd)
+                if st.st_ino != self._inode or st.st_size < self._size:
+                    self._reset(st.st_ino)
+                if st.st_size > self._size:
+                    with mmap.mmap(fd, st.st_size, access=mmap.ACCESS_READ) as mm:
+                        self._extend(mm)
+                    self._save()
+            finally:
+                os.close(fd)
+            return True
+
+    def _extend(self, mm: mmap.mmap):
+        size = len(mm)
+        pos = self._size
+        if not self._offsets and pos == 0:
+            self._add_checkpoint(mm, 0, 0)
+
+        while True:
+            target = pos + self.STRIDE
+            if target >= size:
+                break
+            nl = mm.find(b"\n", target)
+            if nl < 0 or nl + 1 >= size:
+                break
+            self._lines += self.count_lines(mm, pos, nl + 1)
+            pos = nl + 1
+            self._add_checkpoint(mm, pos, self._lines)
+
+        # Only complete lines are indexed; a partial last line is picked up next time
+        last_nl = mm.rfind(b"\n", pos)
+        if last_nl >= 0:
+            self._lines += self.count_lines(mm, pos, last_nl + 1)
+            pos = last_nl + 1
+        self._size = pos
+
+    @staticmethod
+    def count_lines(mm: mmap.mmap, start: int, end: int, chunk: int = 1024 * 1024) -> int:
+        count = 0
+        for pos in range(start, end, chunk):
+            count += mm[pos:min(end, pos + chunk)].count(b"\n")
+        return count
+
+    def _add_checkpoint(self, mm: mmap.mmap, offset: int, line: int):
+        ts = parse_timestamp(mm[offset:offset + 32])
+        if ts is None and self._timestamps:
+            # Continuation lines inherit the previous timestamp
+            ts = self._timestamps[-1]
+        self._offsets.append(offset)
+        self._line_numbers.append(line)
+        self._timestamps.append(ts)
+
+    def byte_range(self, start: Optional[float] = None, end: Optional[float] = None) -> tuple[int, int]:
+        """Byte range that covers every line stamped within [start, end]."""
+        with self._lock:
+            first, last = 0, self._size
+            if not self._offsets:
+                return first, last
+            stamps = [ts if ts is not None else float("-inf") for ts in self._timestamps]
+            if start is not None:
+                # Start at the last checkpoint before start; lines after it may still match
+                i = bisect.bisect_left(stamps, start) - 1
+                first = self._offsets[i] if i >= 0 else 0
+            if end is not None:
+                j = bisect.bisect_right(stamps, end)
+                last = self._offsets[j] if j < len(self._offsets) else self._size
+            return first, max(first, last)
+
+    def checkpoint_before(self, offset: int) -> tuple[int, int]:
+        """(line number, offset) of the nearest checkpoint at or before offset."""
+        with self._lock:
+            i = bisect.bisect_right(self._offsets, offset) - 1
+            if i < 0:
+                return 0, 0
+            return self._line_numbers[i], self._offsets[i]
@@ -0,0 +1,275 @@
+"""Regex and time-range search across monerod logs."""
+
+import os
+import re
+import mmap
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Optional
+
+from .json_cache import JsonCache
+from .log_index import LogIndex, parse_timestamp
+from .log_archiver import ArchivedLog
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class LogHit:
+    """One matching log line."""
+    path: str
+    line: int
+    offset: int
+    text: str
+
+    @property
+    def display_string(self) -> str:
+        return f"{Path(self.path).name}:{self.line + 1}  {self.text}"
+
+
+class SearchJob:
+    """Handle for a running search."""
+
+    def __init__(self, max_hits: int, files: int):
+        self._cancel = threading.Event()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._max_hits = max_hits
+        self._remaining = files
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def hits(self) -> int:
+        return self._hits
+
+    @property
+    def done(self) -> bool:
+        return self._remaining == 0
+
+    def cancel(self):
+        self._cancel.set()
+
+    def _take(self, count: int) -> int:
+        """Reserve up to count hits from the budget."""
+        with self._lock:
+            allowed = max(0, min(count, self._max_hits - self._hits))
+            self._hits += allowed
+            if self._hits >= self._max_hits:
+                self._cancel.set()
+            return allowed
+
+    def _file_done(self) -> bool:
+        with self._lock:
+            self._remaining -= 1
+            return self._remaining == 0
+
+
+class LogSearch:
+    """Searches log files in parallel, streaming hits as they are found.
+
+    Each file gets a persistent LogIndex; a time range is turned into a byte
+    range through the index, and only that range is scanned through mmap.
+    Archived (.gz) logs are searched member by member in memory, skipping
+    members outside the time range.
+    Files are spread over a thread pool (a process pool is not an option
+    inside the Android app process). Indexes of files that were rotated
+    away, compressed or deleted are dropped with their cache at the next
+    search.
+    """
+
+    BATCH_SIZE = 50
+
+    def __init__(self, index_dir: Optional[Path] = None, max_workers: int = 2):
+        self._index_dir = Path(index_dir) if index_dir else None
+        self._indexes: dict[str, LogIndex] = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="logsearch")
+
+    @staticmethod
+    def log_files(log_path: Path) -> list[Path]:
+        """The live log and its rotated siblings, newest first."""
+        log_path = Path(log_path)
+        if not log_path.parent.is_dir():
+            return []
+        files = [
+            p for p in log_path.parent.glob(log_path.name + "*")
+            if p.is_file() and not p.name.endswith(".tmp")
+        ]
+        return sorted(files, key=lambda p: p.stat().st_mtime, reverse=True)
+
+    def _cache_path(self, path: Path) -> Optional[Path]:
+        return self._index_dir / f"{Path(path).name}.json" if self._index_dir else None
+
+    def index_for(self, path: Path) -> LogIndex:
+        key = str(path)
+        with self._lock:
+            index = self._indexes.get(key)
+            if index is None:
+                index = LogIndex(path, self._cache_path(path))
+                self._indexes[key] = index
+            return index
+
+    def prune(self, files: list[Path]):
+        """Forget indexes (and their cache files) of logs that no longer exist.
+
+        Cache files left by an earlier run are matched against the
+        directories of files.
+        """
+        with self._lock:
+            gone = [key for key in self._indexes if not os.path.exists(key)]
+            for key in gone:
+                del self._indexes[key]
+        for key in gone:
+            JsonCache(self._cache_path(Path(key))).clear()
+        if not self._index_dir or not files:
+            return
+        live = set()
+        for directory in {Path(f).parent for f in files}:
+            try:
+                live.update(f"{name}.json" for name in os.listdir(directory))
+            except OSError:
+                return
+        try:
+            cached = [p for p in self._index_dir.iterdir() if p.suffix == ".json"]
+        except OSError:
+            return
+        for cache_path in cached:
+            if cache_path.name not in live:
+                JsonCache(cache_path).clear()
+
+    def search(
+        self,
+        files: list[Path],
+        pattern: str,
+        start: Optional[float] = None,
+        end: Optional[float] = None,
+        on_results: Optional[Callable[[list[LogHit]], None]] = None,
+        on_complete: Optional[Callable[[SearchJob], None]] = None,
+        max_hits: int = 1000,
+        ignore_case: bool = True,
+    ) -> SearchJob:
+        """Start a search; raises re.error for a bad pattern. Callbacks run on workers."""
+        regex = re.compile(pattern.encode("utf-8"), re.IGNORECASE if ignore_case else 0)
+        self.prune(files)
+        job = SearchJob(max_hits, len(files))
+        if not files:
+            if on_complete:
+                on_complete(job)
+            return job
+
+        def run(path: Path):
+            try:
+                if not job.cancelled:
+                    self._search_file(path, regex, start, end, job, on_results)
+            except Exception as e:
+                logger.error(f"Log search failed for {path}: {e}")
+            finally:
+                if job._file_done() and on_complete:
+                    on_complete(job)
+
+        for path in files:
+            self._executor.submit(run, path)
+        return job
+
+    def _search_file(self, path: Path, regex: re.Pattern, start: Optional[float], end: Optional[float],
+                     job: SearchJob, on_results: Optional[Callable[[list[LogHit]], None]]):
+        if path.suffix == ArchivedLog.SUFFIX:
+            self._search_archive(path, regex, start, end, job, on_results)
+            return
+        index = self.index_for(path)
+        if not index.update():
+            return
+        first, last = index.byte_range(start, end)
+        if last <= first:
+            return
+
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            with mmap.mmap(fd, index.indexed_size, access=mmap.ACCESS_READ) as mm:
+                line, counted_to = index.checkpoint_before(first)
+                batch: list[LogHit] = []
+                pos = first
+                while pos < last and not job.cancelled:
+                    m = regex.search(mm, pos, last)
+                    if not m:
+                        break
+                    line_start = mm.rfind(b"\n", 0, m.start()) + 1
+                    line_end = mm.find(b"\n", m.end())
+                    if line_end < 0:
+                        line_end = len(mm)
+                    # Count newlines from the closest known point only
+                    cp_line, cp_offset = index.checkpoint_before(line_start)
+                    if cp_offset > counted_to:
+                        line, counted_to = cp_line, cp_offset
+                    line += LogIndex.count_lines(mm, counted_to, line_start)
+                    counted_to = line_start
+                    pos = line_end + 1
+
+                    text = mm[line_start:line_end]
+                    if self._in_range(text, start, end):
+                        batch.append(LogHit(str(path), line, line_start,
+                                            text.decode("utf-8", errors="replace")))
+                    if len(batch) >= self.BATCH_SIZE:
+                        self._emit(batch, job, on_results)
+                        batch = []
+                if batch:
+                    self._emit(batch, job, on_results)
+        finally:
+            os.close(fd)
+
+    def _search_archive(self, path: Path, regex: re.Pattern, start: Optional[float], end: Optional[float],
+                        job: SearchJob, on_results: Optional[Callable[[list[LogHit]], None]]):
+        archive = ArchivedLog(path)
+        for member, data in archive.iter_members(start, end):
+            if job.cancelled:
+                return
+            batch: list[LogHit] = []
+            line, counted_to, pos = member.line, 0, 0
+            while True:
+                m = regex.search(data, pos)
+                if not m:
+                    break
+                line_start = data.rfind(b"\n", 0, m.start()) + 1
+                line_end = data.find(b"\n", m.end())
+                if line_end < 0:
+                    line_end = len(data)
+                line += data.count(b"\n", counted_to, line_start)
+                counted_to = line_start
+                pos = line_end + 1
+
+                text = data[line_start:line_end]
+                if self._in_range(text, start, end):
+                    # Offsets in archives are uncompressed offsets within the member
+                    batch.append(LogHit(str(path), line, line_start,
+                                        text.decode("utf-8", errors="replace")))
+                    if len(batch) >= self.BATCH_SIZE:
+                        self._emit(batch, job, on_results)
+                        batch = []
+                if pos >= len(data):
+                    break
+            if batch:
+                self._emit(batch, job, on_results)
+
+    @staticmethod
+    def _in_range(text: bytes, start: Optional[float], end: Optional[float]) -> bool:
+        if start is None and end is None:
+            return True
+        ts = parse_timestamp(text)
+        if ts is None:
+            return True
+        return not ((start is not None and ts < start) or (end is not None and ts > end))
+
+    @staticmethod
+    def _emit(batch: list[LogHit], job: SearchJob, on_results):
+        allowed = job._take(len(batch))
+        if allowed and on_results:
+            on_results(batch[:allowed])
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,170 @@
+"""Tail and follow a growing, rotating log file."""
+
+import os
+import mmap
+import logging
+from pathlib import Path
+from typing import Optional
+
+logger = logging.getLogger(__name__)
+
+
+class LogTail:
+    """Reads the end of a log without loading it, then follows appends.
+
+    The initial page is found by scanning backwards from EOF through an
+    mmap, so only the pages holding the last lines are touched. Following
+    keeps the file open and reads new bytes with pread; a changed inode or
+    a file shorter than the read offset means monerod rotated the log, and
+    reading restarts at the beginning of the new file.
+    """
+
+    READ_LIMIT = 1024 * 1024
+    MAX_LINE = 64 * 1024
+
+    def __init__(self, path: Path, encoding: str = "utf-8"):
+        self._path = Path(path)
+        self._encoding = encoding
+        self._fd: Optional[int] = None
+        self._inode: Optional[int] = None
+        self._offset = 0
+        self._first_offset = 0
+        self._pending = b""
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    @property
+    def offset(self) -> int:
+        """Byte offset up to which the current file has been read."""
+        return self._offset
+
+    @property
+    def first_offset(self) -> int:
+        """Start offset of the oldest line handed out, for paging back."""
+        return self._first_offset
+
+    def _open(self) -> bool:
+        self.close()
+        try:
+            self._fd = os.open(self._path, os.O_RDONLY)
+        except OSError:
+            return False
+        self._inode = os.fstat(self._fd).st_ino
+        self._offset = 0
+        self._first_offset = 0
+        self._pending = b""
+        return True
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                os.close(self._fd)
+            except OSError:
+                pass
+        self._fd = None
+        self._inode = None
+
+    def _decode(self, data: bytes) -> list[str]:
+        text = data.decode(self._encoding, errors="replace")
+        return text.split("\n") if text else []
+
+    def read_last(self, count: int = 200) -> list[str]:
+        """Open the log and return its last count lines; following starts at EOF."""
+        if not self._open():
+            return []
+        size = os.fstat(self._fd).st_size
+        self._offset = size
+        self._first_offset = size
+        if size == 0:
+            return []
+
+        with mmap.mmap(self._fd, size, access=mmap.ACCESS_READ) as mm:
+            # Hold back a trailing partial line; poll() completes it
+            end = mm.rfind(b"\n") + 1
+            self._pending = mm[end:size] if size - end <= self.MAX_LINE else b""
+            start = self._scan_back(mm, end, count)
+            self._first_offset = start
+            return self._decode(mm[start:max(start, end - 1)])
+
+    def read_before(self, count: int = 200) -> list[str]:
+        """The count lines preceding those already returned, for scrolling up."""
+        if self._fd is None or self._first_offset <= 0:
+            return []
+        end = self._first_offset
+        with mmap.mmap(self._fd, end, access=mmap.ACCESS_READ) as mm:
+            start = self._scan_back(mm, end, count)
+            self._first_offset = start
+            return self._decode(mm[start:end - 1])
+
+    @staticmethod
+    def _scan_back(mm: mmap.mmap, end: int, count: int) -> int:
+        """Offset of the start of the count-th line before end (end follows a newline)."""
+        pos = end - 1
+        for _ in range(count):
+            if pos <= 0:
+                return 0
+            pos = mm.rfind(b"\n", 0, pos)
+            if pos < 0:
+                return 0
+        return pos + 1
+
+    def _rotated(self) -> bool:
+        try:
+            st = os.stat(self._path)
+        except OSError:
+            return False
+        return st.st_ino != self._inode or st.st_size < self._offset
+
+    def has_new(self) -> bool:
+        """Whether poll() would return something, without reading it."""
+        if self._fd is None:
+            return self._path.exists()
+        try:
+            return os.fstat(self._fd).st_size > self._offset or self._rotated()
+        except OSError:
+            return False
+
+    def poll(self) -> tuple[list[str], bool]:
+        """New complete lines since the last call, and whether the log rotated."""
+        data, rotated = self.poll_bytes()
+        return self._decode(data[:-1]) if data else [], rotated
+
+    def poll_bytes(self) -> tuple[bytes, bool]:
+        """Like poll(), but the raw bytes of the new lines (each ending in a newline)."""
+        if self._fd is None:
+            # Log did not exist yet: read the new file from its start
+            if not self._open():
+                return b"", False
+            return self._read_new(), True
+
+        data = self._read_new()
+        if self._rotated():
+            # Drain what was written to the old file before the rename, then switch
+            data += self._read_new()
+            if self._pending:
+                data += self._pending + b"\n"
+            if not self._open():
+                return data, True
+            data += self._read_new()
+            return data, True
+        return data, False
+
+    def _read_new(self) -> bytes:
+        size = os.fstat(self._fd).st_size
+        if size <= self._offset:
+            return b""
+        # A burst larger than READ_LIMIT is skipped to its tail, keeping reads bounded
+        if size - self._offset > self.READ_LIMIT:
+            self._offset = size - self.READ_LIMIT
+            self._pending = b""
+        data = os.pread(self._fd, size - self._offset, self._offset)
+        self._offset += len(data)
+        data = self._pending + data
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            self._pending = data if len(data) <= self.MAX_LINE else b""
+            return b""
+        self._pending = data[cut + 1:]
+        return data[:cut + 1]
@@ -1,12 +1,13 @@
 """Node statistics fetcher via RPC."""
 
-import json
+import time
 import logging
-import urllib.request
-import urllib.error
 from dataclasses import dataclass
 from typing import Optional
 
+from .daemon_rpc import DaemonRPC
+from .proc_sampler import ResourceStats
+
 logger = logging.getLogger(__name__)
 
 
@@ -28,6 +29,11 @@ class NodeStats:
     tx_pool_size: int = 0
     bytes_in: int = 0
     bytes_out: int = 0
+    # Traffic since the previous poll (bytes/s) against monerod's limits (kB/s, 0 if unknown)
+    rate_in: float = 0.0
+    rate_out: float = 0.0
+    limit_up: int = 0
+    limit_down: int = 0
     busy_syncing: bool = False
     status: str = "offline"
     white_peerlist_size: int = 0
@@ -36,6 +42,14 @@ class NodeStats:
     block_time: int = 0
     hashrate: int = 0
     fee_estimate: int = 0
+    # From the log (SyncTelemetryParser); available before RPC is up
+    log_height: int = 0
+    sync_rate: float = 0.0
+    block_process_ms: float = 0.0
+    startup_phase: str = ""
+    peer_drops: int = 0
+    # monerod process usage (ProcSampler)
+    resources: Optional[ResourceStats] = None
     
     @property
     def total_connections(self) -> int:
@@ -55,6 +69,22 @@ class NodeStats:
             return 0
         return max(0, self.target_height - self.height)
     
+    @property
+    def sync_eta_seconds(self) -> Optional[float]:
+        if self.sync_rate <= 0 or self.synchronized:
+            return None
+        return self.blocks_remaining / self.sync_rate
+    
+    @property
+    def startup_phase_display(self) -> str:
+        return {
+            "initializing": "Initializing core...",
+            "loading_blockchain": "Loading blockchain...",
+            "starting_p2p": "Starting p2p server...",
+            "starting_rpc": "Starting RPC server...",
+            "stopping": "Stopping...",
+        }.get(self.startup_phase, "")
+    
     @property
     def database_size_gib(self) -> float:
         return self.database_size / (1024 ** 3)
@@ -71,6 +101,24 @@ class NodeStats:
     def bytes_out_mib(self) -> float:
         return self.bytes_out / (1024 ** 2)
     
+    @property
+    def throughput_down_display(self) -> str:
+        return self._throughput(self.rate_in, self.limit_down)
+    
+    @property
+    def throughput_up_display(self) -> str:
+        return self._throughput(self.rate_out, self.limit_up)
+    
+    @staticmethod
+    def _throughput(rate: float, limit_kb: int) -> str:
+        def fmt(bps: float) -> str:
+            if bps >= 1024 ** 2:
+                return f"{bps / 1024 ** 2:.1f} MB/s"
+            return f"{bps / 1024:.0f} kB/s"
+        if limit_kb <= 0:
+            return fmt(rate)
+        return f"{fmt(rate)} of {fmt(limit_kb * 1024)}"
+    
     @property
     def difficulty_display(self) -> str:
         if self.difficulty >= 1_000_000_000_000:
@@ -120,14 +168,29 @@ class VersionInfo:
 
 
 class NodeStatsPoller:
-    """Polls node RPC for statistics."""
+    """Polls node RPC for statistics.
+    
+    With a channel (StatsChannel) another process publishes to, poll()
+    returns that snapshot only while the publisher is alive: publisher_running
+    is set (the service was started and not stopped since) and the snapshot
+    is at most PUBLISH_MAX_AGE old. Otherwise it polls RPC. shared_stats()
+    alone accepts anything up to CHANNEL_MAX_AGE, for a one-off paint.
+    """
     
     BLOCK_TIME_TARGET = 120
+    CHANNEL_MAX_AGE = 30.0
+    # The service publishes every 10 s (its POLL_INTERVAL) from a 5 s loop tick
+    PUBLISH_MAX_AGE = 15.0
     
-    def __init__(self, host: str = "127.0.0.1", port: int = 18081):
+    def __init__(self, host: str = "127.0.0.1", port: int = 18081, telemetry=None, channel=None):
         self.host = host
         self.port = port
+        self._rpc = DaemonRPC(host, port)
+        self._telemetry = telemetry
+        self._channel = channel
+        self.publisher_running = False
         self._last_stats: Optional[NodeStats] = None
+        self._last_traffic: Optional[tuple[float, int, int]] = None
         self._version_info: Optional[VersionInfo] = None
     
     @property
@@ -139,52 +202,31 @@ class NodeStatsPoller:
         return f"http://{self.host}:{self.port}"
     
     def _rpc_call(self, method: str, params: dict = None) -> Optional[dict]:
-        payload = {
-            "jsonrpc": "2.0",
-            "id": "0",
-            "method": method,
-        }
-        if params:
-            payload["params"] = params
-        
-        try:
-            data = json.dumps(payload).encode("utf-8")
-            req = urllib.request.Request(
-                self.rpc_url,
-                data=data,
-                headers={"Content-Type": "application/json"},
-            )
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                result = json.loads(resp.read().decode("utf-8"))
-                return result.get("result")
-        except urllib.error.URLError as e:
-            logger.debug(f"RPC connection error: {e}")
-            return None
-        except TimeoutError:
-            logger.debug("RPC timeout")
-            return None
-        except json.JSONDecodeError as e:
-            logger.warning(f"Invalid JSON response: {e}")
-            return None
+        return self._rpc.json_rpc(method, params)
     
     def _http_call(self, endpoint: str) -> Optional[dict]:
-        try:
-            url = f"{self.base_url}/{endpoint}"
-            req = urllib.request.Request(url)
-            with urllib.request.urlopen(req, timeout=10) as resp:
-                return json.loads(resp.read().decode("utf-8"))
-        except urllib.error.URLError as e:
-            logger.debug(f"HTTP connection error for {endpoint}: {e}")
-            return None
-        except TimeoutError:
-            logger.debug(f"HTTP timeout for {endpoint}")
-            return None
-        except json.JSONDecodeError as e:
-            logger.warning(f"Invalid JSON response from {endpoint}: {e}")
-            return None
+        return self._rpc.call(endpoint)
 
+    def shared_stats(self, max_age: Optional[float] = None) -> Optional[NodeStats]:
+        """The latest snapshot from the channel if it is fresh, without any RPC."""
+        if self._channel is None:
+            return None
+        stats = self._channel.read(max_age=self.CHANNEL_MAX_AGE if max_age is None else max_age)
+        if stats is not None and self._telemetry:
+            self._telemetry.poll()
+            self._telemetry.apply(stats)
+        return stats
+    
     def poll(self) -> NodeStats:
+        stats = self.shared_stats(self.PUBLISH_MAX_AGE) if self.publisher_running else None
+        if stats is not None:
+            self._last_stats = stats
+            return stats
+        
         stats = NodeStats()
+        if self._telemetry:
+            self._telemetry.poll()
+            self._telemetry.apply(stats)
         
         info = self._rpc_call("get_info")
         if info:
@@ -213,12 +255,19 @@ class NodeStatsPoller:
             self._last_stats = stats
             return stats
         
+        # Also while syncing: traffic tells a network-bound sync from a CPU/disk-bound one
+        net_stats = self._http_call("get_net_stats")
+        if net_stats:
+            stats.bytes_in = net_stats.get("total_bytes_in", 0)
+            stats.bytes_out = net_stats.get("total_bytes_out", 0)
+            self._measure_rates(stats)
+        
+        limits = self._http_call("get_limit")
+        if limits:
+            stats.limit_up = limits.get("limit_up", 0)
+            stats.limit_down = limits.get("limit_down", 0)
+        
         if not stats.busy_syncing:
-            net_stats = self._http_call("get_net_stats")
-            if net_stats:
-                stats.bytes_in = net_stats.get("total_bytes_in", 0)
-                stats.bytes_out = net_stats.get("total_bytes_out", 0)
-            
             last_header = self._rpc_call("get_last_block_header")
             if last_header and "block_header" in last_header:
                 header = last_header["block_header"]
@@ -232,6 +281,17 @@ class NodeStatsPoller:
         self._last_stats = stats
         return stats
     
+    def _measure_rates(self, stats: NodeStats):
+        now = time.monotonic()
+        last = self._last_traffic
+        self._last_traffic = (now, stats.bytes_in, stats.bytes_out)
+        # Counters start over when monerod restarts
+        if last is None or now <= last[0] or stats.bytes_in < last[1] or stats.bytes_out < last[2]:
+            return
+        elapsed = now - last[0]
+        stats.rate_in = (stats.bytes_in - last[1]) / elapsed
+        stats.rate_out = (stats.bytes_out - last[2]) / elapsed
+    
     def check_update(self) -> VersionInfo:
         version_info = VersionInfo()
         
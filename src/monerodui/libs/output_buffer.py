@@ -0,0 +1,128 @@
+"""Fixed-size capture of recent process output."""
+
+import threading
+from typing import Optional
+
+
+class OutputRingBuffer:
+    """Byte ring holding the most recent output of a process.
+
+    Writes overwrite the oldest bytes once capacity is reached, so memory
+    use is fixed no matter how chatty the process is. Callers should write
+    whole lines so output from several pipes does not interleave mid-line.
+    """
+
+    DEFAULT_CAPACITY = 256 * 1024
+
+    def __init__(self, capacity: int = DEFAULT_CAPACITY):
+        if capacity <= 0:
+            raise ValueError("capacity must be positive")
+        self._buf = bytearray(capacity)
+        self._capacity = capacity
+        self._end = 0
+        self._size = 0
+        self._total = 0
+        self._lock = threading.Lock()
+
+    @property
+    def capacity(self) -> int:
+        return self._capacity
+
+    @property
+    def total_bytes(self) -> int:
+        """Bytes written since creation, including those overwritten."""
+        return self._total
+
+    def __len__(self) -> int:
+        return self._size
+
+    def write(self, data: bytes):
+        if not data:
+            return
+        with self._lock:
+            self._total += len(data)
+            if len(data) >= self._capacity:
+                self._buf[:] = data[-self._capacity:]
+                self._end = 0
+                self._size = self._capacity
+                return
+            first = min(len(data), self._capacity - self._end)
+            self._buf[self._end:self._end + first] = data[:first]
+            rest = len(data) - first
+            if rest:
+                self._buf[:rest] = data[first:]
+            self._end = (self._end + len(data)) % self._capacity
+            self._size = min(self._capacity, self._size + len(data))
+
+    def _snapshot(self) -> bytes:
+        start = (self._end - self._size) % self._capacity
+        if start + self._size <= self._capacity:
+            return bytes(self._buf[start:start + self._size])
+        return bytes(self._buf[start:]) + bytes(self._buf[:self._end])
+
+    def snapshot(self) -> bytes:
+        """Buffered bytes, oldest first."""
+        with self._lock:
+            return self._snapshot()
+
+    def tail_lines(self, count: int = 50, encoding: str = "utf-8") -> list[str]:
+        """Last count complete lines, decoded, without trailing newlines."""
+        if count <= 0:
+            return []
+        with self._lock:
+            data = self._snapshot()
+            wrapped = self._total > self._size
+        if wrapped:
+            # The oldest line was partly overwritten
+            cut = data.find(b"\n")
+            data = data[cut + 1:] if cut >= 0 else b""
+
+        # Walk back over newlines so only the requested lines are decoded
+        end = len(data) - 1 if data.endswith(b"\n") else len(data)
+        start = end
+        for _ in range(count):
+            start = data.rfind(b"\n", 0, start)
+            if start < 0:
+                break
+        text = data[start + 1:end].decode(encoding, errors="replace")
+        return text.split("\n") if text else []
+
+    def clear(self):
+        with self._lock:
+            self._end = 0
+            self._size = 0
+            self._total = 0
+
+
+class LineRateLimiter:
+    """Allows at most max_lines per interval; counts what it drops."""
+
+    def __init__(self, max_lines: int = 20, interval: float = 1.0):
+        self._max_lines = max_lines
+        self._interval = interval
+        self._window_start = 0.0
+        self._allowed = 0
+        self._suppressed = 0
+        self._lock = threading.Lock()
+
+    def admit(self, now: float) -> tuple[bool, Optional[int]]:
+        """Return (allowed, suppressed count to report when a new window opens)."""
+        with self._lock:
+            report = None
+            if now - self._window_start >= self._interval:
+                if self._suppressed:
+                    report = self._suppressed
+                self._window_start = now
+                self._allowed = 0
+                self._suppressed = 0
+            if self._allowed < self._max_lines:
+                self._allowed += 1
+                return True, report
+            self._suppressed += 1
+            return False, report
+
+    def take_suppressed(self) -> int:
+        """Return and reset the count dropped in the current window."""
+        with self._lock:
+            suppressed, self._suppressed = self._suppressed, 0
+            return suppressed
@@ -0,0 +1,181 @@
+"""Resource usage of the monerod process from /proc."""
+
+import os
+import time
+import logging
+from dataclasses import dataclass
+from typing import Optional
+
+from .stats_history import StatsHistory
+
+logger = logging.getLogger(__name__)
+
+try:
+    _CLK_TCK = os.sysconf("SC_CLK_TCK")
+    _PAGE_SIZE = os.sysconf("SC_PAGE_SIZE")
+except (AttributeError, ValueError, OSError):
+    _CLK_TCK, _PAGE_SIZE = 100, 4096
+
+
+@dataclass
+class ResourceStats:
+    """One sample of a process's resource usage."""
+    pid: int = 0
+    timestamp: float = 0.0
+    state: str = ""
+    cpu_percent: float = 0.0
+    io_wait_percent: float = 0.0
+    rss: int = 0
+    swap: int = 0
+    threads: int = 0
+    fds: int = 0
+    read_bytes: int = 0
+    write_bytes: int = 0
+    read_rate: float = 0.0
+    write_rate: float = 0.0
+
+    @property
+    def rss_mib(self) -> float:
+        return self.rss / (1024 ** 2)
+
+    @property
+    def cpu_display(self) -> str:
+        return f"{self.cpu_percent:.0f}%"
+
+    @property
+    def disk_display(self) -> str:
+        return f"{self.read_rate / (1024 ** 2):.1f} / {self.write_rate / (1024 ** 2):.1f}"
+
+
+class ProcSampler:
+    """Samples /proc/<pid>/{stat,status,io,fd} through descriptors kept open.
+
+    attach() opens the files once; each sample() is a pread per file and an
+    fd directory listing, parsed with plain byte searches. Rates (CPU, disk)
+    come from the difference to the previous sample. /proc/<pid>/io is
+    optional: it can be unreadable for a process started by someone else.
+    """
+
+    STAT_READ = 2048
+    STATUS_READ = 4096
+
+    def __init__(self, history: Optional[StatsHistory] = None):
+        self._history = history
+        self._pid: Optional[int] = None
+        self._fds: dict[str, int] = {}
+        self._start_time: Optional[int] = None
+        self._last: Optional[tuple[float, int, int, int, int]] = None
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self._pid
+
+    def attach(self, pid: Optional[int]):
+        """Sample pid from now on; a new pid drops the previous descriptors."""
+        if pid == self._pid:
+            return
+        self.detach()
+        if not pid:
+            return
+        base = f"/proc/{pid}"
+        try:
+            self._fds["stat"] = os.open(f"{base}/stat", os.O_RDONLY)
+            self._fds["status"] = os.open(f"{base}/status", os.O_RDONLY)
+            self._fds["fd"] = os.open(f"{base}/fd", os.O_RDONLY | os.O_DIRECTORY)
+        except OSError as e:
+            logger.debug(f"Cannot sample PID {pid}: {e}")
+            self.detach()
+            return
+        try:
+            self._fds["io"] = os.open(f"{base}/io", os.O_RDONLY)
+        except OSError:
+            pass
+        self._pid = pid
+
+    def detach(self):
+        for fd in self._fds.values():
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+        self._fds = {}
+        self._pid = None
+        self._start_time = None
+        self._last = None
+
+    def sample(self) -> Optional[ResourceStats]:
+        """Current usage, or None if not attached or the process is gone."""
+        if self._pid is None:
+            return None
+        now = time.monotonic()
+        try:
+            stat = os.pread(self._fds["stat"], self.STAT_READ, 0)
+            status = os.pread(self._fds["status"], self.STATUS_READ, 0)
+            fds = len(os.listdir(self._fds["fd"]))
+        except (OSError, ProcessLookupError):
+            logger.debug(f"PID {self._pid} is gone")
+            self.detach()
+            return None
+
+        # comm may contain spaces or parens; fields resume after the last ')'
+        fields = stat[stat.rfind(b")") + 2:].split()
+        start_time = int(fields[19])
+        if self._start_time is not None and start_time != self._start_time:
+            # Same PID, different process
+            self.detach()
+            return None
+        self._start_time = start_time
+
+        stats = ResourceStats(pid=self._pid, timestamp=time.time())
+        stats.state = fields[0].decode("ascii", "replace")
+        cpu_ticks = int(fields[11]) + int(fields[12])
+        io_ticks = int(fields[39]) if len(fields) > 39 else 0
+        stats.rss = self._field_int(status, b"VmRSS:") * 1024 or int(fields[21]) * _PAGE_SIZE
+        stats.swap = self._field_int(status, b"VmSwap:") * 1024
+        stats.threads = self._field_int(status, b"Threads:") or int(fields[17])
+        stats.fds = fds
+        if "io" in self._fds:
+            try:
+                io = os.pread(self._fds["io"], self.STAT_READ, 0)
+                stats.read_bytes = self._field_int(io, b"read_bytes:")
+                stats.write_bytes = self._field_int(io, b"\nwrite_bytes:")
+            except OSError:
+                os.close(self._fds.pop("io"))
+
+        if self._last:
+            last_time, last_cpu, last_io, last_read, last_write = self._last
+            elapsed = now - last_time
+            if elapsed > 0:
+                stats.cpu_percent = (cpu_ticks - last_cpu) / _CLK_TCK / elapsed * 100
+                stats.io_wait_percent = (io_ticks - last_io) / _CLK_TCK / elapsed * 100
+                stats.read_rate = max(0, stats.read_bytes - last_read) / elapsed
+                stats.write_rate = max(0, stats.write_bytes - last_write) / elapsed
+        self._record(stats)
+        self._last = (now, cpu_ticks, io_ticks, stats.read_bytes, stats.write_bytes)
+        return stats
+
+    @staticmethod
+    def _field_int(data: bytes, key: bytes) -> int:
+        """The integer after key in a "Key:   value [kB]" /proc file, or 0."""
+        pos = data.find(key)
+        if pos < 0:
+            return 0
+        end = data.find(b"\n", pos)
+        parts = data[pos + len(key):end if end >= 0 else None].split()
+        try:
+            return int(parts[0])
+        except (IndexError, ValueError):
+            return 0
+
+    def _record(self, stats: ResourceStats):
+        # The first sample has no rates yet
+        if self._history and self._last is not None:
+            self._history.record_many({
+                "cpu_percent": stats.cpu_percent,
+                "io_wait_percent": stats.io_wait_percent,
+                "rss": stats.rss,
+                "disk_read_rate": stats.read_rate,
+                "disk_write_rate": stats.write_rate,
+                "threads": stats.threads,
+                "fds": stats.fds,
+            }, stats.timestamp)
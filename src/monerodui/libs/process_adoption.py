@@ -0,0 +1,237 @@
+"""Finding and attaching to a monerod this process did not start."""
+
+import os
+import time
+import select
+import signal
+import logging
+import subprocess
+from pathlib import Path
+from typing import Optional
+
+from .json_cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+PID_FILE_NAME = "monerod.pid"
+
+
+def _stat(pid: int) -> Optional[tuple[str, int]]:
+    """(state, start time in clock ticks since boot) from /proc/<pid>/stat, or None."""
+    try:
+        with open(f"/proc/{pid}/stat", "rb") as f:
+            stat = f.read()
+    except OSError:
+        return None
+    # comm may contain spaces or parens; fields resume after the last ')'
+    fields = stat[stat.rfind(b")") + 2:].split()
+    try:
+        return fields[0].decode("ascii", "replace"), int(fields[19])
+    except (IndexError, ValueError):
+        return None
+
+
+def process_start_time(pid: int) -> Optional[int]:
+    """Start time of pid (field 22 of /proc/<pid>/stat), or None if there is no such process."""
+    stat = _stat(pid)
+    return stat[1] if stat else None
+
+
+def _cmdline(pid: int) -> list[str]:
+    try:
+        with open(f"/proc/{pid}/cmdline", "rb") as f:
+            return [a.decode("utf-8", "replace") for a in f.read().split(b"\0") if a]
+    except OSError:
+        return []
+
+
+def _same_path(a: str, b: Path) -> bool:
+    try:
+        return Path(a).resolve() == Path(b).resolve()
+    except (OSError, RuntimeError):
+        return False
+
+
+def _is_monerod(pid: int, data_dir: Path, binary_path: Optional[Path] = None) -> bool:
+    """cmdline runs monerod (directly or through the Android linker) with --data-dir data_dir."""
+    argv = _cmdline(pid)
+    if not argv:
+        return False
+    # argv[0] is the binary, or the linker with the binary as argv[1]
+    exe_args = argv[:2]
+    if not any("monerod" in Path(a).name or (binary_path and _same_path(a, binary_path)) for a in exe_args):
+        return False
+    for i, arg in enumerate(argv):
+        if arg == "--data-dir" and i + 1 < len(argv):
+            return _same_path(argv[i + 1], data_dir)
+        if arg.startswith("--data-dir="):
+            return _same_path(arg.split("=", 1)[1], data_dir)
+    return False
+
+
+class PidFile:
+    """monerod.pid in the data dir: who runs the node for this data dir.
+
+    Stores the pid together with its start time, so a recycled pid is not
+    mistaken for monerod. A deliberate stop is marked in the file, so the UI
+    and the service, which may both watch the same monerod, can tell it from
+    a crash.
+    """
+
+    def __init__(self, data_dir: Path):
+        self._data_dir = Path(data_dir)
+        self._cache = JsonCache(self._data_dir / PID_FILE_NAME)
+
+    def write(self, pid: int, binary: str = ""):
+        self._cache.save({"pid": pid, "start_time": process_start_time(pid), "binary": binary})
+
+    def read(self) -> Optional[int]:
+        """The recorded pid if that process is still the one that wrote it."""
+        data = self._cache.load()
+        pid = data.get("pid")
+        if not isinstance(pid, int):
+            return None
+        start_time = process_start_time(pid)
+        if start_time is None or start_time != data.get("start_time"):
+            return None
+        return pid
+
+    def running(self, binary_path: Optional[Path] = None) -> Optional[int]:
+        """read(), if that process is still a monerod for this data dir."""
+        pid = self.read()
+        if pid and _is_monerod(pid, self._data_dir, binary_path):
+            return pid
+        return None
+
+    def mark_stopping(self, pid: int):
+        data = self._cache.load()
+        if data.get("pid") == pid:
+            data["stopping"] = True
+            self._cache.save(data)
+
+    def stopping(self, pid: int) -> bool:
+        data = self._cache.load()
+        return data.get("pid") == pid and bool(data.get("stopping"))
+
+    def remove(self, pid: Optional[int] = None):
+        """Delete the pidfile, only if it still names pid when given."""
+        if pid is not None and self._cache.load().get("pid") != pid:
+            return
+        self._cache.clear()
+
+
+def find_running(data_dir: Path, binary_path: Optional[Path] = None) -> Optional[int]:
+    """PID of a monerod serving data_dir: the pidfile first, then a /proc scan. No RPC involved."""
+    if not data_dir:
+        return None
+    pid = PidFile(data_dir).running(binary_path)
+    if pid:
+        return pid
+    try:
+        entries = os.listdir("/proc")
+    except OSError:
+        return None
+    own = os.getpid()
+    for entry in entries:
+        if not entry.isdigit() or int(entry) == own:
+            continue
+        if _is_monerod(int(entry), data_dir, binary_path):
+            return int(entry)
+    return None
+
+
+class AdoptedProcess:
+    """Popen-like handle (pid, poll, wait, terminate, kill) for a process that is not our child.
+
+    Exit is detected through a pidfd where the kernel has one, otherwise by
+    polling /proc. The exit status of a non-child cannot be read, so wait()
+    returns None.
+    """
+
+    POLL_INTERVAL = 1.0
+
+    def __init__(self, pid: int):
+        self.pid = pid
+        self.stdout = None
+        self.stderr = None
+        self._start_time = process_start_time(pid)
+        if self._start_time is None:
+            raise ProcessLookupError(pid)
+        self._exited = False
+        self._pidfd: Optional[int] = None
+        try:
+            self._pidfd = os.pidfd_open(pid)
+        except (AttributeError, OSError):
+            pass
+        if process_start_time(pid) != self._start_time:
+            # Exited (and maybe reused) between the two reads
+            self._close()
+            raise ProcessLookupError(pid)
+
+    def _alive(self) -> bool:
+        stat = _stat(self.pid)
+        if stat is None or stat[1] != self._start_time:
+            return False
+        if stat[0] == "Z":
+            # Exited; reap it in case it is our own child after all (a Popen that was dropped)
+            try:
+                os.waitpid(self.pid, os.WNOHANG)
+            except ChildProcessError:
+                pass
+            return False
+        return True
+
+    def poll(self) -> Optional[int]:
+        if not self._exited and not self._alive():
+            self._exited = True
+            self._close()
+        return None
+
+    @property
+    def exited(self) -> bool:
+        self.poll()
+        return self._exited
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while not self.exited:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(f"pid {self.pid}", timeout)
+            step = self.POLL_INTERVAL if remaining is None else min(self.POLL_INTERVAL, remaining)
+            pidfd = self._pidfd
+            if pidfd is not None:
+                try:
+                    select.select([pidfd], [], [], step)
+                    continue
+                except (OSError, ValueError):
+                    pass
+            time.sleep(step)
+        return None
+
+    def send_signal(self, sig: int):
+        if self.exited:
+            return
+        pidfd = self._pidfd
+        try:
+            if pidfd is not None and hasattr(signal, "pidfd_send_signal"):
+                # Cannot hit a recycled pid
+                signal.pidfd_send_signal(pidfd, sig)
+            else:
+                os.kill(self.pid, sig)
+        except ProcessLookupError:
+            pass
+
+    def terminate(self):
+        self.send_signal(signal.SIGTERM)
+
+    def kill(self):
+        self.send_signal(signal.SIGKILL)
+
+    def _close(self):
+        if self._pidfd is not None:
+            try:
+                os.close(self._pidfd)
+            except OSError:
+                pass
+            self._pidfd = None
@@ -0,0 +1,219 @@
+"""One thread multiplexing output and exit of every managed process."""
+
+import os
+import logging
+import selectors
+import threading
+from typing import Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def _exited(process) -> bool:
+    exited = getattr(process, "exited", None)  # AdoptedProcess
+    if exited is not None:
+        return exited
+    return process.poll() is not None
+
+
+class _Watch:
+    __slots__ = ("process", "on_output", "on_exit", "streams", "pidfd", "done")
+
+    def __init__(self, process, on_output, on_exit, streams):
+        self.process = process
+        self.on_output = on_output
+        self.on_exit = on_exit
+        self.streams = streams
+        self.pidfd: Optional[int] = None
+        self.done = False
+
+
+class ProcessEventLoop:
+    """A selector loop reading process pipes and waiting for exits.
+
+    watch() registers a process (a Popen, or anything with pid and poll(),
+    like AdoptedProcess): on_output(name, data) gets each chunk read from its
+    stdout/stderr and (name, b"") at EOF; on_exit(returncode) runs once the
+    process is gone, after its pipes are drained. Exits come from a pidfd in
+    the selector where the kernel has pidfd_open (Linux 5.3+), otherwise from
+    polling every POLL_INTERVAL. Callbacks run on the loop thread and must
+    not block. However many processes are watched, this is one thread.
+    """
+
+    READ_CHUNK_SIZE = 64 * 1024
+    POLL_INTERVAL = 1.0
+
+    _shared: Optional["ProcessEventLoop"] = None
+    _shared_lock = threading.Lock()
+
+    def __init__(self):
+        self._selector = selectors.DefaultSelector()
+        self._lock = threading.Lock()
+        self._pending: list[tuple[str, _Watch]] = []
+        self._watches: dict[int, _Watch] = {}
+        self._thread: Optional[threading.Thread] = None
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        os.set_blocking(self._wake_w, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ, None)
+
+    @classmethod
+    def shared(cls) -> "ProcessEventLoop":
+        """The loop used by every ProcessManager that is not given its own."""
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls()
+            return cls._shared
+
+    @property
+    def watch_count(self) -> int:
+        return len(self._watches)
+
+    def watch(
+        self,
+        process,
+        on_output: Optional[Callable[[str, bytes], None]] = None,
+        on_exit: Optional[Callable[[Optional[int]], None]] = None,
+        streams: Optional[dict[str, object]] = None,
+    ):
+        """Start watching process; streams maps names to pipes, default its stdout/stderr."""
+        if streams is None:
+            streams = {"stdout": getattr(process, "stdout", None), "stderr": getattr(process, "stderr", None)}
+        streams = {name: stream for name, stream in streams.items() if stream is not None}
+        self._submit("watch", _Watch(process, on_output, on_exit, streams))
+
+    def unwatch(self, process):
+        """Stop watching process without calling on_exit; its pipes are left open."""
+        watch = self._watches.get(process.pid)
+        if watch is not None and watch.process is process:
+            self._submit("unwatch", watch)
+
+    def _submit(self, op: str, watch: _Watch):
+        with self._lock:
+            self._pending.append((op, watch))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="process-loop", daemon=True)
+                self._thread.start()
+        try:
+            os.write(self._wake_w, b"\0")
+        except BlockingIOError:
+            pass
+
+    # Loop thread
+
+    def _run(self):
+        while True:
+            try:
+                self._apply_pending()
+                polled = [w for w in self._watches.values() if w.pidfd is None]
+                events = self._selector.select(self.POLL_INTERVAL if polled else None)
+                for key, _ in events:
+                    if key.data is None:
+                        self._drain_wake()
+                        continue
+                    watch, name = key.data
+                    if name is None:
+                        self._finish(watch)
+                    elif not watch.done:
+                        self._read(watch, name, key.fileobj)
+                for watch in polled:
+                    if not watch.done and _exited(watch.process):
+                        self._finish(watch)
+            except Exception as e:
+                logger.error(f"Process loop error: {e}", exc_info=True)
+
+    def _drain_wake(self):
+        try:
+            while os.read(self._wake_r, 512):
+                pass
+        except BlockingIOError:
+            pass
+
+    def _apply_pending(self):
+        with self._lock:
+            pending, self._pending = self._pending, []
+        for op, watch in pending:
+            if op == "watch":
+                self._add(watch)
+            else:
+                self._remove(watch)
+
+    def _add(self, watch: _Watch):
+        previous = self._watches.get(watch.process.pid)
+        if previous is not None:
+            self._remove(previous)
+        self._watches[watch.process.pid] = watch
+        for name, stream in watch.streams.items():
+            os.set_blocking(stream.fileno(), False)
+            self._selector.register(stream, selectors.EVENT_READ, (watch, name))
+        try:
+            watch.pidfd = os.pidfd_open(watch.process.pid)
+        except (AttributeError, OSError):
+            return
+        if _exited(watch.process):
+            # Gone before the pidfd was opened; the pid may already be someone else's
+            os.close(watch.pidfd)
+            watch.pidfd = None
+            return
+        self._selector.register(watch.pidfd, selectors.EVENT_READ, (watch, None))
+
+    def _remove(self, watch: _Watch):
+        for stream in watch.streams.values():
+            try:
+                self._selector.unregister(stream)
+            except (KeyError, ValueError):
+                pass
+        watch.streams = {}
+        if watch.pidfd is not None:
+            self._selector.unregister(watch.pidfd)
+            os.close(watch.pidfd)
+            watch.pidfd = None
+        watch.done = True
+        if self._watches.get(watch.process.pid) is watch:
+            del self._watches[watch.process.pid]
+
+    def _read(self, watch: _Watch, name: str, stream) -> bool:
+        """Read one chunk; False once the pipe has nothing more right now."""
+        try:
+            data = os.read(stream.fileno(), self.READ_CHUNK_SIZE)
+        except BlockingIOError:
+            return False
+        except (OSError, ValueError):
+            data = b""
+        if not data:
+            self._close_stream(watch, name, stream)
+            return False
+        self._call(watch.on_output, name, data)
+        return True
+
+    def _close_stream(self, watch: _Watch, name: str, stream):
+        self._selector.unregister(stream)
+        del watch.streams[name]
+        try:
+            stream.close()
+        except OSError:
+            pass
+        self._call(watch.on_output, name, b"")
+
+    def _finish(self, watch: _Watch):
+        if watch.done:
+            return
+        # Whatever the process wrote before exiting is still in the pipes
+        for name, stream in list(watch.streams.items()):
+            while name in watch.streams and self._read(watch, name, stream):
+                pass
+            if name in watch.streams:
+                # Kept open by something the process left behind; stop reading it
+                self._close_stream(watch, name, stream)
+        returncode = watch.process.poll()
+        self._remove(watch)
+        self._call(watch.on_exit, returncode)
+
+    @staticmethod
+    def _call(callback, *args):
+        if callback is None:
+            return
+        try:
+            callback(*args)
+        except Exception as e:
+            logger.error(f"Process callback failed: {e}", exc_info=True)
@@ -2,14 +2,20 @@
 
 import subprocess
 import threading
+import time
 import os
-import shutil
 import platform
 import logging
 from pathlib import Path
 from typing import Optional, Callable
 from enum import Enum, auto
 
+from .binary_stager import BinaryStager
+from .daemon_rpc import DaemonRPC
+from .output_buffer import OutputRingBuffer, LineRateLimiter
+from .process_adoption import AdoptedProcess, PidFile, find_running
+from .process_event_loop import ProcessEventLoop
+
 logger = logging.getLogger(__name__)
 
 class ProcessState(Enum):
@@ -24,17 +30,33 @@ class ProcessState(Enum):
 class ProcessManager:
     """Manages binary process lifecycle."""
     
-    def __init__(self):
+    LOG_FILE_NAME = "monerod.log"
+    STOP_GRACE_PERIOD = 60
+    TERM_TIMEOUT = 10
+    FORWARD_LINES_PER_SEC = 20
+    
+    STREAM_PREFIXES = {"stdout": "monerod", "stderr": "monerod-err"}
+    
+    def __init__(self, event_loop: Optional[ProcessEventLoop] = None):
+        self._loop = event_loop or ProcessEventLoop.shared()
         self._process: Optional[subprocess.Popen] = None
         self._state = ProcessState.STOPPED
         self._binary_path: Optional[Path] = None
         self._working_dir: Optional[Path] = None
         self._extra_args: list[str] = []
-        self._stdout_thread: Optional[threading.Thread] = None
-        self._stderr_thread: Optional[threading.Thread] = None
+        self._pending_output: dict[str, bytes] = {}
         self._on_state_change: Optional[Callable[[ProcessState], None]] = None
+        self._listeners: list[Callable[[ProcessState], None]] = []
         self._last_error: Optional[str] = None
+        self._last_exit_code: Optional[int] = None
+        self._stop_requested = False
+        self._started_at: Optional[float] = None
+        self._pid_file: Optional[PidFile] = None
         self._is_android = self._check_android()
+        self._output = OutputRingBuffer()
+        self._forward_output = True
+        self._discard_stdout = False
+        self._forward_limiter = LineRateLimiter(self.FORWARD_LINES_PER_SEC)
     
     def _check_android(self) -> bool:
         """Check if running on Android."""
@@ -52,43 +74,178 @@ class ProcessManager:
     def is_running(self) -> bool:
         return self._state == ProcessState.RUNNING
     
+    @property
+    def pid(self) -> Optional[int]:
+        process = self._process
+        return process.pid if process else None
+    
+    @property
+    def adopted(self) -> bool:
+        """True if the current process was attached to with adopt() rather than started."""
+        return isinstance(self._process, AdoptedProcess)
+    
     @property
     def last_error(self) -> Optional[str]:
         return self._last_error
     
+    @property
+    def last_exit_code(self) -> Optional[int]:
+        return self._last_exit_code
+    
+    @property
+    def stop_requested(self) -> bool:
+        """True if the last exit was asked for through stop()."""
+        return self._stop_requested
+    
+    @property
+    def uptime(self) -> float:
+        """Seconds since the current (or last) process was started."""
+        return time.monotonic() - self._started_at if self._started_at else 0.0
+    
+    def add_listener(self, callback: Callable[[ProcessState], None]):
+        """Also report state changes to callback; unlike on_state_change, survives configure()."""
+        self._listeners.append(callback)
+    
+    def mark_error(self, message: str):
+        """Put a stopped process in ERROR, e.g. when a supervisor gives up on it."""
+        self._last_error = message
+        self._set_state(ProcessState.ERROR)
+    
+    @property
+    def output(self) -> OutputRingBuffer:
+        """Recent monerod stdout/stderr."""
+        return self._output
+    
+    def output_tail(self, count: int = 50) -> list[str]:
+        """Last count lines of monerod output, for the UI and crash reports."""
+        return self._output.tail_lines(count)
+    
     def configure(
         self,
         binary_path: Path,
         working_dir: Path,
         extra_args: Optional[list[str]] = None,
         on_state_change: Optional[Callable[[ProcessState], None]] = None,
+        forward_output: bool = True,
+        discard_stdout: bool = False,
     ):
-        """Configure the process manager."""
+        """Configure the process manager.
+        
+        forward_output copies monerod output to the app log (rate limited);
+        discard_stdout sends stdout to /dev/null, as --log-file already has it.
+        """
         self._binary_path = binary_path
         self._working_dir = working_dir
         self._extra_args = extra_args or []
         self._on_state_change = on_state_change
+        self._forward_output = forward_output
+        self._discard_stdout = discard_stdout
         self._process = None
         self._state = ProcessState.STOPPED
     
+    def _data_dir(self) -> Optional[str]:
+        """The --data-dir from the configured args."""
+        for i, arg in enumerate(self._extra_args):
+            if arg == "--data-dir" and i + 1 < len(self._extra_args):
+                return self._extra_args[i + 1]
+        return None
+    
+    @staticmethod
+    def find_existing(data_dir: Optional[Path], binary_path: Optional[Path] = None) -> Optional[int]:
+        """PID of a monerod already serving data_dir (started by the service or a previous UI), or None.
+        
+        Reads the pidfile and /proc only, so it answers instantly whether or
+        not monerod's RPC is up yet.
+        """
+        return find_running(data_dir, binary_path) if data_dir else None
+    
+    def existing_pid(self) -> Optional[int]:
+        """find_existing() for the configured data dir and binary."""
+        return self.find_existing(self._data_dir(), self._binary_path)
+    
+    def adopt(self, pid: int) -> bool:
+        """Attach to a monerod this process did not start.
+        
+        It is then monitored, sampled and stopped like a child; only its
+        output and exit code are not available.
+        """
+        if self._state in (ProcessState.RUNNING, ProcessState.STARTING, ProcessState.STOPPING):
+            logger.warning("Process already running, not adopting")
+            return False
+        try:
+            process = AdoptedProcess(pid)
+        except ProcessLookupError:
+            logger.warning(f"PID {pid} is gone, nothing to adopt")
+            return False
+        
+        logger.info(f"Adopted running monerod, PID: {pid}")
+        self._process = process
+        self._stop_requested = False
+        self._last_exit_code = None
+        self._last_error = None
+        self._started_at = time.monotonic()
+        self._output.clear()
+        data_dir = self._data_dir() or self._working_dir
+        self._pid_file = PidFile(data_dir) if data_dir else None
+        # The owner's pidfile carries its binary and stop mark; only replace a missing or stale one
+        if self._pid_file and self._pid_file.read() != pid:
+            self._pid_file.write(pid, str(self._binary_path or ""))
+        
+        self._loop.watch(process, on_exit=lambda rc: self._on_exit(process, rc))
+        self._set_state(ProcessState.RUNNING)
+        return True
+    
     def _set_state(self, state: ProcessState):
         self._state = state
         if self._on_state_change:
             self._on_state_change(state)
-    
-    def _stream_output(self, stream, prefix: str):
-        """Stream process output to logger."""
-        try:
-            for line in iter(stream.readline, b''):
-                if line:
-                    logger.info(f"{prefix}: {line.decode('utf-8', errors='replace').rstrip()}")
-        except Exception as e:
-            logger.error(f"Stream error: {e}")
-        finally:
+        for listener in self._listeners:
             try:
-                stream.close()
-            except:
-                pass
+                listener(state)
+            except Exception as e:
+                logger.error(f"State listener failed: {e}")
+    
+    def _on_output(self, name: str, data: bytes):
+        """Capture process output into the ring buffer; called on the event loop thread.
+        
+        Only whole lines go in, so stdout and stderr don't interleave mid-line.
+        data is b"" at EOF.
+        """
+        prefix = self.STREAM_PREFIXES.get(name, name)
+        pending = self._pending_output.get(name, b"")
+        if not data:
+            self._pending_output.pop(name, None)
+            if pending:
+                self._output.write(pending + b"\n")
+                if self._forward_output:
+                    self._forward(pending, prefix)
+            suppressed = self._forward_limiter.take_suppressed()
+            if suppressed:
+                logger.info(f"monerod: ({suppressed} output lines not logged)")
+            return
+        cut = data.rfind(b"\n")
+        if cut < 0:
+            pending += data
+            if len(pending) < self._output.capacity:
+                self._pending_output[name] = pending
+                return
+            lines, pending = pending, b""
+        else:
+            lines, pending = pending + data[:cut + 1], data[cut + 1:]
+        self._pending_output[name] = pending
+        self._output.write(lines)
+        if self._forward_output:
+            self._forward(lines, prefix)
+    
+    def _forward(self, data: bytes, prefix: str):
+        """Copy output lines to the app log, at most FORWARD_LINES_PER_SEC."""
+        for line in data.splitlines():
+            allowed, suppressed = self._forward_limiter.admit(time.monotonic())
+            if suppressed:
+                logger.info(f"{prefix}: ({suppressed} lines not logged)")
+            if not allowed:
+                continue
+            logger.info(f"{prefix}: {line.decode('utf-8', errors='replace').rstrip()}")
    
     def _prepare_executable(self) -> Optional[Path]:
         """Prepare executable for running (Android needs special handling)."""
@@ -107,20 +264,9 @@ class ProcessManager:
                 private_dir = os.environ.get("ANDROID_PRIVATE", "/data/data/org.monerodroid/files")
             
             internal_bin_dir = Path(private_dir) / "bin"
-            internal_bin_dir.mkdir(parents=True, exist_ok=True)
-            
-            exec_path = internal_bin_dir / "monerod"
-            
-            need_copy = True
-            if exec_path.exists():
-                if exec_path.stat().st_size == self._binary_path.stat().st_size:
-                    need_copy = False
-            
-            if need_copy:
-                logger.info(f"Copying binary: {self._binary_path} -> {exec_path}")
-                shutil.copy(str(self._binary_path), str(exec_path))
-            
-            exec_path.chmod(0o755)
+            exec_path = BinaryStager(internal_bin_dir).stage(self._binary_path)
+            if exec_path is None:
+                return None
             
             if not os.access(str(exec_path), os.X_OK):
                 logger.error(f"Failed to make {exec_path} executable")
@@ -144,17 +290,22 @@ class ProcessManager:
             return False
         
         # Extract data-dir from args - required
-        data_dir = None
-        for i, arg in enumerate(self._extra_args):
-            if arg == "--data-dir" and i + 1 < len(self._extra_args):
-                data_dir = self._extra_args[i + 1]
-                break
-        
+        data_dir = self._data_dir()
         if not data_dir:
             self._last_error = "No --data-dir specified"
             self._set_state(ProcessState.ERROR)
             return False
         
+        # A second monerod on the same data dir fails on the ports or the
+        # LMDB lock, and the pidfile of the one that runs must stay intact
+        running_pid = PidFile(Path(data_dir)).running(self._binary_path)
+        if running_pid:
+            self._last_error = f"monerod is already running for this data dir (PID {running_pid})"
+            logger.warning(self._last_error)
+            return False
+        
+        self._stop_requested = False
+        self._last_exit_code = None
         self._set_state(ProcessState.STARTING)
         self._last_error = None
         
@@ -185,9 +336,12 @@ class ProcessManager:
             
             args_str = ' '.join(self._extra_args)
             if "--log-file" not in args_str:
-                log_file = Path(data_dir) / "monerod.log"
+                log_file = Path(data_dir) / self.LOG_FILE_NAME
                 cmd.extend(["--log-file", str(log_file)])
             
+            # monerod always writes --log-file, so stdout would only be a second copy
+            stdout = subprocess.DEVNULL if self._discard_stdout else subprocess.PIPE
+            
             logger.info(f"Executing: {' '.join(cmd)}")
             
             env = os.environ.copy()
@@ -201,28 +355,25 @@ class ProcessManager:
             self._process = subprocess.Popen(
                 cmd,
                 cwd=data_dir,
-                stdout=subprocess.PIPE,
+                stdout=stdout,
                 stderr=subprocess.PIPE,
                 stdin=subprocess.DEVNULL,
                 env=env,
             )
             
             logger.info(f"Started PID: {self._process.pid}")
+            self._started_at = time.monotonic()
+            self._pid_file = PidFile(Path(data_dir))
+            self._pid_file.write(self._process.pid, str(executable))
             
-            self._stdout_thread = threading.Thread(
-                target=self._stream_output, 
-                args=(self._process.stdout, "monerod"), 
-                daemon=True
-            )
-            self._stderr_thread = threading.Thread(
-                target=self._stream_output, 
-                args=(self._process.stderr, "monerod-err"), 
-                daemon=True
+            self._output.clear()
+            self._pending_output = {}
+            process = self._process
+            self._loop.watch(
+                process,
+                on_output=self._on_output,
+                on_exit=lambda rc: self._on_exit(process, rc),
             )
-            self._stdout_thread.start()
-            self._stderr_thread.start()
-            
-            threading.Thread(target=self._monitor, daemon=True).start()
             
             self._set_state(ProcessState.RUNNING)
             return True
@@ -233,43 +384,150 @@ class ProcessManager:
             self._set_state(ProcessState.ERROR)
             return False
 
-    def stop(self) -> bool:
-        """Stop the binary process."""
-        if self._process is None:
-            logger.warning("No process to stop")
+    def stop(self, rpc: Optional[DaemonRPC] = None, grace_period: Optional[float] = None,
+             on_progress: Optional[Callable[[str], None]] = None) -> bool:
+        """Stop the binary process, blocking until it has exited."""
+        process = self._begin_stop()
+        if process is None:
+            return False
+        return self._shutdown(process, rpc, grace_period, on_progress) is not None
+    
+    def stop_async(
+        self,
+        rpc: Optional[DaemonRPC] = None,
+        grace_period: Optional[float] = None,
+        on_progress: Optional[Callable[[str], None]] = None,
+        on_done: Optional[Callable[[bool], None]] = None,
+    ) -> bool:
+        """Stop without blocking the caller.
+        
+        Asks monerod to exit through the stop_daemon RPC so LMDB is closed
+        cleanly, reports progress lines through on_progress, and only signals
+        the process once grace_period runs out. on_done(clean) runs on the
+        worker thread; clean is False if monerod had to be killed.
+        """
+        process = self._begin_stop()
+        if process is None:
             return False
         
+        def _run():
+            clean = self._shutdown(process, rpc, grace_period, on_progress)
+            if on_done:
+                on_done(bool(clean))
+        
+        threading.Thread(target=_run, daemon=True).start()
+        return True
+    
+    def _begin_stop(self) -> Optional[subprocess.Popen]:
+        process = self._process
+        if process is None:
+            logger.warning("No process to stop")
+            return None
+        if self._state == ProcessState.STOPPING:
+            logger.warning("Process already stopping")
+            return None
+        self._stop_requested = True
+        if self._pid_file:
+            self._pid_file.mark_stopping(process.pid)
         self._set_state(ProcessState.STOPPING)
+        return process
+    
+    def _shutdown(self, process: subprocess.Popen, rpc: Optional[DaemonRPC], grace_period: Optional[float],
+                  on_progress: Optional[Callable[[str], None]]) -> Optional[bool]:
+        """stop_daemon (or SIGTERM), wait, escalate. True unless SIGKILL was needed, None on error."""
+        grace_period = self.STOP_GRACE_PERIOD if grace_period is None else grace_period
+        
+        def progress(text: str):
+            logger.info(f"Shutdown: {text}")
+            if on_progress:
+                on_progress(text)
+        
         try:
-            logger.info("Terminating process")
-            self._process.terminate()
-            try:
-                self._process.wait(timeout=10)
-            except subprocess.TimeoutExpired:
+            requested = False
+            if rpc is not None:
+                progress("Asking monerod to shut down...")
+                requested = rpc.stop_daemon()
+            if not requested:
+                progress("RPC stop unavailable, sending SIGTERM")
+                process.terminate()
+            
+            clean = self._wait_exit(process, grace_period, progress)
+            if not clean and requested:
+                logger.warning(f"monerod still running after {grace_period:.0f}s, sending SIGTERM")
+                progress("Grace period over, sending SIGTERM")
+                process.terminate()
+                clean = self._wait_exit(process, self.TERM_TIMEOUT, progress)
+            if not clean:
                 logger.warning("Process didn't terminate, killing")
-                self._process.kill()
-                self._process.wait(timeout=2)
-            self._process = None
+                progress("Killing monerod")
+                process.kill()
+                process.wait(timeout=2)
+            
+            if self._process is process:
+                self._process = None
             self._set_state(ProcessState.STOPPED)
-            return True
+            return clean
         except Exception as e:
             self._last_error = str(e)
             logger.error(f"Stop failed: {e}")
             self._set_state(ProcessState.ERROR)
-            return False
+            return None
     
-    def _monitor(self):
-        """Monitor process and update state when it exits."""
-        if self._process:
-            rc = self._process.wait()
-            logger.info(f"Process exited with code: {rc}")
-            if self._state == ProcessState.RUNNING:
-                if rc != 0:
-                    self._last_error = f"Exited with code {rc}"
-                    self._set_state(ProcessState.ERROR)
-                else:
-                    self._set_state(ProcessState.STOPPED)
+    def _wait_exit(self, process: subprocess.Popen, timeout: float,
+                   progress: Callable[[str], None]) -> bool:
+        """Wait up to timeout for process to exit, reporting new output lines. True if it exited."""
+        deadline = time.monotonic() + timeout
+        started = time.monotonic()
+        last_line = None
+        while True:
+            try:
+                process.wait(timeout=min(1.0, max(0.0, deadline - time.monotonic())))
+                return True
+            except subprocess.TimeoutExpired:
+                pass
+            if time.monotonic() >= deadline:
+                return False
+            tail = self.output_tail(1)
+            line = tail[-1] if tail else None
+            if line and line != last_line:
+                progress(line)
+                last_line = line
+            else:
+                progress(f"Waiting for monerod to exit ({time.monotonic() - started:.0f}s)")
+    
+    def _on_exit(self, process, rc: Optional[int]):
+        """Update state when process exits; called on the event loop thread once its output is drained."""
+        self._last_exit_code = rc
+        if not self._stop_requested and self._pid_file and self._pid_file.stopping(process.pid):
+            # The UI or the service stopped it on purpose
+            logger.info("monerod was stopped by another process")
+            self._stop_requested = True
+        if not self._stop_requested:
+            self._remove_pid_file(process.pid)
+        adopted = isinstance(process, AdoptedProcess)
+        logger.info(f"Process exited with code: {'unknown (adopted)' if adopted else rc}")
+        # Clear before reporting, so a restart from a listener is not undone
+        if self._process is process:
             self._process = None
+        if self._state == ProcessState.RUNNING:
+            if adopted and self._stop_requested:
+                self._set_state(ProcessState.STOPPED)
+            elif adopted:
+                # Not our child: the exit status cannot be read, so treat it as unexpected
+                self._last_error = "monerod exited (not started by this process, exit code unknown)"
+                self._set_state(ProcessState.ERROR)
+            elif rc != 0:
+                tail = self.output_tail(20)
+                if tail:
+                    logger.error("Last monerod output:\n" + "\n".join(tail))
+                self._last_error = f"Exited with code {rc}" + (f": {tail[-1]}" if tail else "")
+                self._set_state(ProcessState.ERROR)
+            else:
+                self._set_state(ProcessState.STOPPED)
+    
+    def _remove_pid_file(self, pid: int):
+        if self._pid_file:
+            self._pid_file.remove(pid)
     
     def get_status(self) -> dict:
         """Return current process status."""
@@ -0,0 +1,154 @@
+"""Latest NodeStats shared between processes through an mmap'd file."""
+
+import os
+import json
+import mmap
+import time
+import struct
+import logging
+from dataclasses import asdict, fields
+from pathlib import Path
+from typing import Optional
+
+from .node_stats import NodeStats
+from .proc_sampler import ResourceStats
+
+logger = logging.getLogger(__name__)
+
+_MAGIC = b"MSTC"
+_VERSION = 1
+# magic, version, sequence, published (wall clock), payload length
+_HEADER = struct.Struct("<4sIQdI")
+_SEQ_OFFSET = 8
+_PAYLOAD_OFFSET = 32
+
+_STATS_FIELDS = {f.name for f in fields(NodeStats)}
+_RESOURCE_FIELDS = {f.name for f in fields(ResourceStats)}
+
+
+class StatsChannel:
+    """One writer publishes NodeStats snapshots, any process reads the latest.
+
+    The file has a fixed size and is mapped by both sides. Writes are
+    guarded by a sequence counter (a seqlock): the writer makes it odd,
+    writes the payload, then makes it even again; a reader retries when the
+    counter was odd or changed while it copied. Readers never block the
+    writer and no RPC or socket is involved.
+    """
+
+    FILE_NAME = "stats_channel.bin"
+    CAPACITY = 64 * 1024
+    READ_RETRIES = 5
+
+    def __init__(self, path: Path):
+        self._path = Path(path)
+        self._mm: Optional[mmap.mmap] = None
+        self._writable = False
+        self._inode: Optional[int] = None
+        self.last_published: Optional[float] = None
+
+    @property
+    def path(self) -> Path:
+        return self._path
+
+    def _map(self, write: bool) -> Optional[mmap.mmap]:
+        if self._mm is not None and (self._writable or not write):
+            if write or self._same_file():
+                return self._mm
+        self.close()
+        try:
+            if write:
+                self._path.parent.mkdir(parents=True, exist_ok=True)
+                fd = os.open(self._path, os.O_RDWR | os.O_CREAT, 0o600)
+            else:
+                fd = os.open(self._path, os.O_RDONLY)
+        except OSError:
+            return None
+        try:
+            st = os.fstat(fd)
+            if st.st_size < self.CAPACITY:
+                if not write:
+                    return None
+                os.ftruncate(fd, self.CAPACITY)
+            access = mmap.ACCESS_WRITE if write else mmap.ACCESS_READ
+            self._mm = mmap.mmap(fd, self.CAPACITY, access=access)
+            self._writable = write
+            self._inode = st.st_ino
+        except (OSError, ValueError) as e:
+            logger.warning(f"Cannot map stats channel {self._path}: {e}")
+            return None
+        finally:
+            os.close(fd)
+        if write and self._mm[:4] != _MAGIC:
+            _HEADER.pack_into(self._mm, 0, _MAGIC, _VERSION, 0, 0.0, 0)
+        return self._mm
+
+    def _same_file(self) -> bool:
+        # The writer may have recreated the file (e.g. app data cleared)
+        try:
+            return os.stat(self._path).st_ino == self._inode
+        except OSError:
+            return False
+
+    def publish(self, stats: NodeStats) -> bool:
+        """Make stats the latest snapshot. Single writer only."""
+        payload = json.dumps(asdict(stats), separators=(",", ":")).encode("utf-8")
+        if len(payload) > self.CAPACITY - _PAYLOAD_OFFSET:
+            logger.warning(f"Stats snapshot too large for channel ({len(payload)} bytes)")
+            return False
+        mm = self._map(write=True)
+        if mm is None:
+            return False
+        seq = _HEADER.unpack_from(mm, 0)[2]
+        if seq % 2:
+            seq += 1  # A writer died mid-update
+        now = time.time()
+        struct.pack_into("<Q", mm, _SEQ_OFFSET, seq + 1)
+        mm[_PAYLOAD_OFFSET:_PAYLOAD_OFFSET + len(payload)] = payload
+        _HEADER.pack_into(mm, 0, _MAGIC, _VERSION, seq + 1, now, len(payload))
+        struct.pack_into("<Q", mm, _SEQ_OFFSET, seq + 2)
+        self.last_published = now
+        return True
+
+    def read(self, max_age: Optional[float] = None) -> Optional[NodeStats]:
+        """The latest snapshot, or None if there is none (or it is older than max_age seconds)."""
+        mm = self._map(write=False)
+        if mm is None:
+            return None
+        for _ in range(self.READ_RETRIES):
+            magic, version, seq, published, length = _HEADER.unpack_from(mm, 0)
+            if magic != _MAGIC or version != _VERSION or seq == 0:
+                return None
+            if seq % 2:
+                time.sleep(0.001)
+                continue
+            payload = mm[_PAYLOAD_OFFSET:_PAYLOAD_OFFSET + min(length, self.CAPACITY - _PAYLOAD_OFFSET)]
+            if _HEADER.unpack_from(mm, 0)[2] == seq:
+                break
+        else:
+            return None
+        if max_age is not None and time.time() - published > max_age:
+            return None
+        self.last_published = published
+        try:
+            return self._decode(json.loads(payload))
+        except (ValueError, TypeError) as e:
+            logger.debug(f"Unreadable stats snapshot: {e}")
+            return None
+
+    @staticmethod
+    def _decode(data: dict) -> NodeStats:
+        stats = NodeStats(**{k: v for k, v in data.items() if k in _STATS_FIELDS and k != "resources"})
+        resources = data.get("resources")
+        if isinstance(resources, dict):
+            stats.resources = ResourceStats(**{k: v for k, v in resources.items() if k in _RESOURCE_FIELDS})
+        return stats
+
+    def close(self):
+        if self._mm is not None:
+            try:
+                self._mm.close()
+            except (OSError, ValueError):
+                pass
+            self._mm = None
+        self._inode = None
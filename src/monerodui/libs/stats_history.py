@@ -0,0 +1,88 @@
+"""Bounded time series of node metrics."""
+
+import time
+import logging
+import threading
+from collections import deque
+from pathlib import Path
+from typing import Optional
+
+from .json_cache import JsonCache
+
+logger = logging.getLogger(__name__)
+
+
+class StatsHistory:
+    """Recent samples per metric, for trends and charts.
+
+    Each metric keeps at most capacity (timestamp, value) samples. A sample
+    arriving within min_interval of the previous one replaces it, so bursty
+    sources (sync lines, fast polls) do not push older history out, and one
+    older than the newest sample is dropped. The series can be persisted so trends survive an app restart.
+    """
+
+    def __init__(self, capacity: int = 1440, min_interval: float = 10.0,
+                 cache_path: Optional[Path] = None):
+        self._capacity = capacity
+        self._min_interval = min_interval
+        self._cache = JsonCache(cache_path)
+        self._lock = threading.Lock()
+        self._series: dict[str, deque] = {}
+        self._load()
+
+    @property
+    def names(self) -> list[str]:
+        with self._lock:
+            return sorted(self._series)
+
+    def _load(self):
+        data = self._cache.load()
+        try:
+            for name, samples in data.get("series", {}).items():
+                self._series[name] = deque(
+                    ((float(ts), float(v)) for ts, v in samples), maxlen=self._capacity
+                )
+        except (TypeError, ValueError) as e:
+            logger.warning(f"Discarding stats history: {e}")
+            self._series = {}
+
+    def save(self) -> bool:
+        with self._lock:
+            data = {"series": {name: list(samples) for name, samples in self._series.items()}}
+        return self._cache.save(data)
+
+    def record(self, name: str, value: float, timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            samples = self._series.get(name)
+            if samples is None:
+                samples = self._series[name] = deque(maxlen=self._capacity)
+            if samples and timestamp < samples[-1][0]:
+                # Older than what the series already holds, e.g. a replayed log
+                return
+            if samples and timestamp - samples[-1][0] < self._min_interval:
+                samples[-1] = (samples[-1][0], float(value))
+            else:
+                samples.append((timestamp, float(value)))
+
+    def record_many(self, values: dict[str, float], timestamp: Optional[float] = None):
+        timestamp = time.time() if timestamp is None else timestamp
+        for name, value in values.items():
+            self.record(name, value, timestamp)
+
+    def series(self, name: str, since: Optional[float] = None) -> list[tuple[float, float]]:
+        with self._lock:
+            samples = list(self._series.get(name, ()))
+        if since is not None:
+            samples = [s for s in samples if s[0] >= since]
+        return samples
+
+    def latest(self, name: str) -> Optional[tuple[float, float]]:
+        with self._lock:
+            samples = self._series.get(name)
+            return samples[-1] if samples else None
+
+    def clear(self):
+        with self._lock:
+            self._series.clear()
+        self._cache.clear()
@@ -0,0 +1,275 @@
+"""Restart supervision for the monerod process."""
+
+import time
+import random
+import logging
+import threading
+from collections import deque
+from dataclasses import dataclass
+from enum import Enum
+from typing import Callable, Optional
+
+from .process_manager import ProcessManager, ProcessState
+
+logger = logging.getLogger(__name__)
+
+
+class RestartPolicy(Enum):
+    """When the supervisor restarts monerod after it exits on its own."""
+    NEVER = "never"
+    ON_FAILURE = "on-failure"
+    ALWAYS = "always"
+
+    @classmethod
+    def from_config(cls, value: str) -> "RestartPolicy":
+        try:
+            return cls(value)
+        except ValueError:
+            return cls.ON_FAILURE
+
+
+@dataclass
+class ExitRecord:
+    """One unrequested exit of monerod (or a failed start).
+
+    code is None for failed starts and for adopted processes, whose exit
+    status cannot be read.
+    """
+    timestamp: float
+    code: Optional[int]
+    uptime: float
+    error: str = ""
+    failed_start: bool = False
+
+    @property
+    def display_string(self) -> str:
+        if self.failed_start:
+            return "start failed"
+        return "exit ?" if self.code is None else f"exit {self.code}"
+
+
+class Supervisor:
+    """Keeps monerod running according to a RestartPolicy.
+
+    Restarts back off exponentially (base_delay doubling up to max_delay,
+    randomised by +-jitter) and the backoff resets once a run lasts
+    stable_after seconds. max_crashes exits within crash_window mean a
+    crash loop: the process is parked in ERROR until the user starts it
+    again. start() and stop() express the user's intent and replace direct
+    ProcessManager.start()/stop() calls.
+    """
+
+    HISTORY_SIZE = 10
+
+    def __init__(
+        self,
+        process_manager: ProcessManager,
+        policy: RestartPolicy = RestartPolicy.ON_FAILURE,
+        base_delay: float = 5.0,
+        max_delay: float = 300.0,
+        jitter: float = 0.2,
+        crash_window: float = 600.0,
+        max_crashes: int = 5,
+        stable_after: float = 120.0,
+        on_change: Optional[Callable[["Supervisor"], None]] = None,
+    ):
+        self._pm = process_manager
+        self.policy = policy
+        self._base_delay = base_delay
+        self._max_delay = max_delay
+        self._jitter = jitter
+        self._crash_window = crash_window
+        self._max_crashes = max_crashes
+        self._stable_after = stable_after
+        self._on_change = on_change
+        self._lock = threading.RLock()
+        self._wanted = False
+        self._timer: Optional[threading.Timer] = None
+        self._next_restart: Optional[float] = None
+        self._failures = 0
+        self._restart_count = 0
+        self._parked_reason: Optional[str] = None
+        self._window_start = 0.0
+        self._launching = False
+        self._history: deque[ExitRecord] = deque(maxlen=self.HISTORY_SIZE)
+        self._pm.add_listener(self._on_state)
+
+    @property
+    def restart_count(self) -> int:
+        return self._restart_count
+
+    @property
+    def exit_history(self) -> list[ExitRecord]:
+        return list(self._history)
+
+    @property
+    def parked(self) -> bool:
+        return self._parked_reason is not None
+
+    @property
+    def idle(self) -> bool:
+        """Nothing running or starting under this supervisor and no restart scheduled."""
+        return (self._pm.state not in (ProcessState.RUNNING, ProcessState.STARTING, ProcessState.STOPPING)
+                and self._next_restart is None and not self._launching)
+
+    @property
+    def restart_pending(self) -> bool:
+        return self._next_restart is not None
+
+    @property
+    def seconds_until_restart(self) -> Optional[float]:
+        if self._next_restart is None:
+            return None
+        return max(0.0, self._next_restart - time.monotonic())
+
+    @property
+    def status_text(self) -> str:
+        """Short summary for the status card and notification; empty when nothing happened."""
+        if self._parked_reason:
+            return self._parked_reason
+        parts = []
+        wait = self.seconds_until_restart
+        if wait is not None:
+            parts.append(f"Restarting in {wait:.0f}s")
+        if self._restart_count:
+            parts.append(f"{self._restart_count} restart{'s' if self._restart_count != 1 else ''}")
+        if self._history:
+            parts.append(", ".join(r.display_string for r in list(self._history)[-3:]))
+        return " • ".join(parts)
+
+    def start(self) -> bool:
+        """User start: clears a crash-loop park and the backoff."""
+        with self._lock:
+            self._wanted = True
+            self._parked_reason = None
+            self._failures = 0
+            self._window_start = time.time()
+            self._cancel_timer()
+        return self._launch()
+
+    def adopt(self, pid: int) -> bool:
+        """Take over a monerod that is already running, as if start() had launched it."""
+        with self._lock:
+            self._wanted = True
+            self._parked_reason = None
+            self._failures = 0
+            self._window_start = time.time()
+            self._cancel_timer()
+        if not self._pm.adopt(pid):
+            return False
+        self._notify()
+        return True
+
+    def stop(self, **stop_kwargs) -> bool:
+        """User stop: no restarts until start() is called again.
+        
+        Does not block; stop_kwargs go to ProcessManager.stop_async.
+        """
+        with self._lock:
+            self._wanted = False
+            self._cancel_timer()
+        self._notify()
+        if self._pm.is_running:
+            return self._pm.stop_async(**stop_kwargs)
+        return True
+
+    def _launch(self) -> bool:
+        if self._pm.state in (ProcessState.RUNNING, ProcessState.STARTING):
+            return True
+        if self._adopt_existing():
+            return True
+        self._launching = True
+        try:
+            started = self._pm.start()
+        finally:
+            self._launching = False
+        if started:
+            self._notify()
+            return True
+        if self._adopt_existing():
+            # Lost a race with the other supervisor's launch
+            return True
+        # A failed start counts like a crash, so a bad config cannot spin either
+        self._handle_exit(None, self._pm.last_error or "", failed_start=True)
+        return False
+
+    def _adopt_existing(self) -> bool:
+        """Adopt a monerod already serving the data dir instead of starting a second one.
+
+        The UI and the service may both supervise the same node; after a
+        crash the other one may have relaunched it first.
+        """
+        existing_pid = self._pm.existing_pid()
+        if not existing_pid or not self._pm.adopt(existing_pid):
+            return False
+        logger.info(f"monerod already running (PID {existing_pid}), adopted instead of starting")
+        self._notify()
+        return True
+
+    def _on_state(self, state: ProcessState):
+        if state not in (ProcessState.STOPPED, ProcessState.ERROR):
+            return
+        if self._pm.stop_requested or not self._wanted or self.parked or self._launching:
+            # Failed starts are handled by _launch
+            return
+        self._handle_exit(self._pm.last_exit_code, self._pm.last_error or "")
+
+    def _handle_exit(self, code: Optional[int], error: str, failed_start: bool = False):
+        with self._lock:
+            uptime = 0.0 if failed_start else self._pm.uptime
+            now = time.time()
+            self._history.append(ExitRecord(now, code, uptime, error, failed_start))
+            if uptime >= self._stable_after:
+                self._failures = 0
+            self._failures += 1
+
+            if self.policy == RestartPolicy.NEVER or (self.policy == RestartPolicy.ON_FAILURE and code == 0):
+                logger.info(f"monerod exited ({code}); restart policy {self.policy.value}")
+                self._wanted = False
+                self._notify()
+                return
+
+            # Exits before the last user start() do not count towards a crash loop
+            window_start = max(self._window_start, now - self._crash_window)
+            recent = [r for r in self._history if r.timestamp >= window_start]
+            if len(recent) >= self._max_crashes:
+                self._parked_reason = (f"Crash loop: {len(recent)} exits in "
+                                       f"{self._crash_window / 60:.0f} min")
+                self._wanted = False
+                logger.error(f"{self._parked_reason}; not restarting until started manually")
+                park = True
+            else:
+                park = False
+                delay = min(self._max_delay, self._base_delay * 2 ** (self._failures - 1))
+                delay *= random.uniform(1 - self._jitter, 1 + self._jitter)
+                logger.warning(f"monerod exited ({code}); restart {self._failures} in {delay:.1f}s")
+                self._next_restart = time.monotonic() + delay
+                self._timer = threading.Timer(delay, self._restart)
+                self._timer.daemon = True
+                self._timer.start()
+        if park:
+            self._pm.mark_error(self._parked_reason)
+        self._notify()
+
+    def _restart(self):
+        with self._lock:
+            self._timer = None
+            self._next_restart = None
+            if not self._wanted or self._pm.is_running:
+                return
+            self._restart_count += 1
+        logger.info(f"Supervisor restarting monerod (restart #{self._restart_count})")
+        self._launch()
+
+    def _cancel_timer(self):
+        if self._timer:
+            self._timer.cancel()
+            self._timer = None
+        self._next_restart = None
+
+    def _notify(self):
+        if self._on_change:
+            try:
+                self._on_change(self)
+            except Exception as e:
+                logger.error(f"Supervisor change callback failed: {e}")
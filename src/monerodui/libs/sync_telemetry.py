@@ -0,0 +1,246 @@
+"""Sync telemetry parsed from monerod's log output."""
+
+import re
+import time
+import logging
+import threading
+from dataclasses import dataclass, replace
+from pathlib import Path
+from typing import Callable, Optional, Union
+
+from .log_tail import LogTail
+from .log_index import parse_timestamp
+from .stats_history import StatsHistory
+
+logger = logging.getLogger(__name__)
+
+# One pass over each chunk finds every known line; the last group names the event.
+# The leading lookahead lets the scanner skip positions that cannot start a match.
+_EVENTS = re.compile(
+    rb"(?=[BDHILSTYd])(?:"
+    rb"Synced (?P<height>\d+)/(?P<target>\d+)"
+    rb"|Block process time \((?P<blocks>\d+) blocks, (?P<txs>\d+) txs\): (?P<ms>\d+)"
+    rb"|(?P<drop>dropping connection|Host \S+ blocked)"
+    rb"|(?P<phase>Initializing core\.|Loading blockchain from folder|Initializing p2p server"
+    rb"|Starting core RPC server|The daemon will start synchronizing"
+    rb"|You are now synchronized|Deinitializing core|Stopping cryptonote protocol))"
+)
+_PEER = re.compile(rb"\[([^\]\s]+) (?:INC|OUT)\]\s*")
+_HOST = re.compile(rb"Host (\S+) blocked")
+
+_PHASES = {
+    b"Initializing core.": "initializing",
+    b"Loading blockchain from folder": "loading_blockchain",
+    b"Initializing p2p server": "starting_p2p",
+    b"Starting core RPC server": "starting_rpc",
+    b"The daemon will start synchronizing": "synchronizing",
+    b"You are now synchronized": "synchronized",
+    b"Deinitializing core": "stopping",
+    b"Stopping cryptonote protocol": "stopping",
+}
+
+
+@dataclass
+class SyncBatch:
+    """A "Synced height/target" progress line."""
+    timestamp: float
+    height: int
+    target_height: int
+
+
+@dataclass
+class BlockTiming:
+    """Processing time of one batch of downloaded blocks."""
+    timestamp: float
+    blocks: int
+    txs: int
+    ms: int
+
+
+@dataclass
+class PeerDrop:
+    """A peer connection dropped or a host blocked by monerod."""
+    timestamp: float
+    address: str
+    reason: str
+
+
+@dataclass
+class StartupPhase:
+    """A daemon lifecycle milestone (loading blockchain, RPC up, synced...)."""
+    timestamp: float
+    phase: str
+
+
+TelemetryEvent = Union[SyncBatch, BlockTiming, PeerDrop, StartupPhase]
+
+
+@dataclass
+class SyncTelemetry:
+    """Aggregate of the events seen so far in the current daemon run."""
+    height: int = 0
+    target_height: int = 0
+    blocks_per_second: float = 0.0
+    block_process_ms: float = 0.0
+    phase: str = ""
+    peer_drops: int = 0
+    updated: float = 0.0
+
+
+class SyncTelemetryParser:
+    """Turns monerod output into typed events, reading only new bytes.
+
+    feed() takes raw output from any source; follow() and poll() track the
+    log file through LogTail, so each poll costs one pread of what was
+    appended. Known lines are found with a single precompiled alternation
+    scanned over the whole chunk, so unrelated lines never reach Python.
+    """
+
+    BACKLOG_LINES = 500
+    RATE_WINDOW = 30.0
+    RATE_SMOOTHING = 0.3
+
+    def __init__(self, history: Optional[StatsHistory] = None,
+                 on_event: Optional[Callable[[TelemetryEvent], None]] = None):
+        self._history = history
+        self._on_event = on_event
+        self._lock = threading.Lock()
+        self._tail: Optional[LogTail] = None
+        self._pending = b""
+        self._state = SyncTelemetry()
+        self._rate_anchor: Optional[tuple[int, float]] = None
+
+    @property
+    def telemetry(self) -> SyncTelemetry:
+        with self._lock:
+            return replace(self._state)
+
+    def follow(self, log_path: Optional[Path]):
+        """Follow log_path from its last BACKLOG_LINES; None stops following."""
+        backlog = []
+        with self._lock:
+            if self._tail and log_path and self._tail.path == Path(log_path):
+                return
+            if self._tail:
+                self._tail.close()
+                self._tail = None
+            self._pending = b""
+            if log_path:
+                self._tail = LogTail(log_path)
+                backlog = self._tail.read_last(self.BACKLOG_LINES)
+        if backlog:
+            self.feed("\n".join(backlog).encode("utf-8") + b"\n")
+
+    def poll(self) -> list[TelemetryEvent]:
+        """Parse whatever was appended to the followed log since the last poll."""
+        with self._lock:
+            tail = self._tail
+        if tail is None:
+            return []
+        try:
+            data, _ = tail.poll_bytes()
+        except OSError as e:
+            logger.debug(f"Telemetry poll failed: {e}")
+            return []
+        return self.feed(data) if data else []
+
+    def feed(self, data: bytes) -> list[TelemetryEvent]:
+        """Parse a chunk of output; a trailing partial line waits for the next chunk."""
+        # follow() on the UI thread and poll() on the stats worker both feed
+        with self._lock:
+            data = self._pending + data
+            cut = data.rfind(b"\n") + 1
+            self._pending = data[cut:]
+        events = []
+        for m in _EVENTS.finditer(data, 0, cut):
+            line_start = data.rfind(b"\n", 0, m.start()) + 1
+            ts = parse_timestamp(data[line_start:line_start + 32]) or time.time()
+            event = self._make_event(m, data, line_start, ts)
+            if event is not None:
+                events.append(event)
+        if events:
+            with self._lock:
+                for event in events:
+                    self._apply_event(event)
+            if self._on_event:
+                for event in events:
+                    self._on_event(event)
+        return events
+
+    @staticmethod
+    def _make_event(m: re.Match, data: bytes, line_start: int, ts: float) -> Optional[TelemetryEvent]:
+        kind = m.lastgroup
+        if kind == "target":
+            return SyncBatch(ts, int(m.group("height")), int(m.group("target")))
+        if kind == "ms":
+            return BlockTiming(ts, int(m.group("blocks")), int(m.group("txs")), int(m.group("ms")))
+        if kind == "phase":
+            return StartupPhase(ts, _PHASES[m.group("phase")])
+        if kind == "drop":
+            line = data[line_start:m.end()]
+            host = _HOST.search(line)
+            if host:
+                return PeerDrop(ts, host.group(1).decode("ascii", "replace"), "blocked")
+            peer = _PEER.search(line)
+            if not peer:
+                return PeerDrop(ts, "", "dropped")
+            reason = line[peer.end():m.start() - line_start].rstrip(b", ")
+            return PeerDrop(ts, peer.group(1).decode("ascii", "replace"),
+                            reason.decode("utf-8", "replace") or "dropped")
+        return None
+
+    def _apply_event(self, event: TelemetryEvent):
+        state = self._state
+        state.updated = time.time()
+        if isinstance(event, SyncBatch):
+            self._update_rate(event)
+            state.height = event.height
+            state.target_height = event.target_height
+            self._record("sync_height", event.height, event.timestamp)
+        elif isinstance(event, BlockTiming):
+            if event.blocks:
+                state.block_process_ms = event.ms / event.blocks
+                self._record("block_process_ms", state.block_process_ms, event.timestamp)
+        elif isinstance(event, PeerDrop):
+            state.peer_drops += 1
+            self._record("peer_drops", state.peer_drops, event.timestamp)
+        elif isinstance(event, StartupPhase):
+            if event.phase == "initializing":
+                # A new daemon run: counters from the previous one no longer apply
+                self._state = SyncTelemetry(phase=event.phase, updated=state.updated)
+                self._rate_anchor = None
+            else:
+                state.phase = event.phase
+
+    def _update_rate(self, event: SyncBatch):
+        """Blocks per second over RATE_WINDOW of log time, exponentially smoothed."""
+        anchor = self._rate_anchor
+        if anchor is None or event.height < anchor[0]:
+            self._rate_anchor = (event.height, event.timestamp)
+            return
+        elapsed = event.timestamp - anchor[1]
+        if elapsed < self.RATE_WINDOW:
+            return
+        rate = (event.height - anchor[0]) / elapsed
+        state = self._state
+        if state.blocks_per_second:
+            rate = self.RATE_SMOOTHING * rate + (1 - self.RATE_SMOOTHING) * state.blocks_per_second
+        state.blocks_per_second = rate
+        self._rate_anchor = (event.height, event.timestamp)
+        self._record("sync_rate", rate, event.timestamp)
+
+    def _record(self, name: str, value: float, timestamp: float):
+        """Record at the log line's time, so a replayed backlog keeps its spacing."""
+        if self._history:
+            self._history.record(name, value, timestamp)
+
+    def apply(self, stats):
+        """Copy the current telemetry into a NodeStats."""
+        telemetry = self.telemetry
+        stats.log_height = telemetry.height
+        stats.sync_rate = telemetry.blocks_per_second
+        stats.block_process_ms = telemetry.block_process_ms
+        stats.startup_phase = telemetry.phase
+        stats.peer_drops = telemetry.peer_drops
+        if not stats.target_height and telemetry.target_height:
+            stats.target_height = telemetry.target_height
@@ -1,17 +1,21 @@
 """Remote update checking via MoneroPulse DNS."""
 
 import json
+import time
 import logging
+import threading
 import urllib.request
-import urllib.error
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from dataclasses import dataclass
-from typing import Optional, Tuple
+from pathlib import Path
+from typing import Optional, Tuple, Callable
 
 import os
 if 'ANDROID_ROOT' in os.environ:
     os.environ['SSL_CERT_FILE'] = '/etc/security/cacerts'
 
 from .version_checker import VersionChecker
+from .json_cache import JsonCache
 
 logger = logging.getLogger(__name__)
 
@@ -37,17 +41,64 @@ class UpdateChecker:
     """Checks for updates via MoneroPulse DNS-over-HTTPS."""
     
     DNS_URL = "https://dns.nextdns.io/resolve?name=updates.moneropulse.org&type=TXT"
+    DEFAULT_RESOLVERS = [
+        DNS_URL,
+        "https://cloudflare-dns.com/dns-query?name=updates.moneropulse.org&type=TXT",
+        "https://dns.google/resolve?name=updates.moneropulse.org&type=TXT",
+    ]
+    FETCH_TIMEOUT = 10
+    # Slower resolvers start this much later per rank, so a fast winner
+    # usually finishes before the rest are even contacted.
+    HEDGE_DELAY = 0.2
+    LATENCY_ALPHA = 0.3
+    DEFAULT_TTL = 3600
+    MIN_TTL = 300
+    MAX_TTL = 86400
     
-    def __init__(self, version_checker: VersionChecker, is_android: bool = False, arch: str = "amd64"):
+    def __init__(
+        self,
+        version_checker: VersionChecker,
+        is_android: bool = False,
+        arch: str = "amd64",
+        cache_path: Optional[Path] = None,
+        on_update: Optional[Callable[[UpdateStatus], None]] = None,
+        resolvers: Optional[list[str]] = None,
+    ):
         self._version_checker = version_checker
         self._is_android = is_android
         self._arch = arch
         self._cached_status: Optional[UpdateStatus] = None
+        self._disk_cache = JsonCache(cache_path)
+        self._on_update = on_update
+        self._refresh_lock = threading.Lock()
+        self._refreshing = False
+        self._resolvers = list(resolvers or self.DEFAULT_RESOLVERS)
+        self._stats_lock = threading.Lock()
+        self._resolver_latency: dict[str, float] = dict(
+            self._disk_cache.load().get("resolver_latency", {})
+        )
+    
+    @property
+    def status(self) -> Optional[UpdateStatus]:
+        """Last status served or fetched."""
+        return self._cached_status
+    
+    @property
+    def platform(self) -> str:
+        """Release platform name used in MoneroPulse records, e.g. linux-x64."""
+        return self._get_dns_target().split(":")[1]
+    
+    def set_resolvers(self, resolvers: list[str]):
+        """Replace the DoH resolver list (empty restores the defaults)."""
+        self._resolvers = [r.strip() for r in resolvers if r.strip()] or list(self.DEFAULT_RESOLVERS)
     
     def check(self, force: bool = False) -> UpdateStatus:
-        if self._cached_status and not force:
-            return self._cached_status
+        """Return the best known status without touching the network.
         
+        Fresh disk-cached records are served as-is; stale or missing ones are
+        served (or reported as pending) while a background refresh runs and
+        reports through on_update.
+        """
         status = UpdateStatus()
         
         local = self._version_checker.cached_version
@@ -56,22 +107,76 @@ class UpdateChecker:
             logger.warning(status.error)
             return status
         
+        entry = self._disk_cache.load().get(self._get_dns_target())
+        if entry:
+            status = self._build_status(local.version, entry["remote_version"], entry["remote_hash"])
+            self._cached_status = status
+            if force or time.time() >= entry.get("expires_at", 0):
+                self.refresh_async()
+            return status
+        
+        self.refresh_async()
         status.local_version = local.version
+        status.error = "Update check pending"
+        return status
+    
+    def refresh_async(self):
+        """Revalidate the record in the background (at most one refresh at a time)."""
+        with self._refresh_lock:
+            if self._refreshing:
+                return
+            self._refreshing = True
+        threading.Thread(target=self._refresh, daemon=True).start()
+    
+    def _refresh(self):
+        try:
+            status = self.refresh()
+        finally:
+            with self._refresh_lock:
+                self._refreshing = False
+        if status and self._on_update:
+            try:
+                self._on_update(status)
+            except Exception as e:
+                logger.error(f"Update callback failed: {e}")
+    
+    def refresh(self) -> Optional[UpdateStatus]:
+        """Fetch, parse and persist the MoneroPulse record (blocking)."""
+        local = self._version_checker.cached_version
+        if not local or not local.version:
+            return None
         
-        remote = self._fetch_remote_version()
-        if not remote:
-            status.error = "Failed to fetch remote version"
-            return status
+        record = self._race_resolvers()
+        if not record:
+            return UpdateStatus(local_version=local.version, error="Failed to fetch remote version")
+        
+        remote_version, remote_hash, ttl = record
+        now = time.time()
+        self._disk_cache.update(self._get_dns_target(), {
+            "remote_version": remote_version,
+            "remote_hash": remote_hash,
+            "fetched_at": now,
+            "expires_at": now + ttl,
+        })
+        with self._stats_lock:
+            self._disk_cache.update("resolver_latency", dict(self._resolver_latency))
         
-        status.remote_version, status.remote_hash = remote
+        status = self._build_status(local.version, remote_version, remote_hash)
+        self._cached_status = status
+        return status
+    
+    def _build_status(self, local_version: str, remote_version: str, remote_hash: str) -> UpdateStatus:
+        status = UpdateStatus(
+            local_version=local_version,
+            remote_version=remote_version,
+            remote_hash=remote_hash,
+        )
         status.update_available = self._compare(status.local_version, status.remote_version)
         
         if status.update_available:
             logger.info(f"Update available: {status.local_version} -> {status.remote_version}")
         else:
             logger.debug(f"Up to date: {status.local_version} >= {status.remote_version}")
-        
-        self._cached_status = status
         return status
     
     def _get_dns_target(self) -> str:
@@ -89,65 +194,111 @@ class UpdateChecker:
             return "monero:linux-armv7:"
         return "monero:linux-x64:"
 
-    def _fetch_remote_version(self) -> Optional[Tuple[str, str]]:
+    def _ordered_resolvers(self) -> list[str]:
+        """Resolvers sorted by smoothed latency; unknown ones go after measured ones."""
+        with self._stats_lock:
+            latency = dict(self._resolver_latency)
+        return sorted(
+            self._resolvers,
+            key=lambda url: (url not in latency, latency.get(url, 0.0)),
+        )
+    
+    def _record_latency(self, url: str, elapsed: Optional[float]):
+        """EWMA of response time; failures count as a full timeout."""
+        sample = elapsed if elapsed is not None else float(self.FETCH_TIMEOUT)
+        with self._stats_lock:
+            previous = self._resolver_latency.get(url)
+            if previous is None:
+                self._resolver_latency[url] = sample
+            else:
+                self._resolver_latency[url] = previous + self.LATENCY_ALPHA * (sample - previous)
+    
+    def _race_resolvers(self) -> Optional[Tuple[str, str, int]]:
+        """Query resolvers concurrently and return the first matching record."""
+        resolvers = self._ordered_resolvers()
+        if not resolvers:
+            return None
+        
+        finished = threading.Event()
+        
+        def attempt(rank: int, url: str):
+            if rank and finished.wait(self.HEDGE_DELAY * rank):
+                return url, None
+            start = time.monotonic()
+            body = self._fetch_dns_response(url)
+            record = self._parse_response(body) if body else None
+            self._record_latency(url, time.monotonic() - start if record else None)
+            return url, record
+        
+        executor = ThreadPoolExecutor(max_workers=len(resolvers), thread_name_prefix="doh")
+        futures = [executor.submit(attempt, rank, url) for rank, url in enumerate(resolvers)]
+        try:
+            for future in as_completed(futures):
+                url, record = future.result()
+                if record:
+                    logger.info(f"Update record from {url}")
+                    return record
+        finally:
+            finished.set()
+            executor.shutdown(wait=False, cancel_futures=True)
+        
+        logger.warning("No resolver returned a usable update record")
+        return None
+    
+    def _fetch_dns_response(self, url: str) -> Optional[str]:
+        """Raw DoH JSON body; the only platform-specific part of the lookup."""
+        try:
             if self._is_android:
                 from jnius import autoclass
                 URL = autoclass('java.net.URL')
                 
-                url = URL("https://dns.nextdns.io/resolve?name=updates.moneropulse.org&type=TXT")
-                conn = url.openConnection()
+                conn = URL(url).openConnection()
+                conn.setRequestProperty("Accept", "application/dns-json")
+                conn.setConnectTimeout(self.FETCH_TIMEOUT * 1000)
+                conn.setReadTimeout(self.FETCH_TIMEOUT * 1000)
                 stream = conn.getInputStream()
                 reader = autoclass('java.io.BufferedReader')(autoclass('java.io.InputStreamReader')(stream))
-                response = reader.readLine()
-                reader.close()
-
-                data = json.loads(response)
-
-                answers = data.get("Answer", [])
-                if not answers:
-                    logger.warning("No DNS TXT records returned")
-                    return None
-
-                target = self._get_dns_target()
-                for answer in answers:
-                    raw = answer.get("data", "").strip('"')
-                    if raw.startswith(target):
-                        parts = raw.split(":")
-                        if len(parts) == 4:
-                            return parts[2], parts[3]
-
-                logger.warning(f"No matching platform in DNS records for {target}")
-                return None
-
-            else:
                 try:
-                    req = urllib.request.Request(self.DNS_URL, headers={"Accept": "application/json"})
-                    with urllib.request.urlopen(req, timeout=10) as resp:
-                        data = json.loads(resp.read().decode())
-                    
-                    answers = data.get("Answer", [])
-                    if not answers:
-                        logger.warning("No DNS TXT records returned")
-                        return None
-                    
-                    target = self._get_dns_target()
-                    for answer in answers:
-                        raw = answer.get("data", "").strip('"')
-                        if raw.startswith(target):
-                            parts = raw.split(":")
-                            if len(parts) == 4:
-                                return parts[2], parts[3]
-                    
-                    logger.warning(f"No matching platform in DNS records for {target}")
-                    return None
-                
-                except (urllib.error.URLError, TimeoutError) as e:
-                    logger.error(f"DNS fetch failed: {e}")
-                    return None
+                    return reader.readLine()
+                finally:
+                    reader.close()
+            
+            req = urllib.request.Request(url, headers={"Accept": "application/dns-json"})
+            with urllib.request.urlopen(req, timeout=self.FETCH_TIMEOUT) as resp:
+                return resp.read().decode()
+        
+        except Exception as e:
+            logger.warning(f"DNS fetch failed ({url}): {e}")
+        return None
+    
+    def _parse_response(self, body: str) -> Optional[Tuple[str, str, int]]:
+        """Extract (version, hash, ttl) for this platform from a DoH JSON answer."""
+        try:
+            data = json.loads(body)
+        except (json.JSONDecodeError, ValueError) as e:
+            logger.error(f"DNS parse failed: {e}")
+            return None
+        
+        answers = data.get("Answer", []) if isinstance(data, dict) else []
+        if not answers:
+            logger.warning("No DNS TXT records returned")
+            return None
+        
+        target = self._get_dns_target()
+        for answer in answers:
+            raw = str(answer.get("data", "")).strip('"')
+            if raw.startswith(target):
+                parts = raw.split(":")
+                if len(parts) == 4:
+                    try:
+                        ttl = int(answer.get("TTL", self.DEFAULT_TTL))
+                    except (TypeError, ValueError):
+                        ttl = self.DEFAULT_TTL
+                    ttl = max(self.MIN_TTL, min(self.MAX_TTL, ttl))
+                    return parts[2], parts[3], ttl
         
-                except (json.JSONDecodeError, KeyError, ValueError) as e:
-                    logger.error(f"DNS parse failed: {e}")
-                    return None
+        logger.warning(f"No matching platform in DNS records for {target}")
+        return None
 
     def _compare(self, local: str, remote: str) -> bool:
         try:
@@ -3,10 +3,14 @@
 import subprocess
 import re
 import os
+import hashlib
 import logging
+import threading
 from pathlib import Path
-from dataclasses import dataclass
-from typing import Optional
+from dataclasses import dataclass, asdict
+from typing import Optional, Callable
+
+from .json_cache import JsonCache
 
 logger = logging.getLogger(__name__)
 
@@ -35,10 +39,22 @@ class VersionChecker:
         r"Monero '([^']+)' \(v([0-9.]+)(-\w+)?\)"
     )
     
-    def __init__(self, binary_path: Optional[Path] = None):
+    HASH_CHUNK_SIZE = 1024 * 1024
+    
+    def __init__(
+        self,
+        binary_path: Optional[Path] = None,
+        cache_path: Optional[Path] = None,
+        verify_hash: bool = False,
+        on_version_change: Optional[Callable[[Optional[BinaryVersion]], None]] = None,
+    ):
         self.binary_path = binary_path
         self._cached_version: Optional[BinaryVersion] = None
         self._is_android = self._check_android()
+        self._disk_cache = JsonCache(cache_path)
+        self._verify_hash = verify_hash
+        self._on_version_change = on_version_change
+        self._lock = threading.Lock()
     
     def _check_android(self) -> bool:
         """Check if running on Android."""
@@ -52,6 +68,28 @@ class VersionChecker:
         self.binary_path = path
         self._cached_version = None
     
+    @staticmethod
+    def file_identity(path: Path) -> Optional[dict]:
+        """Cheap identity of a file: changes whenever the binary is replaced."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        return {
+            "path": str(path),
+            "size": st.st_size,
+            "mtime_ns": st.st_mtime_ns,
+            "inode": st.st_ino,
+        }
+    
+    @classmethod
+    def file_digest(cls, path: Path) -> str:
+        h = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(cls.HASH_CHUNK_SIZE), b""):
+                h.update(chunk)
+        return h.hexdigest()
+    
     def get_version(self, force_refresh: bool = False) -> Optional[BinaryVersion]:
         if self._cached_version and not force_refresh:
             return self._cached_version
@@ -60,9 +98,34 @@ class VersionChecker:
             logger.warning("Binary path not set or doesn't exist")
             return None
         
+        binary_path = self.binary_path
+        identity = self.file_identity(binary_path)
+        
+        if not force_refresh and identity:
+            entry = self._disk_cache.load().get(str(binary_path))
+            if entry and entry.get("identity") == identity:
+                try:
+                    version = BinaryVersion(**entry["version"])
+                except (KeyError, TypeError) as e:
+                    logger.warning(f"Ignoring malformed version cache entry: {e}")
+                else:
+                    self._cached_version = version
+                    logger.info(f"Detected version (cached): {version.display_string}")
+                    if self._verify_hash:
+                        self._start_hash_check(binary_path, identity, entry.get("sha256"))
+                    return version
+        
+        version = self._run_version(binary_path)
+        if version and identity:
+            self._store(binary_path, identity, version, sha256=None)
+            if self._verify_hash:
+                self._start_hash_check(binary_path, identity, None)
+        return version
+    
+    def _run_version(self, binary_path: Path) -> Optional[BinaryVersion]:
         try:
             result = subprocess.run(
-                [str(self.binary_path), "--version"],
+                [str(binary_path), "--version"],
                 capture_output=True,
                 text=True,
                 timeout=10,
@@ -85,6 +148,52 @@ class VersionChecker:
         
         return None
     
+    def _store(self, binary_path: Path, identity: dict, version: BinaryVersion, sha256: Optional[str]):
+        with self._lock:
+            self._disk_cache.update(str(binary_path), {
+                "identity": identity,
+                "sha256": sha256,
+                "version": asdict(version),
+            })
+    
+    def _start_hash_check(self, binary_path: Path, identity: dict, expected: Optional[str]):
+        threading.Thread(
+            target=self._hash_check,
+            args=(binary_path, identity, expected),
+            daemon=True,
+        ).start()
+    
+    def _hash_check(self, binary_path: Path, identity: dict, expected: Optional[str]):
+        """Verify the cached entry against the binary contents in the background."""
+        try:
+            digest = self.file_digest(binary_path)
+        except OSError as e:
+            logger.warning(f"Could not hash {binary_path}: {e}")
+            return
+        
+        if expected is None:
+            entry = self._disk_cache.load().get(str(binary_path))
+            if entry and entry.get("identity") == identity:
+                entry["sha256"] = digest
+                with self._lock:
+                    self._disk_cache.update(str(binary_path), entry)
+            return
+        
+        if digest == expected:
+            logger.debug(f"Binary hash verified: {digest}")
+            return
+        
+        logger.warning("Binary contents changed without a metadata change, re-checking version")
+        version = self._run_version(binary_path)
+        if version is None:
+            return
+        self._store(binary_path, identity, version, sha256=digest)
+        with self._lock:
+            if self.binary_path == binary_path:
+                self._cached_version = version
+        if self._on_version_change:
+            self._on_version_change(version)
+    
     def _parse_version(self, output: str) -> BinaryVersion:
         version = BinaryVersion()
         match = self.VERSION_PATTERN.search(output)
@@ -5,63 +5,44 @@ if __name__ == '__main__':
     sys.path.insert(0, str(Path(__file__).parent.parent))
 
 import os
+import atexit
 import traceback
+import threading
 import logging
 
-logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
-logger = logging.getLogger(__name__)
-
-class AndroidLogger(object):
-    def __init__(self, filename="full_app_log.txt", original_stream=sys.stdout):
-        self.terminal = original_stream
-        if 'ANDROID_ROOT' in os.environ:
-            log_dir = '/storage/emulated/0/Download/'
-            if not os.path.exists(log_dir):
-                try:
-                    os.makedirs(log_dir)
-                except:
-                    pass
-            self.log_file = os.path.join(log_dir, filename)
-            try:
-                self.log = open(self.log_file, "a", encoding="utf-8")
-            except:
-                self.log = None
-        else:
-            self.log = None
-
-    def write(self, message):
-        self.terminal.write(message)
-        if self.log:
-            try:
-                self.log.write(message)
-                self.log.flush()
-            except:
-                pass
-
-    def flush(self):
-        self.terminal.flush()
-        if self.log:
-            try:
-                self.log.flush()
-            except:
-                pass
+from monerodui.libs.async_log_writer import AsyncLogWriter
 
+app_log = None
 if 'ANDROID_ROOT' in os.environ:
-    sys.stdout = AndroidLogger(original_stream=sys.stdout)
+    app_log = AsyncLogWriter(
+        Path('/storage/emulated/0/Download/') / "full_app_log.txt",
+        original_stream=sys.stdout,
+    )
+    sys.stdout = app_log
     sys.stderr = sys.stdout
+    atexit.register(app_log.close)
+
+# After the redirect, so log records reach the app log file too
+logging.basicConfig(level=logging.INFO, format='[%(levelname)s] %(message)s')
+logger = logging.getLogger(__name__)
 
 def final_excepthook(t, v, tb):
     sys.__excepthook__(t, v, tb) 
     logger.error(f"Application terminated with UNCAUGHT EXCEPTION: {t.__name__}")
+    if app_log:
+        app_log.flush_sync()
 
 sys.excepthook = final_excepthook
 
 """monerod UI - Main Application Entry."""
 
+from dataclasses import asdict
 from pathlib import Path
+from typing import Optional
 from urllib.parse import unquote
 
 from kivy.clock import Clock, mainthread
+from kivy.core.window import Window
 from kivy.properties import ObjectProperty, StringProperty, BooleanProperty
 from kivy.utils import platform
 
@@ -83,6 +64,24 @@ from monerodui.libs import (
     NodeStatsPoller,
     VersionChecker,
     UpdateChecker,
+    InitPipeline,
+    BinaryUpdater,
+    BinaryStore,
+    LogSearch,
+    LogArchiver,
+    StatsHistory,
+    SyncTelemetryParser,
+    ProcSampler,
+    Supervisor,
+    RestartPolicy,
+    DaemonRPC,
+    AndroidNotifier,
+    NotificationState,
+    StatsChannel,
+    LaunchSpec,
+    LiveConfig,
+    BandwidthSchedule,
+    BandwidthScheduler,
 )
 
 REQUEST_CODE_DATA_DIR = 1001
@@ -111,18 +110,48 @@ class monerodUIApp(MDApp):
             self._is_android = False
             
         self.main_screen = None
+        self.screen_manager = None
         self._stats_poll_event = None
         self._insufficient_storage_dialog = None
         self._data_dir_dialog = None
         self._file_manager = None
         self._last_notified_height = 0
+        self._update_thread = None
+        self._last_update_message = ""
         
         base_path = Path(__file__).parent
-        self.arch_detector = ArchDetector(bin_dir=base_path / "assets" / "bin")
+        self._cache_dir = Path(self.user_data_dir) / "cache"
+        self.binary_store = BinaryStore(Path(self.user_data_dir) / "binaries")
+        self.log_search = LogSearch(index_dir=self._cache_dir / "log_index")
+        self.log_archiver = None
+        self.notifier = None
+        self.launch_spec = None
+        self.arch_detector = ArchDetector(
+            bin_dir=base_path / "assets" / "bin",
+            cache_path=self._cache_dir / "platform_profile.json",
+            store=self.binary_store,
+        )
         self.process_manager = ProcessManager()
-        self.node_stats_poller = NodeStatsPoller()
-        self.version_checker = VersionChecker()
-        self.update_checker = UpdateChecker(self.version_checker,is_android=self._is_android,arch=self.arch_detector.detected_arch or "amd64")
+        self.supervisor = Supervisor(self.process_manager, on_change=self._on_supervisor_change)
+        self.bandwidth_scheduler = BandwidthScheduler(self.get_daemon_rpc, on_change=self._on_bandwidth_applied)
+        self.stats_history = StatsHistory(cache_path=self._cache_dir / "stats_history.json")
+        self.sync_telemetry = SyncTelemetryParser(history=self.stats_history)
+        # The Android service publishes what it polls; read that instead of a second round of RPC
+        self.stats_channel = StatsChannel(self._cache_dir / StatsChannel.FILE_NAME)
+        self.node_stats_poller = NodeStatsPoller(telemetry=self.sync_telemetry, channel=self.stats_channel)
+        self.proc_sampler = ProcSampler(history=self.stats_history)
+        self.version_checker = VersionChecker(
+            cache_path=self._cache_dir / "binary_version.json",
+            verify_hash=True,
+            on_version_change=self._on_binary_version_change,
+        )
+        self.update_checker = UpdateChecker(
+            self.version_checker,
+            is_android=self._is_android,
+            arch=self.arch_detector.detected_arch or "amd64",
+            cache_path=self._cache_dir / "update_status.json",
+            on_update=self._handle_update_status,
+        )
   
     def get_application_config(self, defaultpath='%(appdir)s/%(appname)s.ini'):
         if self._is_android:
@@ -141,9 +170,32 @@ class monerodUIApp(MDApp):
         self.theme_cls.surfaceContainerHighColor = [0.25, 0.25, 0.25, 1]
         self.theme_cls.surfaceContainerLowColor = [0.15, 0.15, 0.15, 1]
 
+        from kivymd.uix.screenmanager import MDScreenManager
         from monerodui.screens.main_screen import MainScreen
-        self.main_screen = MainScreen()
-        return self.main_screen
+        from monerodui.screens.log_screen import LogScreen
+        self.main_screen = MainScreen(name="main")
+        self.screen_manager = MDScreenManager()
+        self.screen_manager.add_widget(self.main_screen)
+        self.screen_manager.add_widget(LogScreen(name="log"))
+        Window.bind(on_keyboard=self._on_keyboard)
+        return self.screen_manager
+
+    def _on_keyboard(self, window, key, *args):
+        # Android back button / Escape returns from the log viewer
+        if key == 27 and self.screen_manager.current != "main":
+            self.screen_manager.current = "main"
+            return True
+        return False
+
+    def open_log_viewer(self):
+        self.screen_manager.current = "log"
+
+    def get_log_path(self):
+        """monerod.log written by ProcessManager, or None without a data dir."""
+        working_dir = self._get_working_directory()
+        if not working_dir:
+            return None
+        return working_dir / ProcessManager.LOG_FILE_NAME
 
     def build_config(self, config):
         config.setdefaults("network", {
@@ -171,7 +223,8 @@ class monerodUIApp(MDApp):
         })
         config.setdefaults("bandwidth", {
             "limit_rate_up": "8192", 
-            "limit_rate_down": "32768"
+            "limit_rate_down": "32768",
+            "schedule": ""
         })
         config.setdefaults("rpc", {
             "bind_ip": "127.0.0.1", 
@@ -224,7 +277,9 @@ class monerodUIApp(MDApp):
             "enforce_checkpoints": "0",
             "disable_checkpoints": "0",
             "enable_blocklist": "0",
-            "check_updates": "notify"
+            "check_updates": "notify",
+            "doh_resolvers": ",".join(UpdateChecker.DEFAULT_RESOLVERS),
+            "delta_url": ""
         })
         config.setdefaults("nat", {
             "igd": "delayed"
@@ -241,7 +296,12 @@ class monerodUIApp(MDApp):
             "file": "",
             "level": "0",
             "max_file_size": "104850000",
-            "max_files": "50"
+            "max_files": "50",
+            "forward_output": "1",
+            "discard_stdout": "0",
+            "archive": "1",
+            "retention_mb": "1024",
+            "retention_days": "30"
         })
         config.setdefaults("performance", {
             "max_concurrency": "0",
@@ -257,7 +317,10 @@ class monerodUIApp(MDApp):
             "non_interactive": "1",
             "extra_messages_file": ""
         })
-        config.setdefaults("runtime", {"extra_flags": "", "auto_start": "0", "enable_boot": "0"})
+        config.setdefaults("runtime", {
+            "extra_flags": "", "auto_start": "0", "enable_boot": "0", "restart_policy": "on-failure",
+            "stop_grace_period": "60"
+        })
         config.setdefaults("storage", {"min_free_gib": "10.0", "preferred_path": ""})
         config.setdefaults('state', {'was_running': '0'})
         
@@ -271,6 +334,7 @@ class monerodUIApp(MDApp):
         ini_path = self.get_application_config()
         self.config.read(ini_path)
         self._ensure_config_integrity()
+        self._apply_doh_resolvers()
     
         if platform == 'android':
             self._request_notification_permission()
@@ -291,10 +355,15 @@ class monerodUIApp(MDApp):
                 logger.warning(f"Failed to stop service: {e}")
         
         if hasattr(self, 'process_manager') and self.process_manager.is_running:
+            # Show what the service last saw right away, before the first poll
+            stats = self.node_stats_poller.shared_stats()
+            if stats is not None and stats.status != "offline" and self.main_screen:
+                self.main_screen.update_node_stats(stats)
             self._start_stats_polling()
 
     def on_pause(self):
         logger.info("on_pause called")
+        self.stats_history.save()
         if platform == 'android' and self.process_manager.is_running:
             self._start_android_service()
             logger.info("Started background service")
@@ -313,6 +382,10 @@ class monerodUIApp(MDApp):
         
         if is_running:
             logger.info("Leaving monerod running in background")
+        
+        if self.log_archiver:
+            self.log_archiver.stop()
+        self.stats_history.save()
 
     # 2. Data Directory Selection (SAF)
     def _needs_data_dir(self) -> bool:
@@ -536,36 +609,67 @@ class monerodUIApp(MDApp):
         if platform != 'android':
             return
         
-        from jnius import autoclass
-        
-        PythonActivity = autoclass('org.kivy.android.PythonActivity')
-        Context = autoclass('android.content.Context')
-        NotificationChannel = autoclass('android.app.NotificationChannel')
-        NotificationManager = autoclass('android.app.NotificationManager')
-        
-        context = PythonActivity.mActivity
-        channel_id = "monerodui_default"
-        
-        channel = NotificationChannel(channel_id, "monerod UI", NotificationManager.IMPORTANCE_DEFAULT)
-        nm = context.getSystemService(Context.NOTIFICATION_SERVICE)
-        nm.createNotificationChannel(channel)
+        self._get_notifier()
+
+    def _get_notifier(self):
+        """The app's notifier; creating it creates the notification channel."""
+        if self.notifier is None:
+            from jnius import autoclass
+            PythonActivity = autoclass('org.kivy.android.PythonActivity')
+            self.notifier = AndroidNotifier(PythonActivity.mActivity, "monerodui_default", "monerod UI")
+        return self.notifier
 
     # 4. Initialization
     def _initialize(self, *args):
         logger.info("=== INITIALIZATION START ===")
+        if self.main_screen and 'status_card' in self.main_screen.ids:
+            self.main_screen.ids.status_card.update_state("Checking...", False)
+        
+        pipeline = InitPipeline()
+        pipeline.add_step("arch", self._detect_arch)
+        pipeline.add_step("version", self._check_binary_version, depends=("arch",))
+        pipeline.add_step("existing", self._check_existing_process)
+        pipeline.run(on_step_done=self._on_init_step, on_complete=self._on_init_complete)
+
+    def _detect_arch(self, deps) -> dict:
         arch_status = self.arch_detector.get_status()
         logger.info(f"Architecture: {arch_status}")
-        
-        if not self.arch_detector.is_supported():
-            self.show_snackbar(f"Unsupported architecture: {self.arch_detector.raw_arch}")
+        return arch_status
+
+    @mainthread
+    def _on_init_step(self, name, result, error):
+        """Stream each probe result into the UI as soon as it completes."""
+        if error is not None:
+            logger.warning(f"Init step '{name}' did not complete: {error}")
             return
         
-        if not self.arch_detector.is_ready():
-            self.show_snackbar("Binary not found or not executable")
-        else:
-            self._check_binary_version()
+        card = None
+        if self.main_screen and 'status_card' in self.main_screen.ids:
+            card = self.main_screen.ids.status_card
         
-        self._check_existing_process()
+        if name == "arch":
+            if card:
+                card.update_arch(
+                    raw=result["raw_arch"],
+                    detected=result["detected_arch"] or "Unknown",
+                    supported=result["supported"],
+                )
+                card.update_binary(path=result["binary_path"], ready=result["ready"])
+            if not result["supported"]:
+                self.show_snackbar(f"Unsupported architecture: {result['raw_arch']}")
+            elif not result["ready"]:
+                self.show_snackbar("Binary not found or not executable")
+        elif name == "version":
+            if result:
+                self._set_binary_version(result)
+        elif name == "existing":
+            self._update_ui_state(running=bool(result))
+
+    @mainthread
+    def _on_init_complete(self, results):
+        arch_status = results.get("arch")
+        if not arch_status or not arch_status["supported"]:
+            return
         self._complete_initialization()
 
     def _ensure_config_integrity(self):
@@ -581,7 +685,7 @@ class monerodUIApp(MDApp):
                 "allow_local_ip": "0", "priority_nodes": "", 
                 "exclusive_nodes": "", "seed_nodes": "", "ban_list": ""
             },
-            "bandwidth": {"limit_rate_up": "8192", "limit_rate_down": "32768"},
+            "bandwidth": {"limit_rate_up": "8192", "limit_rate_down": "32768", "schedule": ""},
             "rpc": {
                 "bind_ip": "127.0.0.1", "bind_port": "18081", 
                 "restricted_bind_ip": "127.0.0.1", "restricted_bind_port": "0",
@@ -604,7 +708,9 @@ class monerodUIApp(MDApp):
             },
             "dns": {
                 "enforce_checkpoints": "0", "disable_checkpoints": "0", 
-                "enable_blocklist": "0", "check_updates": "notify"
+                "enable_blocklist": "0", "check_updates": "notify",
+                "doh_resolvers": ",".join(UpdateChecker.DEFAULT_RESOLVERS),
+                "delta_url": ""
             },
             "nat": {"igd": "delayed"},
             "mining": {
@@ -612,7 +718,9 @@ class monerodUIApp(MDApp):
                 "bg_ignore_battery": "0", "bg_idle_threshold": "0", "bg_miner_target": "0"
             },
             "logging": {
-                "file": "", "level": "0", "max_file_size": "104850000", "max_files": "50"
+                "file": "", "level": "0", "max_file_size": "104850000", "max_files": "50",
+                "forward_output": "1", "discard_stdout": "0",
+                "archive": "1", "retention_mb": "1024", "retention_days": "30"
             },
             "performance": {"max_concurrency": "0", "prep_blocks_threads": "4"},
             "notify": {"block_enabled": "0", "reorg_enabled": "0"},
@@ -620,7 +728,10 @@ class monerodUIApp(MDApp):
                 "config_file": "", "data_dir": "", 
                 "non_interactive": "1", "extra_messages_file": ""
             },
-            "runtime": {"extra_flags": "", "auto_start": "0", "enable_boot": "0"},
+            "runtime": {
+                "extra_flags": "", "auto_start": "0", "enable_boot": "0", "restart_policy": "on-failure",
+                "stop_grace_period": "60"
+            },
             "storage": {"min_free_gib": "50.0", "preferred_path": ""},
             "state": {"was_running": "0"},
         }
@@ -640,32 +751,39 @@ class monerodUIApp(MDApp):
             self.config.write()
             logger.info("Config repaired and saved")
 
-    def _check_existing_process(self):
-        """Check if monerod is already running (from previous session or external)."""
+    def _check_existing_process(self, deps) -> Optional[int]:
+        """PID of a monerod already running on our data dir (service or previous session).
+        
+        Pidfile and /proc only, so it does not wait for RPC to come up.
+        """
         if self.process_manager.is_running:
             logger.info("Detected existing node via ProcessManager")
-            self._update_ui_state(running=True)
-            return
+            return self.process_manager.pid
         
-        stats = self.node_stats_poller.poll()
-        if stats.status != "offline":
-            logger.info("Detected existing node via RPC")
-            self._update_ui_state(running=True)
-        else:
-            self._update_ui_state(running=False)
+        pid = ProcessManager.find_existing(self._get_working_directory())
+        if pid:
+            logger.info(f"Detected running monerod, PID {pid}")
+        return pid
     
-    def _check_binary_version(self):
-        if self.arch_detector.binary_path:
-            self.version_checker.set_binary_path(self.arch_detector.binary_path)
-            version = self.version_checker.get_version()
-            if version:
-                Clock.schedule_once(lambda dt: self._set_binary_version(version), 1.0)
+    def _check_binary_version(self, deps):
+        arch_status = deps.get("arch")
+        if not arch_status or not arch_status["supported"] or not arch_status["ready"]:
+            return None
+        self.version_checker.set_binary_path(self.arch_detector.binary_path)
+        return self.version_checker.get_version()
 
     def _set_binary_version(self, version):
         """Set binary version in UI once it's ready."""
         if self.main_screen and hasattr(self.main_screen, 'ids'):
             if 'node_stats_card' in self.main_screen.ids:
                 self.main_screen.ids.node_stats_card.set_binary_version(version)
+            if 'status_card' in self.main_screen.ids:
+                self.main_screen.ids.status_card.update_binary_version(version.display_string)
+
+    def _on_binary_version_change(self, version):
+        """Cached version was stale; background hash check re-ran the binary."""
+        if version:
+            Clock.schedule_once(lambda dt: self._set_binary_version(version))
 
     def _get_working_directory(self) -> Path:
         """Get working directory from config."""
@@ -689,14 +807,15 @@ class monerodUIApp(MDApp):
         
         logger.info(f"Working directory: {working_dir}")
         logger.info(f"Binary path: {self.arch_detector.binary_path}")
+        self._start_log_archiver()
+        self.sync_telemetry.follow(self.get_log_path())
+        self.supervisor.policy = RestartPolicy.from_config(
+            self.config.get("runtime", "restart_policy", fallback="on-failure")
+        )
         
         if self.arch_detector.binary_path and working_dir:
             logger.info("Configuring ProcessManager...")
-            self.process_manager.configure(
-                binary_path=self.arch_detector.binary_path,
-                working_dir=working_dir,
-                on_state_change=self._on_process_state_change,
-            )
+            self._configure_process_manager(self.get_launch_spec())
             logger.info("ProcessManager configured successfully")
             
             boot_start_enabled = False
@@ -712,8 +831,16 @@ class monerodUIApp(MDApp):
                 except Exception as e:
                     logger.error(f"Failed to read SharedPreferences: {e}")
             
-            if self.process_manager.is_running:
-                logger.info("Detected monerod already running from service")
+            # Take over a monerod the service or a previous session left running,
+            # rather than start a second one on the same data dir
+            existing_pid = ProcessManager.find_existing(working_dir, self.arch_detector.binary_path)
+            adopted = False
+            if existing_pid:
+                self._configure_process_manager(self.get_launch_spec())
+                adopted = self.supervisor.adopt(existing_pid)
+            
+            if adopted:
+                logger.info(f"Adopted monerod already running, PID {existing_pid}")
                 self._update_ui_state(True)
             else:
                 last_running = self.config.get("state", "was_running", fallback="0")
@@ -741,16 +868,9 @@ class monerodUIApp(MDApp):
                 
                 if should_start:
                     logger.info(f"Triggering auto-start: {start_reason}")
-                    extra_args = self._get_extra_args()
-                    
-                    self.process_manager.configure(
-                        binary_path=self.arch_detector.binary_path,
-                        working_dir=working_dir,
-                        extra_args=extra_args,
-                        on_state_change=self._on_process_state_change,
-                    )
+                    self._configure_process_manager(self.get_launch_spec())
                     
-                    if self.process_manager.start():
+                    if self.supervisor.start():
                         logger.info("Auto-start succeeded")
                         self._update_ui_state(True)
                     else:
@@ -845,39 +965,41 @@ class monerodUIApp(MDApp):
         
         if is_running:
             logger.info("=== STOPPING MONEROD ===")
+            if self.process_manager.state == ProcessState.STOPPING:
+                self.show_snackbar("monerod is already shutting down")
+                return
             if self.process_manager.is_running:
-                logger.info("ProcessManager reports running, calling stop()")
-                result = self.process_manager.stop()
-                logger.info(f"Stop result: {result}")
+                logger.info("ProcessManager reports running, stopping via RPC")
+                result = self.supervisor.stop(
+                    rpc=self.get_daemon_rpc(),
+                    grace_period=self._get_stop_grace_period(),
+                    on_progress=self._on_stop_progress,
+                    on_done=self._on_stop_finished,
+                )
+                logger.info(f"Stop requested: {result}")
             else:
                 logger.warning("ProcessManager reports NOT running")
-            self._update_ui_state(False)
+                self.supervisor.stop()
+                self._update_ui_state(False)
         else:
             logger.info("=== STARTING MONEROD ===")
             if not self._check_storage():
                 logger.warning("Storage check failed, aborting start")
                 return
             
-            working_dir = self._get_working_directory()
-            binary_path = self.arch_detector.binary_path
-            extra_args = self._get_extra_args()
+            spec = self.get_launch_spec()
             
-            logger.info(f"Binary: {binary_path}")
-            logger.info(f"Working dir: {working_dir}")
-            logger.info(f"Extra args: {extra_args}")
+            logger.info(f"Binary: {spec.binary}")
+            logger.info(f"Working dir: {self._get_working_directory()}")
+            logger.info(f"Extra args: {list(spec.args)}")
             
             try:
                 logger.info("Calling ProcessManager.configure()...")
-                self.process_manager.configure(
-                    binary_path=binary_path,
-                    working_dir=working_dir,
-                    extra_args=extra_args,
-                    on_state_change=self._on_process_state_change,
-                )
+                self._configure_process_manager(spec)
                 logger.info("ProcessManager configured")
                 
                 logger.info("Calling ProcessManager.start()...")
-                start_result = self.process_manager.start()
+                start_result = self.supervisor.start()
                 logger.info(f"Start result: {start_result}")
                 
                 if not start_result:
@@ -891,286 +1013,68 @@ class monerodUIApp(MDApp):
                 logger.error(f"EXCEPTION during start: {e}", exc_info=True)
                 self.show_snackbar(f"Error: {e}")
 
-    def _get_extra_args(self) -> list[str]:
-        """Translate app configuration into monerod command-line arguments."""
-        args = []
-        
-        args.append("--non-interactive")
-        
-        net_type = self.config.get("network", "network_type")
-        if net_type == "testnet":
-            args.append("--testnet")
-        elif net_type == "stagenet":
-            args.append("--stagenet")
-            
-        if self.config.get("network", "offline") == "1":
-            args.append("--offline")
-        if self.config.get("network", "no_sync") == "1":
-            args.append("--no-sync")
-        if self.config.get("network", "public_node") == "1":
-            args.append("--public-node")
-        if self.config.get("network", "sync_pruned_blocks") == "1":
-            args.append("--sync-pruned-blocks")
-        if self.config.get("network", "pad_transactions") == "1":
-            args.append("--pad-transactions")
-
-        bind_ip = self.config.get("p2p", "bind_ip")
-        if bind_ip and bind_ip != "0.0.0.0":
-            args.extend(["--p2p-bind-ip", bind_ip])
-            
-        bind_port = self.config.get("p2p", "bind_port")
-        if bind_port and bind_port != "18080":
-            args.extend(["--p2p-bind-port", bind_port])
-            
-        if self.config.get("p2p", "use_ipv6") == "1":
-            args.append("--p2p-use-ipv6")
-            
-        ext_port = self.config.get("p2p", "external_port")
-        if ext_port and ext_port != "0":
-            args.extend(["--p2p-external-port", ext_port])
-            
-        out_peers = self.config.get("p2p", "out_peers")
-        if out_peers and out_peers != "-1":
-            args.extend(["--out-peers", out_peers])
-            
-        in_peers = self.config.get("p2p", "in_peers")
-        if in_peers and in_peers != "-1":
-            args.extend(["--in-peers", in_peers])
-            
-        max_conns = self.config.get("p2p", "max_connections_per_ip")
-        if max_conns and max_conns != "1":
-            args.extend(["--max-connections-per-ip", max_conns])
-            
-        if self.config.get("p2p", "hide_my_port") == "1":
-            args.append("--hide-my-port")
-        if self.config.get("p2p", "allow_local_ip") == "1":
-            args.append("--allow-local-ip")
-            
-        priority_nodes = self.config.get("p2p", "priority_nodes")
-        if priority_nodes:
-            for node in priority_nodes.split(","):
-                if node.strip():
-                    args.extend(["--add-priority-node", node.strip()])
-                    
-        exclusive_nodes = self.config.get("p2p", "exclusive_nodes")
-        if exclusive_nodes:
-            for node in exclusive_nodes.split(","):
-                if node.strip():
-                    args.extend(["--add-exclusive-node", node.strip()])
-                    
-        seed_nodes = self.config.get("p2p", "seed_nodes")
-        if seed_nodes:
-            args.extend(["--seed-node", seed_nodes])
-            
-        ban_list = self.config.get("p2p", "ban_list")
-        if ban_list:
-            args.extend(["--ban-list", ban_list])
-
-        limit_up = self.config.get("bandwidth", "limit_rate_up")
-        if limit_up and limit_up != "8192":
-            args.extend(["--limit-rate-up", limit_up])
-            
-        limit_down = self.config.get("bandwidth", "limit_rate_down")
-        if limit_down and limit_down != "32768":
-            args.extend(["--limit-rate-down", limit_down])
-
-        rpc_bind_ip = self.config.get("rpc", "bind_ip")
-        if rpc_bind_ip:
-            args.extend(["--rpc-bind-ip", rpc_bind_ip])
-            
-        rpc_bind_port = self.config.get("rpc", "bind_port")
-        if rpc_bind_port:
-            args.extend(["--rpc-bind-port", rpc_bind_port])
-            
-        res_bind_ip = self.config.get("rpc", "restricted_bind_ip")
-        if res_bind_ip and res_bind_ip != "127.0.0.1":
-            args.extend(["--rpc-restricted-bind-ip", res_bind_ip])
-            
-        res_bind_port = self.config.get("rpc", "restricted_bind_port")
-        if res_bind_port and res_bind_port != "0":
-            args.extend(["--rpc-restricted-bind-port", res_bind_port])
-            
-        if self.config.get("rpc", "restricted") == "1":
-            args.append("--restricted-rpc")
-        if self.config.get("rpc", "use_ipv6") == "1":
-            args.append("--rpc-use-ipv6")
-            
-        rpc_login = self.config.get("rpc", "login")
-        if rpc_login:
-            args.extend(["--rpc-login", rpc_login])
-            
-        if self.config.get("rpc", "confirm_external_bind") == "1":
-            args.append("--confirm-external-bind")
-            
-        cors = self.config.get("rpc", "access_control_origins")
-        if cors:
-            args.extend(["--rpc-access-control-origins", cors])
-            
-        if self.config.get("rpc", "disable_ban") == "1":
-            args.append("--disable-rpc-ban")
-
-        ssl_mode = self.config.get("rpcssl", "mode")
-        if ssl_mode == "enabled":
-            args.extend(["--rpc-ssl", "enabled"])
-        elif ssl_mode == "disabled":
-            args.extend(["--rpc-ssl", "disabled"])
-        
-        ssl_key = self.config.get("rpcssl", "private_key")
-        if ssl_key:
-            args.extend(["--rpc-ssl-private-key", ssl_key])
-            
-        ssl_cert = self.config.get("rpcssl", "certificate")
-        if ssl_cert:
-            args.extend(["--rpc-ssl-certificate", ssl_cert])
-            
-        ca_certs = self.config.get("rpcssl", "ca_certificates")
-        if ca_certs:
-            args.extend(["--rpc-ssl-ca-certificates", ca_certs])
-            
-        if self.config.get("rpcssl", "allow_any_cert") == "1":
-            args.append("--rpc-ssl-allow-any-cert")
-        if self.config.get("rpcssl", "allow_chained") == "1":
-            args.append("--rpc-ssl-allow-chained")
-
-        if self.config.get("zmq", "disabled") == "1":
-            args.append("--no-zmq")
-        else:
-            zmq_ip = self.config.get("zmq", "bind_ip")
-            zmq_port = self.config.get("zmq", "bind_port")
-            if zmq_ip and zmq_port:
-                args.extend(["--zmq-rpc-bind-ip", zmq_ip, "--zmq-rpc-bind-port", zmq_port])
-            
-            zmq_pub = self.config.get("zmq", "pub")
-            if zmq_pub:
-                args.extend(["--zmq-pub", zmq_pub])
-
-        proxy = self.config.get("proxy", "address")
-        if proxy:
-            args.extend(["--proxy", proxy])
-            
-        if self.config.get("proxy", "allow_dns_leaks") == "1":
-            args.append("--allow-dns-leaks")
-            
-        tx_proxy = self.config.get("proxy", "tx_proxy")
-        if tx_proxy:
-            args.extend(["--tx-proxy", tx_proxy])
-            
-        anon_inbound = self.config.get("proxy", "anonymous_inbound")
-        if anon_inbound:
-            args.extend(["--anonymous-inbound", anon_inbound])
-
-        boot_addr = self.config.get("bootstrap", "address")
-        if boot_addr:
-            args.extend(["--bootstrap-daemon-address", boot_addr])
-            
-        boot_login = self.config.get("bootstrap", "login")
-        if boot_login:
-            args.extend(["--bootstrap-daemon-login", boot_login])
-            
-        boot_proxy = self.config.get("bootstrap", "proxy")
-        if boot_proxy:
-            args.extend(["--bootstrap-daemon-proxy", boot_proxy])
-
-        if self.config.get("blockchain", "prune") == "1":
-            args.append("--prune-blockchain")
-            
-        db_sync = self.config.get("blockchain", "db_sync_mode")
-        if db_sync:
-            args.extend(["--db-sync-mode", db_sync])
-            
-        if self.config.get("blockchain", "db_salvage") == "1":
-            args.append("--db-salvage")
-            
-        if self.config.get("blockchain", "fast_block_sync") == "1":
-            args.append("--fast-block-sync=1")
-        else:
-            args.append("--fast-block-sync=0")
-            
-        if self.config.get("blockchain", "keep_alt_blocks") == "1":
-            args.append("--keep-alt-blocks")
-            
-        max_txpool_weight = self.config.get("blockchain", "max_txpool_weight")
-        if max_txpool_weight and max_txpool_weight != "648000000":
-            args.extend(["--max-txpool-weight", max_txpool_weight])
-
-        if self.config.get("dns", "enforce_checkpoints") == "1":
-            args.append("--enforce-dns-checkpoints")
-        if self.config.get("dns", "disable_checkpoints") == "1":
-            args.append("--disable-dns-checkpoints")
-        if self.config.get("dns", "enable_blocklist") == "1":
-            args.append("--enable-dns-blocklist")
-        
-        check_updates = self.config.get("dns", "check_updates")
-        if check_updates:
-            args.extend(["--check-updates", check_updates])
-
-        igd = self.config.get("nat", "igd")
-        if igd:
-            args.extend(["--igd", igd])
-
-        mine_addr = self.config.get("mining", "address")
-        mine_threads = self.config.get("mining", "threads")
-        if mine_addr and mine_threads and mine_threads != "0":
-            args.extend(["--start-mining", mine_addr, "--mining-threads", mine_threads])
-            
-        if self.config.get("mining", "bg_enable") == "1":
-            args.append("--bg-mining-enable")
-        if self.config.get("mining", "bg_ignore_battery") == "1":
-            args.append("--bg-mining-ignore-battery")
-            
-        bg_threshold = self.config.get("mining", "bg_idle_threshold")
-        if bg_threshold and bg_threshold != "0":
-            args.extend(["--bg-mining-miner-target", bg_threshold])
-            
-        bg_target = self.config.get("mining", "bg_miner_target")
-        if bg_target and bg_target != "0":
-            args.extend(["--bg-mining-miner-target", bg_target])
-
-        log_level = self.config.get("logging", "level")
-        if log_level:
-            args.extend(["--log-level", log_level])
-            
-        max_log_size = self.config.get("logging", "max_file_size")
-        if max_log_size and max_log_size != "104850000":
-            args.extend(["--max-log-file-size", max_log_size])
-            
-        max_logs = self.config.get("logging", "max_files")
-        if max_logs and max_logs != "50":
-            args.extend(["--max-log-files", max_logs])
-            
-        prep_threads = self.config.get("performance", "prep_blocks_threads")
-        if prep_threads and prep_threads != "4":
-            args.extend(["--prep-blocks-threads", prep_threads])
-            
-        max_concurrency = self.config.get("performance", "max_concurrency")
-        if max_concurrency and max_concurrency != "0":
-            args.extend(["--max-concurrency", max_concurrency])
+    def get_daemon_rpc(self) -> DaemonRPC:
+        """RPC client for the local node, from the rpc settings."""
+        host = self.config.get("rpc", "bind_ip", fallback="127.0.0.1") or "127.0.0.1"
+        if host in ("0.0.0.0", "::"):
+            host = "127.0.0.1"
+        try:
+            port = int(self.config.get("rpc", "bind_port", fallback="18081") or 18081)
+        except ValueError:
+            port = 18081
+        return DaemonRPC(host, port, login=self.config.get("rpc", "login", fallback=""))
 
-        config_file = self.config.get("advanced", "config_file")
-        if config_file:
-            args.extend(["--config-file", config_file])
-            
-        data_dir = self.config.get("advanced", "data_dir")
-        if data_dir:
-            args.extend(["--data-dir", data_dir])
-            
-        extra_messages = self.config.get("advanced", "extra_messages_file")
-        if extra_messages:
-            args.extend(["--extra-messages-file", extra_messages])
+    def _get_stop_grace_period(self) -> float:
+        try:
+            return float(self.config.get("runtime", "stop_grace_period", fallback="60"))
+        except ValueError:
+            return ProcessManager.STOP_GRACE_PERIOD
 
-        extra_flags = self.config.get("runtime", "extra_flags")
-        if extra_flags:
-            args.extend(extra_flags.split())
+    @mainthread
+    def _on_stop_progress(self, text: str):
+        self.node_state = f"Stopping • {text}"
+        if self.main_screen:
+            self.main_screen.refresh_status()
 
-        return args
+    @mainthread
+    def _on_stop_finished(self, clean: bool):
+        if not clean:
+            self.show_snackbar("monerod had to be killed; the next start may take longer")
+        self._update_ui_state(False)
+
+    def get_launch_spec(self) -> LaunchSpec:
+        """What monerod is started with, compiled from the current settings."""
+        return LaunchSpec.compile(self.config, self.arch_detector.binary_path)
+
+    def _configure_process_manager(self, spec: LaunchSpec):
+        self.process_manager.configure(
+            binary_path=spec.binary_path,
+            working_dir=self._get_working_directory(),
+            extra_args=list(spec.args),
+            on_state_change=self._on_process_state_change,
+            forward_output=spec.forward_output,
+            discard_stdout=spec.discard_stdout,
+        )
+        self.launch_spec = spec
 
     def _on_process_state_change(self, state: ProcessState):
         logger.info(f"=== PROCESS STATE CHANGE: {state.name} ===")
         if state == ProcessState.RUNNING:
             self._update_ui_state(True)
+            # Also after a supervisor restart: monerod is back on its command-line limits
+            self._update_bandwidth_schedule()
         elif state in (ProcessState.STOPPED, ProcessState.ERROR):
+            self.bandwidth_scheduler.stop()
             self._update_ui_state(False)
 
+    @mainthread
+    def _on_supervisor_change(self, supervisor):
+        if supervisor.parked:
+            self.show_snackbar(f"monerod stopped: {supervisor.status_text}")
+            self._send_notification("monerod stopped", supervisor.status_text)
+        if self.main_screen:
+            self.main_screen.refresh_status()
+
     @mainthread
     def _update_ui_state(self, running: bool):
         logger.info(f"Updating UI state: running={running}")
@@ -1219,6 +1123,10 @@ class monerodUIApp(MDApp):
             stats = self.node_stats_poller.poll()
             
             process_running = self.process_manager.is_running
+            self.proc_sampler.attach(self.process_manager.pid)
+            stats.resources = self.proc_sampler.sample()
+            if stats.status != "offline":
+                self.stats_history.record_many({"net_bytes_in": stats.bytes_in, "net_bytes_out": stats.bytes_out})
             
             if process_running != self.node_is_running:
                 logger.info(f"Process state mismatch: process_running={process_running}, node_is_running={self.node_is_running}")
@@ -1228,18 +1136,120 @@ class monerodUIApp(MDApp):
                 self._check_notify_events(stats)
                 from kivy.clock import Clock
                 Clock.schedule_once(lambda dt: self.main_screen.update_node_stats(stats))
+            elif process_running and stats.startup_phase:
+                # RPC is not up yet; show the startup phase from the log instead
+                from kivy.clock import Clock
+                Clock.schedule_once(lambda dt: self.main_screen.update_node_stats(stats))
         
         threading.Thread(target=_do_poll, daemon=True).start()
 
     # 8. Config Changes
     def on_config_change(self, config, section, key, value):
-        if section == "runtime" and key == "enable_boot":
+        self._check_launch_changes(section, key)
+        if section == "runtime" and key == "restart_policy":
+            self.supervisor.policy = RestartPolicy.from_config(value)
+        elif section == "runtime" and key == "enable_boot":
             self._save_boot_preference(value in ("1", "True", "true"))
+        elif section == "bandwidth" and key == "schedule":
+            try:
+                BandwidthSchedule.parse(value)
+            except ValueError as e:
+                self.show_snackbar(f"Invalid bandwidth schedule {e}")
+            if self.process_manager.is_running:
+                self._update_bandwidth_schedule()
+        elif section == "dns" and key == "doh_resolvers":
+            self._apply_doh_resolvers()
+        elif (section == "logging" and key in ("archive", "retention_mb", "retention_days")) \
+                or (section == "advanced" and key == "data_dir"):
+            self._start_log_archiver()
+            self.sync_telemetry.follow(self.get_log_path())
+
+    def _check_launch_changes(self, section: str, key: str):
+        """Apply a changed setting to the running node over RPC, or say it needs a restart."""
+        if self.launch_spec is None or not self.process_manager.is_running:
+            return
+        spec = self.get_launch_spec()
+        needs_restart, live = spec.changes_from(self.launch_spec)
+        if (section, key) in live:
+            if section == "bandwidth" and self.bandwidth_scheduler.active:
+                # The schedule owns the limits; these are its base outside the windows
+                self._update_bandwidth_schedule()
+                self.launch_spec = self.launch_spec.with_values(spec, {(section, key)})
+            else:
+                self._apply_live(spec, {(section, key)})
+        elif (section, key) in needs_restart:
+            self.show_snackbar("Restart monerod to apply the new settings")
+
+    def _apply_live(self, spec: LaunchSpec, keys: set):
+        def _run():
+            result = LiveConfig(self.get_daemon_rpc()).apply(spec, keys)
+            self._on_live_applied(spec, result)
+        
+        threading.Thread(target=_run, daemon=True).start()
+
+    @mainthread
+    def _on_live_applied(self, spec: LaunchSpec, result):
+        if result.keys and self.launch_spec is not None:
+            # The node now runs with these values; only a restart picks up the rest
+            self.launch_spec = self.launch_spec.with_values(spec, result.keys)
+        if result.display_string:
+            self.show_snackbar(result.display_string)
+
+    def _update_bandwidth_schedule(self):
+        """Hand the [bandwidth] schedule to the scheduler; it only runs while monerod does."""
+        schedule = BandwidthSchedule.from_config(self.config)
+        self.bandwidth_scheduler.set_schedule(schedule)
+        if schedule.active and self.process_manager.is_running:
+            self.bandwidth_scheduler.start()
+
+    @mainthread
+    def _on_bandwidth_applied(self, applied):
+        self.show_snackbar(applied.display_string)
+
+    def _apply_doh_resolvers(self):
+        resolvers = self.config.get("dns", "doh_resolvers", fallback="")
+        self.update_checker.set_resolvers(resolvers.split(","))
+
+    def _start_log_archiver(self):
+        """(Re)start background compression and retention of rotated logs."""
+        if self.log_archiver:
+            self.log_archiver.stop()
+            self.log_archiver = None
+        
+        log_path = self.get_log_path()
+        if not log_path or self.config.get("logging", "archive", fallback="1") != "1":
+            return
+        
+        try:
+            max_mb = int(self.config.get("logging", "retention_mb", fallback="1024") or 0)
+            max_days = float(self.config.get("logging", "retention_days", fallback="30") or 0)
+        except ValueError:
+            logger.warning("Invalid log retention settings, using defaults")
+            max_mb, max_days = 1024, 30
+        
+        self.log_archiver = LogArchiver(
+            log_path,
+            max_bytes=max_mb * 1024 * 1024,
+            max_age_days=max_days,
+            on_report=self._on_log_archive_report,
+        )
+        self.log_archiver.start()
+
+    @mainthread
+    def _on_log_archive_report(self, report):
+        if report.reclaimed > 0:
+            self.show_snackbar(report.display_string)
+            if self.main_screen:
+                self.main_screen.refresh_status()
 
     # 9. Notifications & Events
     def _check_for_updates(self):
         logger.info(f"Update check starting - cached_version: {self.version_checker.cached_version}")
-        status = self.update_checker.check()
+        self._handle_update_status(self.update_checker.check())
+
+    @mainthread
+    def _handle_update_status(self, status):
+        """Handle a cached status, or one delivered by a background refresh."""
         if status.error:
             logger.warning(f"Update check failed: {status.error}")
             return
@@ -1259,7 +1269,109 @@ class monerodUIApp(MDApp):
     @mainthread
     def _update_version_ui(self, status):
         if hasattr(self.main_screen, 'ids') and 'node_stats_card' in self.main_screen.ids:
-            self.main_screen.ids.node_stats_card.update_version_info(status)
+            card = self.main_screen.ids.node_stats_card
+            card.update_version_info(status)
+            card.can_install_update = bool(status.remote_hash) and self._get_binary_updater() is not None
+
+    # 10. In-app Binary Updates
+    def _get_binary_updater(self):
+        """Updater targeting the resolved binary, or None if it can't be replaced."""
+        binary_path = self.arch_detector.binary_path
+        if not binary_path:
+            return None
+        updater = BinaryUpdater(
+            work_dir=self._cache_dir / "updates",
+            install_path=binary_path,
+            platform=self.update_checker.platform,
+            delta_url=self.config.get("dns", "delta_url", fallback=""),
+            store=self.binary_store,
+        )
+        return updater if updater.can_install() else None
+
+    def install_update(self):
+        status = self.update_checker.status
+        if not status or not status.update_available or not status.remote_hash:
+            self.show_snackbar("No verified update available")
+            return
+        
+        if self._update_thread and self._update_thread.is_alive():
+            return
+        
+        updater = self._get_binary_updater()
+        if updater is None:
+            self.show_snackbar("In-app update not supported for this install")
+            return
+        
+        installed = self.version_checker.cached_version
+        
+        def _run():
+            ok = updater.update(
+                status.remote_version,
+                status.remote_hash,
+                on_progress=self._on_update_progress,
+                from_version=installed.version if installed else None,
+            )
+            version = None
+            if ok:
+                self.version_checker.set_binary_path(self.arch_detector.binary_path)
+                version = self.version_checker.get_version()
+                if version:
+                    self.binary_store.set_metadata(status.remote_version, binary_version=asdict(version))
+                self.binary_store.prune()
+            self._on_update_finished(ok, version)
+        
+        self._on_update_progress(None)
+        self._update_thread = threading.Thread(target=_run, daemon=True)
+        self._update_thread.start()
+
+    @mainthread
+    def _on_update_progress(self, progress):
+        if 'node_stats_card' in self.main_screen.ids:
+            text = progress.display_string if progress else "Starting download..."
+            self.main_screen.ids.node_stats_card.update_progress_text = text
+            self._last_update_message = text
+
+    @mainthread
+    def _on_update_finished(self, ok, version):
+        card = self.main_screen.ids.node_stats_card
+        card.update_progress_text = ""
+        if ok:
+            card.update_available = False
+            card.can_install_update = False
+            if version:
+                self._set_binary_version(version)
+            if self.process_manager.is_running:
+                self.show_snackbar("monerod updated. Restart the node to use the new version.")
+            else:
+                self.show_snackbar("monerod updated")
+        else:
+            self.show_snackbar(f"Update failed: {self._last_update_message}")
+        self.main_screen.refresh_status()
+
+    def rollback_binary(self):
+        """Switch back to the previously active monerod without downloading."""
+        if self.process_manager.is_running:
+            self.show_snackbar("Stop the node before rolling back")
+            return
+        if not self.binary_store.can_rollback():
+            self.show_snackbar("No earlier version to roll back to")
+            return
+        
+        target = self.binary_store.rollback()
+        self.version_checker.set_binary_path(self.arch_detector.binary_path)
+        
+        def _run():
+            # The version cache is keyed by path, so a known release is not re-run
+            self._on_rollback_finished(target, self.version_checker.get_version())
+        
+        threading.Thread(target=_run, daemon=True).start()
+
+    @mainthread
+    def _on_rollback_finished(self, target, version):
+        if version:
+            self._set_binary_version(version)
+        self.main_screen.refresh_status()
+        self.show_snackbar(f"Rolled back to {('v' + target) if target else 'bundled monerod'}")
    
     def _check_notify_events(self, stats):
         """Check for notification-worthy events."""
@@ -1292,41 +1404,16 @@ class monerodUIApp(MDApp):
         MDSnackbar(MDSnackbarText(text=text), y="24dp", pos_hint={"center_x": 0.5}, size_hint_x=0.9).open()
 
     def _send_notification(self, title: str, message: str):
-        """Send notification using Android API directly."""
+        """Send notification; a repeat of the one showing is not posted again."""
         if platform != 'android':
             return
         
-        from jnius import autoclass
-        
-        PythonActivity = autoclass('org.kivy.android.PythonActivity')
-        Context = autoclass('android.content.Context')
-        NotificationBuilder = autoclass('android.app.Notification$Builder')
-        NotificationChannel = autoclass('android.app.NotificationChannel')
-        NotificationManager = autoclass('android.app.NotificationManager')
-        PendingIntent = autoclass('android.app.PendingIntent')
-        Intent = autoclass('android.content.Intent')
-        
-        context = PythonActivity.mActivity
-        channel_id = "monerodui_default"
-        
-        channel = NotificationChannel(channel_id, "monerod UI", NotificationManager.IMPORTANCE_DEFAULT)
-        nm = context.getSystemService(Context.NOTIFICATION_SERVICE)
-        nm.createNotificationChannel(channel)
-        
-        intent = Intent(context, PythonActivity)
-        pending = PendingIntent.getActivity(context, 0, intent, 67108864)
-        
-        notification = NotificationBuilder(context, channel_id) \
-            .setContentTitle(title) \
-            .setContentText(message) \
-            .setSmallIcon(context.getApplicationInfo().icon) \
-            .setContentIntent(pending) \
-            .setAutoCancel(True) \
-            .build()
-        
-        nm.notify(1, notification)
+        try:
+            self._get_notifier().post(1, NotificationState(title, message, auto_cancel=True))
+        except Exception as e:
+            logger.error(f"Failed to send notification: {e}")
 
-    # 10. Android Service
+    # 11. Android Service
     def _start_android_service(self):
         """Start the background service."""
         try:
@@ -1334,10 +1421,13 @@ class monerodUIApp(MDApp):
             service = autoclass('org.monerodui.monerodui.ServiceMonerodui')
             mActivity = autoclass('org.kivy.android.PythonActivity').mActivity
             service.start(mActivity, '')
+            self.node_stats_poller.publisher_running = True
         except Exception as e:
             logger.error(f"Failed to start service: {e}")
 
     def _stop_android_service(self):
+        # Whatever it published last is only good for the resume paint
+        self.node_stats_poller.publisher_running = False
         from android import mActivity
         from jnius import autoclass
         
@@ -1,5 +1,6 @@
 """Screen modules."""
 
 from .main_screen import MainScreen
+from .log_screen import LogScreen
 
-__all__ = ["MainScreen"]
\ No newline at end of file
+__all__ = ["MainScreen", "LogScreen"]
\ No newline at end of file
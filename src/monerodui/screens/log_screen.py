@@ -0,0 +1,204 @@
+"""monerod log viewer screen."""
+
+import re
+import calendar
+import logging
+from datetime import datetime
+from pathlib import Path
+from kivy.clock import Clock, mainthread
+from kivy.lang import Builder
+from kivy.properties import StringProperty, BooleanProperty
+
+from kivymd.uix.screen import MDScreen
+from kivymd.uix.label import MDLabel
+
+from monerodui.libs import LogTail, LogSearch
+
+logger = logging.getLogger(__name__)
+
+Builder.load_file(str(Path(__file__).parent.parent / "ui/screens/log.kv"))
+
+
+class LogLine(MDLabel):
+    pass
+
+
+class LogScreen(MDScreen):
+    """Tails monerod.log into a RecycleView, so only visible rows are rendered."""
+
+    PAGE_LINES = 200
+    MAX_LINES = 5000
+    POLL_INTERVAL = 0.5
+    TIME_FORMAT = "%Y-%m-%d %H:%M"
+
+    following = BooleanProperty(True)
+    new_lines = BooleanProperty(False)
+    path_text = StringProperty("")
+    search_open = BooleanProperty(False)
+    showing_results = BooleanProperty(False)
+    search_status = StringProperty("")
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self._tail = None
+        self._poll_event = None
+        self._search_job = None
+        self._search_generation = 0
+
+    def on_enter(self, *args):
+        path = self.get_app().get_log_path()
+        if path is None:
+            self.path_text = "No data directory configured"
+            return
+        self.path_text = str(path)
+        self._tail = LogTail(path)
+        self._load_last()
+        self._poll_event = Clock.schedule_interval(self._poll, self.POLL_INTERVAL)
+
+    def on_leave(self, *args):
+        self._cancel_search()
+        self.showing_results = False
+        if self._poll_event:
+            self._poll_event.cancel()
+            self._poll_event = None
+        if self._tail:
+            self._tail.close()
+            self._tail = None
+        self.ids.log_view.data = []
+
+    def _load_last(self):
+        lines = self._tail.read_last(self.PAGE_LINES)
+        if not lines and not self._tail.path.exists():
+            lines = ["Log file not created yet"]
+        self.ids.log_view.data = [{"text": line} for line in lines]
+        self.following = True
+        self.new_lines = False
+        self._scroll_to_end()
+
+    def _scroll_to_end(self, *args):
+        self.ids.log_view.scroll_y = 0
+
+    def _poll(self, dt):
+        if not self._tail or self.showing_results:
+            return
+        if not self.following:
+            # Leave the rows being read alone; following again reloads the end
+            if not self.new_lines and self._tail.has_new():
+                self.new_lines = True
+            return
+        try:
+            lines, rotated = self._tail.poll()
+        except OSError as e:
+            logger.warning(f"Log poll failed: {e}")
+            return
+        if not lines and not rotated:
+            return
+
+        data = self.ids.log_view.data
+        if rotated:
+            data.append({"text": "--- log rotated ---"})
+        data.extend({"text": line} for line in lines)
+        if len(data) > self.MAX_LINES:
+            del data[:len(data) - self.MAX_LINES]
+        Clock.schedule_once(self._scroll_to_end)
+
+    def on_log_scroll(self, scroll_y):
+        if not self._tail or self.showing_results:
+            return
+        if scroll_y > 0.01 and self.following:
+            self.following = False
+        if scroll_y < 1.0:
+            return
+
+        older = self._tail.read_before(self.PAGE_LINES)
+        if not older:
+            return
+        view = self.ids.log_view
+        data = [{"text": line} for line in older] + view.data
+        # Nothing is appended while paging back, so trim the newest rows;
+        # following again reloads them
+        view.data = data[:self.MAX_LINES]
+        view.scroll_y = 1.0 - len(older) / max(1, len(view.data))
+
+    def toggle_follow(self):
+        if self.following:
+            self.following = False
+        elif self._tail:
+            self._load_last()
+
+    def toggle_search(self):
+        self.search_open = not self.search_open
+        if not self.search_open:
+            self.close_results()
+
+    def _parse_time(self, text: str):
+        """Wall-clock time as written in the log, matching LogIndex timestamps."""
+        text = text.strip()
+        if not text:
+            return None
+        return float(calendar.timegm(datetime.strptime(text, self.TIME_FORMAT).timetuple()))
+
+    def run_search(self):
+        path = self.get_app().get_log_path()
+        pattern = self.ids.search_query.text
+        if path is None or not pattern:
+            return
+        try:
+            start = self._parse_time(self.ids.search_from.text)
+            end = self._parse_time(self.ids.search_to.text)
+        except ValueError:
+            self.search_status = f"Times must look like {datetime.now().strftime(self.TIME_FORMAT)}"
+            return
+
+        self._cancel_search()
+        self._search_generation += 1
+        generation = self._search_generation
+        self.showing_results = True
+        self.following = False
+        self.ids.log_view.data = []
+        self.search_status = "Searching..."
+        try:
+            self._search_job = self.get_app().log_search.search(
+                LogSearch.log_files(path),
+                pattern,
+                start=start,
+                end=end,
+                on_results=lambda hits: self._on_search_results(generation, hits),
+                on_complete=lambda job: self._on_search_complete(generation, job),
+                max_hits=self.MAX_LINES,
+            )
+        except re.error as e:
+            self.search_status = f"Invalid pattern: {e}"
+
+    @mainthread
+    def _on_search_results(self, generation, hits):
+        if generation == self._search_generation and self.showing_results:
+            self.ids.log_view.data.extend({"text": hit.display_string} for hit in hits)
+
+    @mainthread
+    def _on_search_complete(self, generation, job):
+        if generation != self._search_generation:
+            return
+        limit = " (limit reached)" if job.hits >= self.MAX_LINES else ""
+        self.search_status = f"{job.hits} matches{limit}"
+
+    def _cancel_search(self):
+        self._search_generation += 1
+        if self._search_job:
+            self._search_job.cancel()
+            self._search_job = None
+
+    def close_results(self):
+        self._cancel_search()
+        self.search_status = ""
+        if self.showing_results:
+            self.showing_results = False
+            if self._tail:
+                self._load_last()
+
+    def go_back(self):
+        self.manager.current = "main"
+
+    def get_app(self):
+        from kivymd.app import MDApp
+        return MDApp.get_running_app()
@@ -54,6 +54,7 @@ class MainScreen(MDScreen):
             path=arch["binary_path"],
             ready=arch["ready"],
         )
+        card.can_rollback = arch["can_rollback"]
         
         data_dir = app.config.get("advanced", "data_dir")
         if data_dir and Path(data_dir).exists():
@@ -81,8 +82,12 @@ class MainScreen(MDScreen):
                 message="Select a data directory",
             )
         
+        state = app.node_state
+        supervision = app.supervisor.status_text
+        if supervision:
+            state = f"{state} • {supervision}"
         card.update_state(
-            state=app.node_state,
+            state=state,
             is_running=app.node_is_running,
         )
         
@@ -3,7 +3,6 @@ import sys
 import os
 import time
 import logging
-import configparser
 from pathlib import Path
 
 logging.basicConfig(level=logging.INFO, format='[SERVICE] %(message)s')
@@ -23,204 +22,99 @@ from jnius import autoclass
 
 PythonService = autoclass('org.kivy.android.PythonService')
 service = PythonService.mService
-Context = autoclass('android.content.Context')
-NotificationBuilder = autoclass('android.app.Notification$Builder')
-NotificationManager = autoclass('android.app.NotificationManager')
-NotificationChannel = autoclass('android.app.NotificationChannel')
-PendingIntent = autoclass('android.app.PendingIntent')
-Intent = autoclass('android.content.Intent')
-BigTextStyle = autoclass('android.app.Notification$BigTextStyle')
-
-# Globals for notification updates
-notification_manager = None
-notification_builder = None
-NOTIFICATION_ID = 1002
-CHANNEL_ID = "monerodui_service"
 
+current_dir = os.path.dirname(os.path.abspath(__file__))
+sys.path.append(current_dir)
 
-def load_config():
-    """Load settings from app config file."""
-    config = configparser.ConfigParser()
-    
-    config_path = "/data/user/0/org.monerodui.monerodui/files/app/.monerodui.ini"
-    
-    alt_paths = [
-        "/data/user/0/org.monerodui.monerodui/files/app/monerodui.ini",
-        "/data/data/org.monerodui.monerodui/files/app/.monerodui.ini",
-        "/data/data/org.monerodui.monerodui/files/app/monerodui.ini",
-    ]
-    
-    if os.path.exists(config_path):
-        config.read(config_path)
-        logger.info(f"Loaded config from {config_path}")
-    else:
-        for path in alt_paths:
-            if os.path.exists(path):
-                config.read(path)
-                logger.info(f"Loaded config from {path}")
-                break
-        else:
-            logger.warning("Config file not found, using defaults")
-    
-    return config
+try:
+    from libs.android_notifier import AndroidNotifier, NotificationState
+except ImportError:
+    from monerodui.libs.android_notifier import AndroidNotifier, NotificationState
 
+# Global for notification updates
+notifier = None
+NOTIFICATION_ID = 1002
+CHANNEL_ID = "monerodui_service"
 
-def get_rpc_settings(config):
-    """Get RPC settings from config."""
-    rpc_host = config.get("rpc", "bind_ip", fallback="127.0.0.1")
-    rpc_port = config.getint("rpc", "bind_port", fallback=18081)
-    return rpc_host, rpc_port
 
+CONFIG_PATHS = [
+    "/data/user/0/org.monerodui.monerodui/files/app/.monerodui.ini",
+    "/data/user/0/org.monerodui.monerodui/files/app/monerodui.ini",
+    "/data/data/org.monerodui.monerodui/files/app/.monerodui.ini",
+    "/data/data/org.monerodui.monerodui/files/app/monerodui.ini",
+]
+DEFAULT_DATA_DIR = "/storage/emulated/0/Download/.monerod"
 
-def get_extra_args(config):
-    """Build extra args from config."""
-    args = ['--non-interactive']
-    
-    # Network
-    net_type = config.get("network", "network_type", fallback="mainnet")
-    if net_type == "testnet":
-        args.append("--testnet")
-    elif net_type == "stagenet":
-        args.append("--stagenet")
-    
-    if config.get("network", "sync_pruned_blocks", fallback="1") == "1":
-        args.append("--sync-pruned-blocks")
-    
-    # RPC
-    rpc_host = config.get("rpc", "bind_ip", fallback="127.0.0.1")
-    rpc_port = config.get("rpc", "bind_port", fallback="18081")
-    args.extend(["--rpc-bind-ip", rpc_host])
-    args.extend(["--rpc-bind-port", rpc_port])
-    
-    # ZMQ
-    if config.get("zmq", "disabled", fallback="0") != "1":
-        zmq_ip = config.get("zmq", "bind_ip", fallback="127.0.0.1")
-        zmq_port = config.get("zmq", "bind_port", fallback="18082")
-        args.extend(["--zmq-rpc-bind-ip", zmq_ip])
-        args.extend(["--zmq-rpc-bind-port", zmq_port])
-    else:
-        args.append("--no-zmq")
-    
-    # Blockchain
-    if config.get("blockchain", "prune", fallback="1") == "1":
-        args.append("--prune-blockchain")
-    
-    db_sync = config.get("blockchain", "db_sync_mode", fallback="fast:async:250000000bytes")
-    if db_sync:
-        args.extend(["--db-sync-mode", db_sync])
-    
-    if config.get("blockchain", "fast_block_sync", fallback="1") == "1":
-        args.append("--fast-block-sync=1")
-    else:
-        args.append("--fast-block-sync=0")
-    
-    # DNS
-    check_updates = config.get("dns", "check_updates", fallback="notify")
-    if check_updates:
-        args.extend(["--check-updates", check_updates])
-    
-    # NAT
-    igd = config.get("nat", "igd", fallback="delayed")
-    if igd:
-        args.extend(["--igd", igd])
-    
-    # Logging
-    log_level = config.get("logging", "level", fallback="0")
-    args.extend(["--log-level", log_level])
-    
-    return args
+
+def find_config():
+    """Path of the app config file."""
+    for path in CONFIG_PATHS:
+        if os.path.exists(path):
+            logger.info(f"Using config {path}")
+            return Path(path)
+    logger.warning("Config file not found, using defaults")
+    return Path(CONFIG_PATHS[0])
 
 
 def create_notification():
-    global notification_manager, notification_builder
+    global notifier
     
     try:
-        app_context = service.getApplicationContext()
-        notification_manager = service.getSystemService(Context.NOTIFICATION_SERVICE)
-        
-        # Create channel
-        channel = NotificationChannel(CHANNEL_ID, "monerod Service", NotificationManager.IMPORTANCE_LOW)
-        channel.setDescription("Shows node sync status")
-        notification_manager.createNotificationChannel(channel)
-        
-        # Create pending intent for tap action
-        package_name = app_context.getPackageName()
-        intent = service.getPackageManager().getLaunchIntentForPackage(package_name)
-        intent.setFlags(Intent.FLAG_ACTIVITY_NEW_TASK | Intent.FLAG_ACTIVITY_CLEAR_TOP)
-        
-        pending_intent = PendingIntent.getActivity(
-            service, 0, intent, 67108864  # FLAG_IMMUTABLE
+        notifier = AndroidNotifier(
+            service, CHANNEL_ID, "monerod Service",
+            low_importance=True, description="Shows node sync status",
         )
-        
-        # Create initial notification
-        notification_builder = NotificationBuilder(service, CHANNEL_ID)
-        notification_builder.setContentTitle("monerod UI")
-        notification_builder.setContentText("Starting...")
-        notification_builder.setSmallIcon(app_context.getApplicationInfo().icon)
-        notification_builder.setContentIntent(pending_intent)
-        notification_builder.setOngoing(True)
-        notification_builder.setProgress(100, 0, True)  #  indeterminate initially
-        
-        service.startForeground(NOTIFICATION_ID, notification_builder.build())
+        notifier.start_foreground(service, NOTIFICATION_ID, NotificationState(
+            "monerod UI", "Starting...", progress=-1, ongoing=True,
+        ))
         logger.info("Foreground notification active")
         
     except Exception as e:
         logger.error(f"Notification failed: {e}")
 
 
-def update_notification(stats, rpc_host, rpc_port):
-    global notification_manager, notification_builder
+def render_notification(stats, rpc_host, rpc_port, supervision="", parked=False):
+    """What the foreground notification should show for stats."""
+    if stats.status == "offline":
+        return NotificationState(
+            "monerod UI", supervision or "Node offline", ongoing=True,
+            phase="parked" if parked else "offline",
+        )
     
-    if not notification_builder or not notification_manager:
-        return
+    progress = int(stats.sync_progress)
+    blocks_remaining = stats.blocks_remaining
     
-    try:
-        if stats.status == "offline":
-            notification_builder.setContentTitle("monerod UI")
-            notification_builder.setContentText("Node offline")
-            notification_builder.setProgress(0, 0, False)
-            notification_builder.setStyle(None)
-        else:
-            progress = int(stats.sync_progress)
-            blocks_remaining = stats.blocks_remaining
-            
-            if blocks_remaining > 0:
-                blocks_text = f"{blocks_remaining:,} Blocks Remaining"
-            else:
-                blocks_text = "Synchronized"
-            
-            rpc_text = f"RPC: {rpc_host}:{rpc_port}"
-            
-            if stats.synchronized:
-                title = "monerod UI - Synchronized"
-            else:
-                title = f"monerod UI - {progress}%"
-            
-            big_text = f"{blocks_text}\n\n{rpc_text}"
-            
-            style = BigTextStyle()
-            style.bigText(big_text)
-            style.setBigContentTitle(title)
-            
-            notification_builder.setContentTitle(title)
-            notification_builder.setContentText(blocks_text)
-            notification_builder.setStyle(style)
-            
-            if stats.synchronized:
-                notification_builder.setProgress(0, 0, False)
-            else:
-                notification_builder.setProgress(100, progress, False)
-        
-        notification_manager.notify(NOTIFICATION_ID, notification_builder.build())
-        
-    except Exception as e:
-        logger.error(f"Failed to update notification: {e}")
+    if blocks_remaining > 0:
+        blocks_text = f"{blocks_remaining:,} Blocks Remaining"
+    else:
+        blocks_text = "Synchronized"
+    
+    rpc_text = f"RPC: {rpc_host}:{rpc_port}"
+    
+    if stats.synchronized:
+        title = "monerod UI - Synchronized"
+    else:
+        title = f"monerod UI - {progress}%"
+    
+    big_text = f"{blocks_text}\n\n{rpc_text}"
+    if supervision:
+        big_text += f"\n{supervision}"
+    
+    return NotificationState(
+        title, blocks_text, big_text=big_text, ongoing=True,
+        progress=None if stats.synchronized else progress,
+        phase="synchronized" if stats.synchronized else "syncing",
+    )
 
 
-create_notification()
+def update_notification(stats, rpc_host, rpc_port, supervision="", parked=False):
+    """Post the notification for stats; unchanged or too-frequent progress updates are skipped."""
+    if not notifier:
+        return
+    notifier.post(NOTIFICATION_ID, render_notification(stats, rpc_host, rpc_port, supervision, parked))
 
-current_dir = os.path.dirname(os.path.abspath(__file__))
-sys.path.append(current_dir)
+
+create_notification()
 
 try:
     from libs.process_manager import ProcessManager
@@ -231,6 +125,33 @@ except ImportError:
         logger.error("Could not import ProcessManager")
         ProcessManager = None
 
+try:
+    from libs.supervisor import Supervisor, RestartPolicy
+except ImportError:
+    try:
+        from monerodui.libs.supervisor import Supervisor, RestartPolicy
+    except ImportError:
+        logger.error("Could not import Supervisor")
+        Supervisor = None
+
+try:
+    from libs.binary_stager import BinaryStager
+except ImportError:
+    try:
+        from monerodui.libs.binary_stager import BinaryStager
+    except ImportError:
+        logger.error("Could not import BinaryStager")
+        BinaryStager = None
+
+try:
+    from libs.binary_store import BinaryStore
+except ImportError:
+    try:
+        from monerodui.libs.binary_store import BinaryStore
+    except ImportError:
+        logger.error("Could not import BinaryStore")
+        BinaryStore = None
+
 try:
     from libs.node_stats import NodeStatsPoller
 except ImportError:
@@ -240,54 +161,126 @@ except ImportError:
         logger.error("Could not import NodeStatsPoller")
         NodeStatsPoller = None
 
+try:
+    from libs.launch_config import LaunchConfig
+except ImportError:
+    try:
+        from monerodui.libs.launch_config import LaunchConfig
+    except ImportError:
+        logger.error("Could not import LaunchConfig")
+        LaunchConfig = None
+
+try:
+    from libs.stats_channel import StatsChannel
+except ImportError:
+    try:
+        from monerodui.libs.stats_channel import StatsChannel
+    except ImportError:
+        logger.error("Could not import StatsChannel")
+        StatsChannel = None
+
+try:
+    from libs.bandwidth_schedule import BandwidthSchedule, BandwidthScheduler
+    from libs.daemon_rpc import DaemonRPC
+except ImportError:
+    try:
+        from monerodui.libs.bandwidth_schedule import BandwidthSchedule, BandwidthScheduler
+        from monerodui.libs.daemon_rpc import DaemonRPC
+    except ImportError:
+        logger.error("Could not import BandwidthScheduler")
+        BandwidthScheduler = None
+
 
 def main():
     logger.info("Service main() entered")
     
-    if not ProcessManager:
-        logger.error("ProcessManager unavailable, service exiting")
+    if not ProcessManager or not Supervisor or not LaunchConfig:
+        logger.error("ProcessManager, Supervisor or LaunchConfig unavailable, service exiting")
         return
 
-    config = load_config()
+    files_dir = "/data/user/0/org.monerodui.monerodui/files"
+    bin_dir = Path(files_dir) / "bin"
+    # Active release from the versioned store, else the source the app last
+    # staged (possibly launched in place from nativeLibraryDir)
+    binary_path = BinaryStore(Path(files_dir) / "binaries").active_binary if BinaryStore else None
+    if not binary_path and BinaryStager:
+        binary_path = BinaryStager(bin_dir).staged_source
+    if not binary_path or not binary_path.exists():
+        binary_path = bin_dir / "monerod"
+    logger.info(f"Binary path: {binary_path}")
     
-    rpc_host, rpc_port = get_rpc_settings(config)
+    # Same command line as the app builds; only reparsed when the ini changed
+    config_path = find_config()
+    launch = LaunchConfig(
+        config_path,
+        cache_path=Path(files_dir) / "cache" / "launch_spec.json",
+        default_data_dir=Path(DEFAULT_DATA_DIR),
+    )
+    spec = launch.load(binary=binary_path)
+    rpc_host, rpc_port = spec.rpc_host, spec.rpc_port
     logger.info(f"RPC settings: {rpc_host}:{rpc_port}")
-    
-    extra_args = get_extra_args(config)
-    logger.info(f"Extra args: {extra_args}")
-
-    files_dir = "/data/user/0/org.monerodui.monerodui/files"
-    binary_path = Path(files_dir) / "bin" / "monerod"
-    working_dir = Path("/storage/emulated/0/Download/.monerod")
+    logger.info(f"Extra args: {list(spec.args)}")
+    working_dir = Path(spec.data_dir)
 
     pm = ProcessManager()
-    pm.configure(binary_path=binary_path, working_dir=working_dir, extra_args=extra_args)
+    pm.configure(
+        binary_path=spec.binary_path,
+        working_dir=working_dir,
+        extra_args=list(spec.args),
+        forward_output=spec.forward_output,
+        discard_stdout=spec.discard_stdout,
+    )
+    
+    supervisor = Supervisor(pm, policy=RestartPolicy.from_config(spec.restart_policy))
     
     poller = None
     if NodeStatsPoller:
         poller = NodeStatsPoller(host=rpc_host, port=rpc_port)
+    
+    # The UI reads this instead of polling monerod itself while the service runs
+    channel = StatsChannel(Path(files_dir) / "cache" / StatsChannel.FILE_NAME) if StatsChannel else None
 
     time.sleep(3)
     
-    last_notification_update = 0
-    NOTIFICATION_INTERVAL = 10
+    last_poll = 0
+    POLL_INTERVAL = 10
+
+    # The UI usually has monerod running already when it hands over to the
+    # service; watch that one instead of starting a second on the same data dir.
+    # Restarts after exits are the supervisor's job (backoff, crash-loop limit)
+    existing_pid = ProcessManager.find_existing(working_dir, spec.binary_path)
+    if existing_pid and supervisor.adopt(existing_pid):
+        logger.info(f"Adopted running monerod, PID {existing_pid}")
+    elif supervisor.start():
+        logger.info("monerod started successfully")
+    else:
+        logger.error(f"Failed to start: {pm.last_error}")
+
+    # Keeps switching limits while the app is away; get_limit checks catch restarts
+    if BandwidthScheduler:
+        schedule = BandwidthSchedule.load(config_path)
+        if schedule.active:
+            rpc = DaemonRPC(rpc_host, rpc_port, login=spec.rpc_login)
+            scheduler = BandwidthScheduler(lambda: rpc)
+            scheduler.set_schedule(schedule)
+            scheduler.start()
+            logger.info(f"Bandwidth schedule: {', '.join(w.label for w in schedule.windows)}")
 
     while True:
-        if not pm.is_running:
-            logger.info("monerod not running. Attempting start...")
-            success = pm.start()
-            if success:
-                logger.info("monerod started successfully")
-            else:
-                logger.error(f"Failed to start: {pm.last_error}")
-                time.sleep(10)
-        
+        # The UI may have stopped monerod and started a new one meanwhile
+        if supervisor.idle and not supervisor.parked:
+            existing_pid = ProcessManager.find_existing(working_dir, spec.binary_path)
+            if existing_pid and supervisor.adopt(existing_pid):
+                logger.info(f"Adopted running monerod, PID {existing_pid}")
+
         now = time.time()
-        if poller and (now - last_notification_update) >= NOTIFICATION_INTERVAL:
+        if poller and (now - last_poll) >= POLL_INTERVAL:
             try:
                 stats = poller.poll()
-                update_notification(stats, rpc_host, rpc_port)
-                last_notification_update = now
+                if channel:
+                    channel.publish(stats)
+                update_notification(stats, rpc_host, rpc_port, supervisor.status_text, supervisor.parked)
+                last_poll = now
             except Exception as e:
                 logger.error(f"Failed to poll stats: {e}")
         